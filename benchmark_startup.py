@@ -0,0 +1,82 @@
+"""
+Startup-time benchmark: each case runs in a fresh interpreter, so module imports are counted.
+
+Usage:
+    python benchmark_startup.py [--picks "2025 Test CSVs/captains 1.csv"] [--format 2025] [--repeat 5]
+
+Cases:
+    import package   import vacation_selection
+    import main      import vacation_selection.main (what the headless CLI loads before parsing args)
+    cli --help       python -m vacation_selection.main --help
+    run.py --help    python run.py --help (the documented entry point, headless branch)
+    draft (cold)     headless draft of the picks file with --no-cache
+    draft (cached)   the same draft again, resuming from the stage cache
+The HR workbook for the draft is generated from the picks file in a temporary folder.
+"""
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_hr_workbook(picks_path, hr_path):
+    """An HR workbook that agrees with the picks file, so the draft does real matching work."""
+    import openpyxl
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Employee Number", "Employee Name", "Hire Date", "# of Vacation Leave Hours awarded",
+                  "# of Holiday Leave Hours awarded", "Rank"])
+    with open(picks_path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            sheet.append([row["Employee ID #"], f"{row['Last Name']}, {row['First Name']}",
+                          row["Employee Hire Date"], 240, 48, row["Rank"]])
+    workbook.save(hr_path)
+
+
+def time_command(args, cwd, repeat):
+    """Median wall time of running `python args...` in cwd, in seconds."""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time package import and a small headless draft.")
+    parser.add_argument("--picks", default=os.path.join(ROOT, "2025 Test CSVs", "captains 1.csv"))
+    parser.add_argument("--format", default="2025")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        hr_path = os.path.join(work_dir, "hr.xlsx")
+        write_hr_workbook(args.picks, hr_path)
+        draft = ["-m", "vacation_selection.main", "--picks", os.path.abspath(args.picks), "--hr", hr_path,
+                 "--format", args.format, "--seed", "1"]
+
+        cases = [
+            ("import package", ["-c", "import vacation_selection"]),
+            ("import main", ["-c", "import vacation_selection.main"]),
+            ("cli --help", ["-m", "vacation_selection.main", "--help"]),
+            ("run.py --help", [os.path.join(ROOT, "run.py"), "--help"]),
+            ("draft (cold)", draft + ["--no-cache"]),
+        ]
+        for name, case_args in cases:
+            print(f"{name:<16}{time_command(case_args, work_dir, args.repeat):8.3f}s")
+
+        time_command(draft, work_dir, 1)  # Fill the stage cache
+        print(f"{'draft (cached)':<16}{time_command(draft, work_dir, args.repeat):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
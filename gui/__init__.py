@@ -1,4 +1,4 @@
 # gui/__init__.py
 
 from .firefighter_gui import FirefighterApp
-from .tree_views import create_treeview, update_treeview_data, format_exclusions
+from .tree_views import create_treeview, update_treeview_data, format_exclusions, RowIndex, VirtualTreeView
@@ -5,20 +5,26 @@ from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk
-from difflib import SequenceMatcher
 
 from vacation_selection.file_io import (
     read_firefighter_data, write_ffighters_to_json, write_calendar_to_csv,
     write_runner_ups_to_csv, write_picks_to_csv, print_final, read_hr_validation,
     read_exclusions_file, write_analysis_to_json, read_ffighters_from_json
 )
-from vacation_selection.analyze import analyze_results, display_dashboard
+from vacation_selection.analyze import OnlineAnalytics, display_dashboard
 from vacation_selection.main import validate_against_hr
+from vacation_selection.exclusions import apply_exclusions
+from vacation_selection.identity import IdentityIndex
+from vacation_selection.telestaff_export import write_telestaff_import_for_ffighters
 from vacation_selection.priority import set_priorities
 from vacation_selection.cal import make_calendar, recreate_calendar_from_json
+from vacation_selection.snapshot import save_snapshot, load_snapshot
+from vacation_selection.catalog import RunManifest, RunCatalog, seed_random
+from vacation_selection import events
 
 # Import treeview helpers
-from gui.tree_views import create_treeview, update_treeview_data, format_exclusions
+from gui.tree_views import VirtualTreeView, format_exclusions
+from gui.workers import BackgroundTask
 
 # Default filenames/paths
 testing_mode = True
@@ -34,6 +40,8 @@ else:
     default_exclusions_filename = "./exclusions.xlsx"
 
 json_dir = "./output/telestaff+suplemental_merged/"
+# Number of runs kept uncompressed in ./output; older runs are zipped by the catalog
+retained_runs = 20
 
 class FirefighterApp:
     def __init__(self, root, logger):
@@ -50,6 +58,9 @@ class FirefighterApp:
         self.exclusions_filename = default_exclusions_filename
         self.ffighters = []
         self.shift_calendars = {}
+        self.seed = None  # Seed for the dice tie-breaker of a fresh import, recorded in the run manifest
+        self.analytics = OnlineAnalytics()  # Updated from draft decisions as they are made
+        self.task = None  # The BackgroundTask currently running, if any
 
         # Set up the UI in separate frames
         self.setup_ui()
@@ -92,6 +103,9 @@ class FirefighterApp:
         # Button to select folder and read JSON files
         self.read_json_button = tk.Button(self.expanded_frame, text="Read From JSON", command=self.read_firefighters_from_json)
         self.read_json_button.pack(pady=10, anchor='w')
+        # Button to restore a saved draft snapshot (skips JSON reload, HR validation and calendar rebuild)
+        self.load_snapshot_button = tk.Button(self.expanded_frame, text="Load Snapshot", command=self.load_snapshot)
+        self.load_snapshot_button.pack(pady=10, anchor='w')
 
         # Frame 3: Actions (now placed horizontally next to Expanded Data Import)
         self.action_frame = tk.LabelFrame(self.horizontal_container, text="Actions", padx=10, pady=10)
@@ -105,6 +119,19 @@ class FirefighterApp:
         # Finalize and Export Button (renamed from Process Selections)
         self.export_button = tk.Button(self.action_frame, text="Finalize and Export", command=self.process_selections)
         self.export_button.grid(row=0, column=2, padx=5, pady=5)
+        # Save Snapshot Button
+        self.save_snapshot_button = tk.Button(self.action_frame, text="Save Snapshot", command=self.save_snapshot)
+        self.save_snapshot_button.grid(row=0, column=3, padx=5, pady=5)
+
+        # ---------------------- Progress and Cancellation ----------------------
+        self.status_frame = tk.Frame(self.root, padx=10)
+        self.status_frame.pack(fill="x", padx=10)
+        self.progress_bar = ttk.Progressbar(self.status_frame, mode="determinate")
+        self.progress_bar.pack(side=tk.LEFT, fill="x", expand=True, padx=5)
+        self.cancel_button = tk.Button(self.status_frame, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.status_label = tk.Label(self.status_frame, text="Ready", anchor="w", width=60)
+        self.status_label.pack(side=tk.RIGHT, padx=5)
 
         # ---------------------- Frame 4: Data Display ----------------------
         self.data_frame = tk.LabelFrame(self.root, text="Data Display", padx=10, pady=10)
@@ -138,44 +165,32 @@ class FirefighterApp:
         if not self.hr_filename or not self.pick_filename:
             messagebox.showwarning("Missing Files", "Please select both HR and Pick files.")
             return
-        try:
+        pick_filename, exclusions_filename = self.pick_filename, self.exclusions_filename
+
+        def work(task):
             date_format = '%m-%d-%Y'
-            self.ffighters = read_firefighter_data(self.pick_filename, date_format, 2025)
-            if self.exclusions_filename:
-                exclusions = read_exclusions_file(self.exclusions_filename)
-                self.apply_exclusions(exclusions)
+            seed = seed_random()
+            ffighters = read_firefighter_data(pick_filename, date_format, 2025,
+                                              progress=lambda rows: task.progress(rows, None, f"Reading pick file: row {rows}"))
+            unmatched, ambiguous = [], []
+            if exclusions_filename:
+                task.progress(0, None, "Applying exclusions")
+                unmatched, ambiguous = apply_exclusions(read_exclusions_file(exclusions_filename), ffighters)
+            return seed, ffighters, unmatched, ambiguous
+
+        def done(result):
+            self.seed, self.ffighters, unmatched, ambiguous = result
+            self.reset_analytics()
             self.update_ffighters_tree(self.ffighters)
-        except Exception as e:
-            self.logger.error(f"Error loading firefighter data: {e}")
-            messagebox.showerror("Error", "Failed to load firefighter data.")
-
-    def apply_exclusions(self, exclusions):
-        unmatched_exclusions = []
-        for exclusion in exclusions:
-            lname_excl = exclusion['LName'].lower()
-            fname_excl = exclusion['FName'].lower()
-            leave_start = exclusion['Leave Start']
-            leave_end = exclusion.get('Leave End')
-            reason = exclusion['Reason']
-            matched = False
-            for ff in self.ffighters:
-                lname_ff = ff.lname.lower()
-                fname_ff = ff.fname.lower()
-                last_name_match = SequenceMatcher(None, lname_excl, lname_ff).ratio() >= 0.8
-                first_name_match = SequenceMatcher(None, fname_excl, fname_ff).ratio() >= 0.8
-                swapped_names = fname_excl == lname_ff and lname_excl == fname_ff
-                if (last_name_match and first_name_match) or swapped_names:
-                    ff.add_exclusion(leave_start, leave_end, reason)
-                    self.logger.info(f"Exclusion '{fname_excl} {lname_excl}' applied to '{ff.fname} {ff.lname}'.")
-                    matched = True
-                    break
-            if not matched:
-                unmatched_exclusions.append(f"{exclusion['FName']} {exclusion['LName']}")
-        if unmatched_exclusions:
-            unmatched_str = "\n".join(unmatched_exclusions)
-            self.logger.warning(f"Unmatched exclusions:\n{unmatched_str}")
-            messagebox.showwarning("Unmatched Exclusions",
-                                   f"The following exclusions did not match any firefighter:\n{unmatched_str}")
+            if unmatched:
+                messagebox.showwarning("Unmatched Exclusions",
+                                       "The following exclusions did not match any firefighter:\n" + "\n".join(unmatched))
+            if ambiguous:
+                messagebox.showwarning("Ambiguous Exclusions",
+                                       "The following exclusions matched several firefighters and were not applied:\n"
+                                       + "\n".join(ambiguous))
+
+        self.run_in_background("Loading firefighters", work, done, "Failed to load firefighter data.")
 
     # ---------------------- Expanded Data Import Function ----------------------
     def read_firefighters_from_json(self):
@@ -183,65 +198,109 @@ class FirefighterApp:
         if not folder_selected:
             return  # User canceled selection
 
-        firefighter_data = []
-        json_files = [f for f in os.listdir(folder_selected) if f.endswith('.json')]
+        json_files = [f for f in os.listdir(folder_selected) if f.endswith(('.json', '.jsonl'))]
         # Filter out analysis files
         json_files = [f for f in json_files if "analysis" not in f.lower()]
 
         if not json_files:
             messagebox.showwarning("No JSON Files", "No valid firefighter JSON files found in the selected folder.")
             return
+        hr_filename = self.hr_filename
+
+        def work(task):
+            firefighter_data = []
+            for index, json_file in enumerate(json_files):
+                task.progress(index, len(json_files), f"Reading {json_file}")
+                file_path = os.path.join(folder_selected, json_file)
+                try:
+                    ff_list = read_ffighters_from_json(file_path)
+                    firefighter_data.extend(ff_list)
+                    self.logger.info(f"Loaded {len(ff_list)} firefighters from {json_file}")
+                except Exception as e:
+                    self.logger.error(f"Failed to read {json_file}: {e}")
+            if not firefighter_data:
+                return None
 
-        for json_file in json_files:
-            file_path = os.path.join(folder_selected, json_file)
-            try:
-                ff_list = read_ffighters_from_json(file_path)
-                firefighter_data.extend(ff_list)
-                self.logger.info(f"Loaded {len(ff_list)} firefighters from {json_file}")
-            except Exception as e:
-                self.logger.error(f"Failed to read {json_file}: {e}")
-
-        if firefighter_data:
             # Validate imported JSON data immediately using HR data
-            try:
-                hr_data = read_hr_validation(self.hr_filename)
-            except Exception as e:
-                self.logger.error(f"Failed to read HR file: {e}")
-                messagebox.showerror("Error", "Failed to load HR data for validation.")
+            task.progress(0, None, "Reading HR data")
+            hr_data = read_hr_validation(hr_filename)
+            validated_ffighters = validate_against_hr(
+                firefighter_data, hr_data, index=IdentityIndex.for_hr_file(hr_filename, hr_data, scorer="top_2"),
+                progress=lambda done, total: task.progress(done, total, f"Validating against HR: {done}/{total}"))
+            task.progress(0, None, "Reconstructing calendar")
+            return validated_ffighters, self.make_calendar_from_json(validated_ffighters)
+
+        def done(result):
+            if result is None:
+                messagebox.showwarning("No Data", "No valid firefighter data was loaded.")
                 return
-
-            validated_ffighters = validate_against_hr(firefighter_data, hr_data)
-            self.ffighters = validated_ffighters
-            self.make_calendar_from_json()
+            self.ffighters, self.shift_calendars = result
+            self.reset_analytics(self.ffighters)
             self.update_ffighters_tree(self.ffighters)
-            messagebox.showinfo("Success", f"Loaded {len(validated_ffighters)} firefighters, validated them, and recreated calendar.")
-        else:
-            messagebox.showwarning("No Data", "No valid firefighter data was loaded.")
+            messagebox.showinfo("Success", f"Loaded {len(self.ffighters)} firefighters, validated them, and recreated calendar.")
+
+        self.run_in_background("Reading JSON", work, done, "Failed to load, validate or rebuild the JSON data.")
+
+    def make_calendar_from_json(self, ffighters):
+        """Rebuilds the per-shift calendars from the approved picks of loaded firefighters."""
+        shift_calendars = {}
+        for shift in ["A", "B", "C"]:
+            shift_members = [ff for ff in ffighters if ff.shift == shift]
+            shift_calendars[shift] = recreate_calendar_from_json(shift_members)
+        return shift_calendars
+
+    def load_snapshot(self):
+        snapshot_path = filedialog.askopenfilename(initialdir="./output", title="Select Draft Snapshot",
+                                                   filetypes=[("Draft snapshots", "*.vsnap")])
+        if not snapshot_path:
+            return  # User canceled selection
+        try:
+            self.ffighters, self.shift_calendars = load_snapshot(snapshot_path)
+            self.reset_analytics(self.ffighters)
+            self.update_ffighters_tree(self.ffighters)
+            messagebox.showinfo("Success", f"Restored {len(self.ffighters)} firefighters and their calendars from snapshot.")
+        except Exception as e:
+            self.logger.exception("Error loading snapshot")
+            messagebox.showerror("Error", f"Failed to load snapshot.\n\nError: {e}")
 
-    def make_calendar_from_json(self):
+    def save_snapshot(self):
+        if not self.shift_calendars:
+            messagebox.showwarning("No Calendar Found", "Please generate a schedule first.")
+            return
+        runtime_str = datetime.now().strftime("%Y.%m.%d %H.%M")
+        snapshot_path = filedialog.asksaveasfilename(initialdir="./output", initialfile=f"{runtime_str}-draft.vsnap",
+                                                     title="Save Draft Snapshot", defaultextension=".vsnap",
+                                                     filetypes=[("Draft snapshots", "*.vsnap")])
+        if not snapshot_path:
+            return
         try:
-            self.shift_calendars = {}
-            for shift in ["A", "B", "C"]:
-                shift_members = [ff for ff in self.ffighters if ff.shift == shift]
-                self.shift_calendars[shift] = recreate_calendar_from_json(shift_members)
-            messagebox.showinfo("Success", "Calendar reconstructed from JSON and stored in memory.")
+            save_snapshot(snapshot_path, self.ffighters, self.shift_calendars)
+            messagebox.showinfo("Success", f"Draft snapshot saved to {snapshot_path}")
         except Exception as e:
-            self.logger.error(f"Error reconstructing calendar", exc_info=True)
-            messagebox.showerror("Error", "Failed to reconstruct calendar from JSON.")
+            self.logger.exception("Error saving snapshot")
+            messagebox.showerror("Error", f"Failed to save snapshot.\n\nError: {e}")
+
+    def reset_analytics(self, decided_ffighters=()):
+        """Starts fresh aggregates, seeded with the determinations already made for decided_ffighters."""
+        self.analytics = OnlineAnalytics()
+        self.analytics.observe(decided_ffighters)
 
     # ---------------------- Common Actions ----------------------
     def validate_firefighters(self):
         if not self.ffighters:
             messagebox.showwarning("No Firefighters Loaded", "Please load firefighter data before validating.")
             return
-        try:
-            self.logger.debug(f"Reading HR validation data from file: {self.hr_filename}")
-            hr_data = read_hr_validation(self.hr_filename)
+        ffighters, hr_filename = self.ffighters, self.hr_filename
+        verified_filename = f"{self.pick_filename.split('.')[0]}-Verified.csv"
+
+        def work(task):
+            self.logger.debug(f"Reading HR validation data from file: {hr_filename}")
+            task.progress(0, None, "Reading HR data")
+            hr_data = read_hr_validation(hr_filename)
             self.logger.debug(f"HR validation data loaded. Entries: {len(hr_data)}")
-            validated_ffighters = validate_against_hr(self.ffighters, hr_data)
-            self.ffighters = validated_ffighters
-            self.update_ffighters_tree(validated_ffighters)
-            verified_filename = f"{self.pick_filename.split('.')[0]}-Verified.csv"
+            validated_ffighters = validate_against_hr(
+                ffighters, hr_data, index=IdentityIndex.for_hr_file(hr_filename, hr_data, scorer="top_2"),
+                progress=lambda done, total: task.progress(done, total, f"Validating against HR: {done}/{total}"))
             self.logger.debug(f"Writing validated data to: {verified_filename}")
             with open(verified_filename, 'w', newline='') as csvfile:
                 writer = csv.writer(csvfile)
@@ -249,54 +308,160 @@ class FirefighterApp:
                 for ff in validated_ffighters:
                     writer.writerow([ff.idnum, ff.name, ff.hireDate, ff.rank, ff.shift, ff.max_shifts_off, ff.approved_shifts_count])
             self.logger.info(f"Validated data written to {verified_filename}")
-        except Exception as e:
-            self.logger.error(f"Error validating firefighter data: {e}")
-            messagebox.showerror("Error", "Failed to validate firefighter data.")
+            return validated_ffighters
+
+        def done(validated_ffighters):
+            self.ffighters = validated_ffighters
+            self.update_ffighters_tree(validated_ffighters)
+
+        self.run_in_background("Validating firefighters", work, done, "Failed to validate firefighter data.")
 
     def process_selections(self):
         if not self.shift_calendars:
             messagebox.showwarning("No Calendar Found", "Please generate a schedule first.")
             return
-        try:
+        ffighters, shift_calendars = self.ffighters, dict(self.shift_calendars)
+
+        def work(task):
             self.logger.info("Analyzing results and saving outputs.")
             all_ffighters = []
             runtime_str = datetime.now().strftime("%Y.%m.%d %H.%M")
-            for shift, calendar_data in self.shift_calendars.items():
-                shift_ffighters = [ff for ff in self.ffighters if ff.shift == shift]
-                all_ffighters.extend(shift_ffighters)
-                write_ffighters_to_json(shift_ffighters, f'{shift}_ffighters', ".//output", runtime_str)
-                write_calendar_to_csv(calendar_data["calendar"], shift, ".//output", runtime_str)
-                write_runner_ups_to_csv(calendar_data["calendar"], shift, ".//output", runtime_str)
-                write_picks_to_csv(shift_ffighters, shift, ".//output", runtime_str)
-                # Write supplemental-only picks using a filter function:
-                write_picks_to_csv(shift_ffighters, f'{shift}_supplemental', ".//output", runtime_str,
-                                pick_filter=lambda pick: pick.source and pick.source.lower() == "supplemental")
-                print_final(shift_ffighters)
-            analysis = analyze_results(all_ffighters)
-            write_analysis_to_json(analysis, ".//output", runtime_str)
-            display_dashboard(analysis)
+            write_path = ".//output"
+            manifest = RunManifest(runtime_str, write_path, seed=self.seed)
+            for input_file in (self.pick_filename, self.hr_filename, self.exclusions_filename):
+                manifest.add_input(input_file)
+            with manifest.stage("write_outputs"):
+                for index, (shift, calendar_data) in enumerate(shift_calendars.items()):
+                    task.progress(index, len(shift_calendars), f"Writing {shift} shift outputs")
+                    shift_ffighters = [ff for ff in ffighters if ff.shift == shift]
+                    all_ffighters.extend(shift_ffighters)
+                    manifest.add_output(write_ffighters_to_json(shift_ffighters, f'{shift}_ffighters', write_path, runtime_str),
+                                        "ffighters", shift)
+                    manifest.add_output(write_calendar_to_csv(calendar_data["calendar"], shift, write_path, runtime_str),
+                                        "calendar", shift)
+                    manifest.add_output(write_runner_ups_to_csv(calendar_data["calendar"], shift, write_path, runtime_str),
+                                        "runner_ups", shift)
+                    manifest.add_output(write_picks_to_csv(shift_ffighters, shift, write_path, runtime_str), "picks", shift)
+                    # Write supplemental-only picks using a filter function:
+                    manifest.add_output(write_picks_to_csv(shift_ffighters, f'{shift}_supplemental', write_path, runtime_str,
+                                        pick_filter=lambda pick: pick.source and pick.source.lower() == "supplemental"),
+                                        "supplemental_picks", shift)
+                    manifest.add_output(write_telestaff_import_for_ffighters(shift_ffighters, shift, write_path, runtime_str),
+                                        "telestaff_import", shift)
+                    print_final(shift_ffighters)
+            task.progress(len(shift_calendars), len(shift_calendars), "Saving analysis")
+            with manifest.stage("analyze"):
+                self.analytics.add_ffighters(all_ffighters)
+                analysis = self.analytics.as_dict()
+            manifest.add_output(write_analysis_to_json(analysis, write_path, runtime_str), "analysis")
+            manifest.write()
+            RunCatalog(write_path).apply_retention(keep=retained_runs)
+            return analysis
+
+        def done(analysis):
             self.logger.info("Results analysis and saving complete.")
             messagebox.showinfo("Success", "Results analyzed and saved.")
-        except Exception as e:
-            self.logger.exception("Error analyzing results")
-            messagebox.showerror("Error", "Failed to analyze and save results.")
+            display_dashboard(analysis)
+
+        self.run_in_background("Saving outputs", work, done, "Failed to analyze and save results.")
 
 
     def make_calendar(self):
         if not self.ffighters:
             messagebox.showwarning("No Firefighters Loaded", "Please load firefighter data before generating a schedule.")
             return
-        try:
-            prioritized_ffighters = set_priorities(self.ffighters)
+        # Drafting writes into these dicts as it goes, so a schedule cancelled at the end
+        # of a round is still consistent and "Generate Schedule" resumes from it.
+        for shift in ["A", "B", "C"]:
+            self.shift_calendars.setdefault(shift, {"calendar": {}, "rejected": {}})
+        ffighters, shift_calendars, analytics = self.ffighters, self.shift_calendars, self.analytics
+
+        def work(task):
+            prioritized_ffighters = set_priorities(ffighters)
+            analytics.add_ffighters(prioritized_ffighters)
+            total = sum(len(ff.picks) for ff in prioritized_ffighters)
+            decided = 0
+
+            def report_round(batch):
+                nonlocal decided
+                for event in batch:
+                    if event.kind in events.DECISION_KINDS:
+                        decided += 1
+                    elif event.kind == events.ROUND_ENDED:
+                        # Rounds are the cancellation points: every pick so far is fully decided
+                        task.progress(decided, total, f"{shift} shift: round {event.round_number}, "
+                                                      f"{event.remaining} firefighters with picks left")
+
             for shift in ["A", "B", "C"]:
-                existing_data = self.shift_calendars.get(shift, {})
                 shift_members = [ff for ff in prioritized_ffighters if ff.shift == shift]
-                # Pass the safely retrieved existing_data
-                self.shift_calendars[shift] = make_calendar(shift_members, existing_calendar_data=existing_data, count=1)
+                make_calendar(shift_members, existing_calendar_data=shift_calendars[shift], count=1,
+                              subscribers=[report_round, analytics.on_events])
+
+        def done(result):
+            # Drafting moved picks to processed and set determinations; refresh the pick counts,
+            # the open firefighter's picks and the determination search
+            self.update_ffighters_tree(self.ffighters)
             messagebox.showinfo("Success", "Schedule successfully generated and stored in memory.")
-        except Exception as e:
-            self.logger.exception("Error generating schedule") 
-            messagebox.showerror("Error", f"Failed to generate schedule.\n\nError: {e}\n\nSee logs for full details.")
+
+        self.run_in_background("Generating schedule", work, done, "Failed to generate schedule.")
+
+    # ---------------------- Background Work ----------------------
+    def run_in_background(self, description, work, on_done, error_message):
+        """
+        Runs work(task) on a worker thread while the window stays responsive.
+        Action buttons are disabled and the progress bar follows task.progress() until it finishes.
+        """
+        if self.task is not None and self.task.running:
+            messagebox.showwarning("Busy", "Please wait for the current task to finish or cancel it.")
+            return
+
+        def on_error(error, details):
+            self.logger.error(f"{description} failed:\n{details}")
+            self.status_label.config(text=f"{description} failed.")
+            messagebox.showerror("Error", f"{error_message}\n\nError: {error}\n\nSee logs for full details.")
+
+        def on_success(result):
+            self.status_label.config(text=f"{description} complete.")
+            on_done(result)
+
+        def on_cancelled():
+            self.logger.info(f"{description} cancelled.")
+            self.status_label.config(text=f"{description} cancelled.")
+            self.update_ffighters_tree(self.ffighters)  # A draft cancelled at a round end has still decided picks
+
+        def on_finished():
+            self.task = None
+            self.set_busy(False)
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", value=0)
+
+        self.set_busy(True)
+        self.status_label.config(text=f"{description}...")
+        self.progress_bar.config(mode="indeterminate")
+        self.progress_bar.start(20)
+        self.task = BackgroundTask(self.root, work, on_success, on_error=on_error, on_progress=self.show_progress,
+                                   on_cancelled=on_cancelled, on_finished=on_finished).start()
+
+    def show_progress(self, done, total, message):
+        if total:
+            if str(self.progress_bar.cget("mode")) != "determinate":
+                self.progress_bar.stop()
+                self.progress_bar.config(mode="determinate")
+            self.progress_bar.config(maximum=total, value=done)
+        if message:
+            self.status_label.config(text=message)
+
+    def cancel_task(self):
+        if self.task is not None and self.task.running:
+            self.task.cancel()
+            self.status_label.config(text="Cancelling...")
+
+    def set_busy(self, busy):
+        state = tk.DISABLED if busy else tk.NORMAL
+        for button in (self.load_button, self.read_json_button, self.load_snapshot_button, self.validate_button,
+                       self.generate_schedule_button, self.export_button, self.save_snapshot_button):
+            button.config(state=state)
+        self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
 
     # ---------------------- Data Display ----------------------
     def setup_ffighter_tree_view(self, parent):
@@ -305,8 +470,12 @@ class FirefighterApp:
         columns = ["ID", "Name", "Rank", "Max Shifts Off", "Shift", "Number of Picks", "Exclusions"]
         headings = columns
         widths = [50, 120, 80, 100, 50, 80, 200]
-        self.ff_tree = create_treeview(self.ff_tree_frame, columns, headings, widths)
-        self.ff_tree.bind('<<TreeviewSelect>>', self.on_ffighter_select)
+        # Search by ID, name, rank, shift, or the determination of any of the firefighter's picks
+        self.ff_view = VirtualTreeView(self.ff_tree_frame, columns, headings, widths,
+                                       search_columns=(0, 1, 2, 4), extra_terms=self.pick_determinations,
+                                       search_label="Search (name, ID, rank, shift, determination):")
+        self.ff_tree = self.ff_view.tree
+        self.ff_view.bind_select(self.on_ffighter_select)
 
     def setup_pick_tree_view(self, parent):
         self.pick_tree_frame = tk.Frame(parent)
@@ -315,17 +484,18 @@ class FirefighterApp:
         columns = ["Date", "Type", "Determination", "Reason", "Increments", "Source"]
         headings = columns
         widths = [100, 80, 120, 150, 100, 150]  # Adjust widths as needed
-        self.pick_tree = create_treeview(self.pick_tree_frame, columns, headings, widths)
+        self.pick_view = VirtualTreeView(self.pick_tree_frame, columns, headings, widths)
+        self.pick_tree = self.pick_view.tree
 
     def update_ffighters_tree(self, ffighters):
-        update_treeview_data(self.ff_tree, [], clear_first=True)
+        rows = []
         for ff in ffighters:
             num_picks = len(ff.picks)
             exclusions_display = format_exclusions(getattr(ff, "exclusions", []))
             display_rank = self.get_display_value(ff, 'Rank')
             display_max_shifts_off = self.get_display_value(ff, 'Max Shifts Off')
             display_shift = self.get_display_value(ff, 'Shift')
-            self.ff_tree.insert('', 'end', values=(
+            rows.append((ff, (
                 ff.idnum,
                 ff.name,
                 display_rank,
@@ -333,18 +503,22 @@ class FirefighterApp:
                 display_shift,
                 num_picks,
                 exclusions_display
-            ))
+            )))
+        self.ff_view.set_rows(rows)
+        # Validation and drafting change picks in place; refresh the open firefighter's picks
+        if self.ff_view.selected_key is not None:
+            self.update_pick_tree(self.ff_view.selected_key)
+
+    def pick_determinations(self, ff):
+        return " ".join({pick.determination for pick in ff.processed + ff.picks})
 
-    def on_ffighter_select(self, event):
-        selected_item = self.ff_tree.selection()
-        if selected_item:
-            ff_id = self.ff_tree.item(selected_item)['values'][0]
-            ff = next((f for f in self.ffighters if str(f.idnum) == str(ff_id)), None)
-            if ff:
-                self.update_pick_tree(ff)
+    def on_ffighter_select(self, ff):
+        if ff is not None:
+            self.pick_view.offset = 0
+            self.update_pick_tree(ff)
 
     def update_pick_tree(self, ff):
-        update_treeview_data(self.pick_tree, [], clear_first=True)
+        rows = []
         if hasattr(ff, 'processed') and hasattr(ff, 'picks'):
             for pick in ff.processed + ff.picks:
                 if pick.determination == "Unaddressed":
@@ -355,14 +529,15 @@ class FirefighterApp:
                     determination_display = "🔴 Rejected"
                 else:
                     determination_display = pick.determination
-                self.pick_tree.insert('', 'end', values=(
+                rows.append((pick, (
                     pick.format_date_display(),
                     pick.type,
                     determination_display,
                     pick.reason if pick.reason else "N/A",
                     pick.increments_plain_text(),
                     pick.source
-                ))
+                )))
+        self.pick_view.set_rows(rows)
 
     def get_display_value(self, ff, field_name):
         if ff.hr_validations and field_name in ff.hr_validations:
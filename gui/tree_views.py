@@ -1,4 +1,5 @@
 # gui/tree_views.py
+import bisect
 import tkinter as tk
 from tkinter import ttk
 
@@ -49,3 +50,186 @@ def format_exclusions(exclusions):
         for excl in exclusions
     )
     return formatted
+
+
+class RowIndex:
+    """
+    Token index over a list of rows for instant search.
+    Each searchable cell is split into lowercase words; a query matches a row when every
+    query word is a prefix of one of the row's words.  `extra_terms(key)` may add searchable
+    text that is not shown in a column.
+    """
+
+    def __init__(self, rows, search_columns, extra_terms=None):
+        postings = {}
+        for position, (key, values) in enumerate(rows):
+            texts = [str(values[column]) for column in search_columns]
+            if extra_terms is not None:
+                texts.append(extra_terms(key))
+            for text in texts:
+                for token in text.lower().replace(',', ' ').split():
+                    postings.setdefault(token, set()).add(position)
+        self.tokens = sorted(postings)
+        self.postings = postings
+
+    def _prefix_matches(self, prefix):
+        matches = set()
+        start = bisect.bisect_left(self.tokens, prefix)
+        for token in self.tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self.postings[token]
+        return matches
+
+    def search(self, query):
+        """Returns the sorted row positions matching every word of the query."""
+        result = None
+        for word in query.lower().replace(',', ' ').split():
+            matches = self._prefix_matches(word)
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        return sorted(result) if result is not None else None
+
+
+class VirtualTreeView:
+    """
+    A Treeview that only renders the rows currently visible.
+
+    Rows are (key, values) pairs kept in Python; the widget holds one item per visible line
+    and scrolling just rewrites those items, so a set_rows() with tens of thousands of rows
+    costs no more than a screenful of Tk calls. An optional search box filters the rows through
+    a RowIndex on `search_columns` (column positions) and `extra_terms`.
+    """
+
+    def __init__(self, parent, columns, headings, column_widths, search_columns=(), extra_terms=None,
+                 search_label="Search:"):
+        self.frame = tk.Frame(parent)
+        self.frame.pack(fill='both', expand=True)
+
+        self.search_var = None
+        if search_columns:
+            search_frame = tk.Frame(self.frame)
+            search_frame.pack(fill='x', padx=5)
+            tk.Label(search_frame, text=search_label).pack(side='left')
+            self.search_var = tk.StringVar()
+            self.search_var.trace_add('write', lambda *args: self.apply_filter())
+            tk.Entry(search_frame, textvariable=self.search_var).pack(side='left', fill='x', expand=True, padx=5)
+
+        table_frame = tk.Frame(self.frame)
+        table_frame.pack(fill='both', expand=True)
+        self.scrollbar_y = ttk.Scrollbar(table_frame, orient='vertical', command=self.yview)
+        self.scrollbar_y.pack(side='right', fill='y')
+        self.tree = create_treeview(table_frame, columns, headings, column_widths, scroll_y=False)
+
+        self.search_columns = search_columns
+        self.extra_terms = extra_terms
+        self.rows = []           # All (key, values) rows
+        self.index = None        # RowIndex over self.rows, built lazily on first search
+        self.visible_rows = []   # Rows after filtering
+        self.offset = 0          # First visible row
+        self.page_size = 20      # Lines that fit in the widget, updated on resize
+        self.slots = []          # Item ids of the rendered lines
+        self.rendered = []       # (key, values) currently shown in each slot
+        self.selected_key = None
+        self.select_callbacks = []
+        self.pending_selects = 0  # <<TreeviewSelect>> events still queued from our own selection changes
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self._scroll_units(-1 if event.delta > 0 else 1))
+        self.tree.bind('<Button-4>', lambda event: self._scroll_units(-1))
+        self.tree.bind('<Button-5>', lambda event: self._scroll_units(1))
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+
+    def bind_select(self, callback):
+        """Calls callback(key) when the user selects a row."""
+        self.select_callbacks.append(callback)
+
+    # ----- Data -----
+    def set_rows(self, rows):
+        """Replaces the rows.  Only visible lines whose values changed are redrawn."""
+        self.rows = list(rows)
+        self.index = None
+        self.apply_filter(keep_offset=True)
+
+    def apply_filter(self, keep_offset=False):
+        query = self.search_var.get().strip() if self.search_var is not None else ""
+        if query:
+            if self.index is None:
+                self.index = RowIndex(self.rows, self.search_columns, self.extra_terms)
+            positions = self.index.search(query)
+            self.visible_rows = [self.rows[position] for position in positions]
+        else:
+            self.visible_rows = self.rows
+        if not keep_offset:
+            self.offset = 0
+        self._render()
+
+    # ----- Rendering -----
+    def _render(self):
+        self.offset = max(0, min(self.offset, len(self.visible_rows) - self.page_size))
+        window = self.visible_rows[self.offset:self.offset + self.page_size]
+
+        # Grow or shrink the pool of rendered items to the window size
+        while len(self.slots) < len(window):
+            self.slots.append(self.tree.insert('', 'end', values=()))
+            self.rendered.append(None)
+        while len(self.slots) > len(window):
+            self.tree.delete(self.slots.pop())
+            self.rendered.pop()
+
+        selected_slot = None
+        for slot, row in enumerate(window):
+            if self.rendered[slot] != row:
+                self.tree.item(self.slots[slot], values=row[1])
+                self.rendered[slot] = row
+            if row[0] is self.selected_key:
+                selected_slot = self.slots[slot]
+
+        # Keep the selection on the same row while scrolling.  Tk still queues a
+        # <<TreeviewSelect>> for the change; _on_select skips it so callbacks only see the user's
+        current = self.tree.selection()
+        if selected_slot is None and current:
+            self.pending_selects += 1
+            self.tree.selection_remove(current)
+        elif selected_slot is not None and current != (selected_slot,):
+            self.pending_selects += 1
+            self.tree.selection_set(selected_slot)
+
+        total = len(self.visible_rows)
+        if total:
+            self.scrollbar_y.set(self.offset / total, min(1.0, (self.offset + self.page_size) / total))
+        else:
+            self.scrollbar_y.set(0.0, 1.0)
+
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        page_size = max(1, (event.height - row_height) // row_height)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self._render()
+
+    def _on_select(self, event):
+        if self.pending_selects:
+            self.pending_selects -= 1
+            return
+        selection = self.tree.selection()
+        if selection and selection[0] in self.slots:
+            row = self.rendered[self.slots.index(selection[0])]
+            self.selected_key = row[0] if row else None
+        for callback in self.select_callbacks:
+            callback(self.selected_key)
+
+    # ----- Scrolling -----
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.visible_rows))
+        elif args[0] == 'scroll':
+            step = self.page_size if args[2] == 'pages' else 1
+            self.offset += int(args[1]) * step
+        self._render()
+
+    def _scroll_units(self, units):
+        self.offset += units * 3
+        self._render()
+        return 'break'
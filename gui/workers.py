@@ -0,0 +1,109 @@
+# workers.py
+# Runs long GUI actions on a worker thread.
+#
+# Tk is not thread safe, so the worker never touches widgets: progress and results are
+# put on a queue, and the Tk main loop drains it with root.after().
+import queue
+import threading
+import traceback
+
+
+class TaskCancelled(BaseException):
+    """
+    Raised inside the worker (from BackgroundTask.progress) once the user has cancelled.
+    Like KeyboardInterrupt it is not an Exception, so the readers' `except Exception`
+    error handling does not swallow it.
+    """
+
+
+class BackgroundTask:
+    """
+    Runs work(task) on a daemon thread.
+
+    Args:
+        root: Tk root, used to poll for results on the main thread
+        work: Callable taking this task; its return value is passed to on_done
+        on_done: Called on the main thread with the result
+        on_error: Called on the main thread with (exception, formatted traceback)
+        on_progress: Called on the main thread with (done, total, message); total may be None
+        on_cancelled: Called on the main thread if the work stopped because of cancel()
+        on_finished: Called on the main thread after any of the above
+    """
+    poll_interval_ms = 50
+
+    def __init__(self, root, work, on_done, on_error=None, on_progress=None, on_cancelled=None, on_finished=None):
+        self.root = root
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancelled = on_cancelled
+        self.on_finished = on_finished
+        self.messages = queue.Queue()
+        self.cancel_requested = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.root.after(self.poll_interval_ms, self._poll)
+        return self
+
+    def cancel(self):
+        """Asks the worker to stop at its next progress() call."""
+        self.cancel_requested.set()
+
+    def progress(self, done, total=None, message=None):
+        """
+        Called from the worker.  Reports progress and is the cancellation point:
+        raises TaskCancelled if cancel() was requested.
+        """
+        if self.cancel_requested.is_set():
+            raise TaskCancelled()
+        self.messages.put(("progress", (done, total, message)))
+
+    def _run(self):
+        try:
+            result = self.work(self)
+        except TaskCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as e:
+            self.messages.put(("error", (e, traceback.format_exc())))
+        else:
+            self.messages.put(("done", result))
+
+    def _poll(self):
+        latest_progress = None
+        outcome = None
+        while outcome is None:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest_progress = payload  # Only the newest progress is worth drawing
+            else:
+                outcome = (kind, payload)
+
+        if latest_progress is not None and self.on_progress:
+            self.on_progress(*latest_progress)
+
+        if outcome is None:
+            self.root.after(self.poll_interval_ms, self._poll)
+            return
+
+        kind, payload = outcome
+        try:
+            if kind == "done":
+                self.on_done(payload)
+            elif kind == "cancelled" and self.on_cancelled:
+                self.on_cancelled()
+            elif kind == "error" and self.on_error:
+                self.on_error(*payload)
+        finally:
+            if self.on_finished:
+                self.on_finished()
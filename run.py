@@ -1,10 +1,14 @@
 # main.py
+import sys
 from datetime import datetime
-import tkinter as tk
 from vacation_selection.setup_logging import setup_logging
-from gui.firefighter_gui import FirefighterApp
 
 def main():
+    # The GUI (and the pandas/numpy it loads) is only imported when it is started, so the
+    # headless command line below starts as fast as python -m vacation_selection.main
+    import tkinter as tk
+    from gui.firefighter_gui import FirefighterApp
+
     runtime = datetime.now().strftime("%Y.%m.%d %H.%M")
     write_path = ".//output"
     logger = setup_logging(f"RunLog-{runtime}.log", base=write_path, debug=False)
@@ -14,4 +18,9 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        # Headless: python run.py --picks picks.csv --hr hr.xlsx --format 2025 [--exclusions leave.xlsx] [--seed N]
+        from vacation_selection.main import cli
+        cli()
+    else:
+        main()
@@ -1,54 +1,216 @@
-import json
+"""
+Restores the `place` (position within the day on the calendar) of approved picks in
+firefighter JSON files from the calendar CSVs written by a draft.
+
+Usage:
+    python add_place_to_json_from_calendar.py --json A.json B.json C.json \
+        --calendar calendar-A.csv calendar-B.csv calendar-C.csv --year 2025 --output-dir ./Output
+
+The calendars are read once into an exact index keyed by date, increment and "lname, f - id"
+(the format the calendar cells are written in), so every pick of every shift is placed with a
+dictionary lookup.  Only picks without an exact hit fall back to fuzzy matching against the
+cells of their own row.  --year is required when the calendars show 48-hour dates.
+"""
+import argparse
 import csv
+import json
+import os
+import re
+import sys
+
 from fuzzywuzzy import fuzz
 
-# --- Load JSON Data ---
-with open("test.JSON", "r") as json_file:
-    data = json.load(json_file)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Allow imports from vacation_selection
+from vacation_selection.dates import DateParser
+
+FUZZY_THRESHOLD = 90
+
+iso_date_parser = DateParser(formats=('%Y-%m-%d',))
+# 48-hour shift rows show "Oct 28-29" or "Dec 31-Jan 01"; the year comes from the season
+month_day_parser = DateParser(formats=('%b %d %Y',))
+
+# Trailing "(FULL)" / "(AM)" style annotation of a calendar cell or date
+ANNOTATION = re.compile(r"\s*\(([^()]*)\)\s*$")
+
+
+def normalize_key(text):
+    """Lowercase with single spaces, so "Jaeger,  B - 23" and "jaeger, b - 23" compare equal."""
+    return " ".join(str(text).lower().split())
+
 
-# --- Load Calendar CSV ---
-calendar = {}
-with open("calendar.csv", newline='') as csvfile:
-    reader = csv.DictReader(csvfile)
-    for row in reader:
-        date = row["Date"]
-        positions = [row[col] for col in reader.fieldnames if col != "Date" and row[col].strip()]
-        calendar[date] = positions
+def cell_key(cell):
+    """ "Jaeger, B - 23 (FULL)" -> "jaeger, b - 23" """
+    return normalize_key(ANNOTATION.sub("", cell))
 
-# --- Fuzzy Matching Helper ---
 
 def build_match_string(fighter):
     """
     Constructs a string from fighter data to match against the calendar.
     Example: "Jaeger, B - 23" for matching "Jaeger, B - 23 (FULL)".
     """
-    return f"{fighter['lname']}, {fighter['fname'][0]} - {fighter['idnum']}"
-
-def get_place(date, fighter):
-    """
-    For a given date, returns the index of the calendar entry that
-    fuzzy matches the fighter's info. Uses a threshold to decide a match.
-    Returns None if no good match is found.
-    """
-    day = calendar.get(date)
-    if not day:
-        return None
-    
-    target = build_match_string(fighter)
-    for idx, cell in enumerate(day):
-        # Check if the target is a substring or fuzzy match exceeds 90.
-        if target in cell or fuzz.partial_ratio(target, cell) > 90:
-            return idx
-    return None
-
-# --- Update Processed Picks ---
-for fighter in data:
-    for pick in fighter.get("processed", []):
-        if pick.get("determination") == "Approved":
-            pick["place"] = get_place(pick.get("date"), fighter)
-        else:
-            pick["place"] = None
-
-# --- Save Updated Data ---
-with open("updated_test.json", "w") as outfile:
-    json.dump(data, outfile, indent=4)
+    return f"{fighter['lname']}, {(fighter.get('fname') or ' ')[0]} - {fighter['idnum']}"
+
+
+def build_name_string(fighter):
+    """ "Jaeger, B": multi-increment calendar rows show names without the ID. """
+    return f"{fighter['lname']}, {(fighter.get('fname') or ' ')[0]}"
+
+
+def parse_row_label(label, year=None):
+    """
+    (date as "YYYY-MM-DD", increment name or None) of a calendar row, or (None, None) if the
+    date cannot be read.  Accepts "2025-01-05", "2025-01-05 (day_1)" and, with `year`,
+    "Oct 28-29 (day_2)" / "Dec 31-Jan 01".  Raises ValueError for a 48-hour date without `year`.
+    """
+    match = ANNOTATION.search(label)
+    increment = match.group(1).strip() if match else None
+    text = ANNOTATION.sub("", label).strip()
+    try:
+        return iso_date_parser.parse(text).isoformat(), increment
+    except ValueError:
+        pass
+    month_day = text.split('-')[0].strip()
+    try:
+        day = month_day_parser.parse(f"{month_day} {year or 2000}")
+    except ValueError:
+        return None, None
+    if year is None:
+        raise ValueError(f"Calendar row '{label}' has a 48-hour date; pass --year")
+    return day.isoformat(), increment
+
+
+class CalendarPlaces:
+    """
+    Index of calendar cells, per date and increment (the annotation of the row label, None
+    for calendars with a single increment).
+
+    exact: (date, increment, "lname, f - id") -> place, the firefighter's position in that row
+    names: (date, increment, "lname, f") -> places, for rows written without IDs
+    cells: (date, increment) -> [(place, cell key)] for the fuzzy fallback
+    increments: date -> increment names in row order
+    """
+
+    def __init__(self):
+        self.exact = {}
+        self.names = {}
+        self.cells = {}
+        self.increments = {}
+        self.skipped_rows = 0
+
+    def add_csv(self, calendar_path, year=None):
+        with open(calendar_path, newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None)  # Header
+            for row in reader:
+                if not row:
+                    continue
+                date, increment = parse_row_label(row[0], year)
+                if date is None:
+                    self.skipped_rows += 1
+                    continue
+                self.increments.setdefault(date, []).append(increment)
+                for place, cell in enumerate(cell for cell in row[1:] if cell.strip()):
+                    key = cell_key(cell)
+                    self.exact.setdefault((date, increment, key), place)
+                    self.names.setdefault((date, increment, key.split(" - ")[0]), set()).add(place)
+                    self.cells.setdefault((date, increment), []).append((place, key))
+        return self
+
+    def granted_increment(self, date, increments_text=None):
+        """
+        The increment whose row holds the pick's place.  The draft writes a pick's place once
+        per granted increment, in row order, so the last granted increment's position is the
+        one that sticks.  "FULL" (or no text) grants every increment of the day; otherwise the
+        text names them joined with "+".
+        """
+        rows = self.increments.get(date, [])
+        if not rows:
+            return None
+        if increments_text and increments_text != "FULL":
+            granted = set(increments_text.split("+"))
+            rows = [increment for increment in rows if increment in granted] or rows
+        return rows[-1]
+
+    def place_of(self, date, fighter, increments_text=None, threshold=FUZZY_THRESHOLD):
+        """Returns (place, how) where how is "exact", "name", "fuzzy" or None."""
+        increment = self.granted_increment(date, increments_text)
+        target = normalize_key(build_match_string(fighter))
+        place = self.exact.get((date, increment, target))
+        if place is not None:
+            return place, "exact"
+
+        places = self.names.get((date, increment, normalize_key(build_name_string(fighter))))
+        if places and len(places) == 1:
+            return next(iter(places)), "name"
+
+        for place, key in self.cells.get((date, increment), []):
+            if target in key or fuzz.partial_ratio(target, key) > threshold:
+                return place, "fuzzy"
+        return None, None
+
+
+def assign_places(records, places, threshold=FUZZY_THRESHOLD):
+    """
+    Sets `place` on every processed pick of every record: the calendar position for approved
+    picks (None if not found), None otherwise.  Returns counts per match kind.
+    """
+    counts = {"exact": 0, "name": 0, "fuzzy": 0, "missing": 0}
+    for fighter in records:
+        for pick in fighter.get("processed", []):
+            if pick.get("determination") != "Approved":
+                pick["place"] = None
+                continue
+            pick["place"], how = places.place_of(pick.get("date"), fighter, pick.get("increments"), threshold)
+            counts[how or "missing"] += 1
+    return counts
+
+
+def restore_places(json_paths, calendar_paths, output_dir, year=None, threshold=FUZZY_THRESHOLD):
+    """
+    Places the picks of every JSON file against all calendars at once and writes
+    `{name}-placed.json` files to output_dir.  Returns (output paths, counts).
+    """
+    places = CalendarPlaces()
+    for calendar_path in calendar_paths:
+        places.add_csv(calendar_path, year)
+    if places.skipped_rows:
+        print(f"Skipped {places.skipped_rows} calendar rows with unreadable dates")
+
+    os.makedirs(output_dir, exist_ok=True)
+    totals = {}
+    outputs = []
+    for json_path in json_paths:
+        with open(json_path, "r") as json_file:
+            data = json.load(json_file)
+        for kind, count in assign_places(data, places, threshold).items():
+            totals[kind] = totals.get(kind, 0) + count
+
+        stem = os.path.splitext(os.path.basename(json_path))[0]
+        output_path = os.path.join(output_dir, f"{stem}-placed.json")
+        with open(output_path, "w") as outfile:
+            json.dump(data, outfile, indent=4)
+        outputs.append(output_path)
+    return outputs, totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Restore pick places in firefighter JSON files from calendar CSVs.")
+    parser.add_argument("--json", nargs="+", required=True, help="Firefighter JSON files (any shifts)")
+    parser.add_argument("--calendar", nargs="+", required=True, help="Calendar CSVs written by the draft")
+    parser.add_argument("--output-dir", default="./telestaff_to_json/Output")
+    parser.add_argument("--year", type=int,
+                        help="Season year; required for calendars showing 48-hour dates like 'Oct 28-29'")
+    parser.add_argument("--threshold", type=int, default=FUZZY_THRESHOLD, help="Fuzzy partial_ratio threshold")
+    args = parser.parse_args(argv)
+
+    try:
+        outputs, totals = restore_places(args.json, args.calendar, args.output_dir, args.year, args.threshold)
+    except ValueError as e:
+        parser.error(str(e))
+    for output_path in outputs:
+        print(f"Wrote {output_path}")
+    print("Approved picks placed: " + ", ".join(f"{kind} {count}" for kind, count in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# merge.py
+# Merges firefighter records from the current JSON, Telestaff and supplemental exports.
+#
+# Records are matched through one shift-grouped IdentityIndex, and every firefighter's picks
+# are indexed by (date, type, determination, increments), so each incoming pick is checked
+# for duplicates and same-day conflicts with dictionary lookups.
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Allow imports from vacation_selection
+from vacation_selection.identity import IdentityIndex
+
+
+def pick_key(pick):
+    """Identity of a pick when merging: (date, type, determination, increments)."""
+    return (pick.get("date"), pick.get("type"), pick.get("determination"), pick.get("increments"))
+
+
+def record_label(record):
+    return f"{record.get('fname', '')} {record.get('lname', '')}"
+
+
+class ReconciliationIndex:
+    """
+    ID and name indexes over the current JSON records, per shift, on the shared IdentityIndex.
+
+    Built once for a reconciliation; records added with add() become matchable
+    by later Telestaff records, as appending to current_data did before.
+    """
+
+    def __init__(self, current_data):
+        self.identities = IdentityIndex()
+        for record in current_data:
+            self.add(record)
+
+    def add(self, record):
+        """Indexes a record and returns its position."""
+        return self.identities.add(record.get("idnum"), record.get("fname", ""), record.get("lname", ""),
+                                   group=record.get("shift", ""))
+
+    def match(self, new_record, threshold=80):
+        """
+        Position of the record matching new_record within its shift, or None.
+        Tries the ID, then the exact name, then the best fuzzy full-name score >= threshold.
+        """
+        self.identities.threshold = threshold
+        match = self.identities.resolve(new_record.get("idnum"), new_record.get("fname", ""),
+                                        new_record.get("lname", ""), group=new_record.get("shift", ""))
+        return match.position if match else None
+
+
+class MergeReport:
+    """What a merge did: picks added, duplicates skipped, same-day conflicts, new and unmatched records."""
+
+    def __init__(self):
+        self.added = []        # "Name on date" per added pick
+        self.duplicates = 0
+        self.conflicts = []    # "Name on date: incoming key vs existing key(s)"
+        self.new_records = []  # Labels of records appended because nothing matched
+        self.not_found = []    # Labels of records skipped because nothing matched
+
+    def log_lines(self, title="Supplemental"):
+        lines = [f"{title} pick for {added} added." for added in self.added]
+        lines.append(f"\n{title} picks appended: {len(self.added)}.")
+        lines.append(f"{title} picks already present (skipped): {self.duplicates}.")
+        if self.conflicts:
+            lines.append(f"{title} picks on a day that already has a different pick (added, please review):")
+            lines.extend(" - " + conflict for conflict in self.conflicts)
+        if self.new_records:
+            lines.append(f"New records added from {title.lower()} data:")
+            lines.extend(" - " + record for record in self.new_records)
+        if self.not_found:
+            lines.append(f"No matching current record found for {title.lower()} entries:")
+            lines.extend(" - " + entry for entry in self.not_found)
+        return lines
+
+
+class PickMerger(ReconciliationIndex):
+    """
+    Merges incoming records into `records` (modified in place).
+
+    The pick index of a record is built the first time picks are merged into it, from its
+    "picks" and "processed" lists, so a reconciliation (compare_and_update) may run on the
+    same records with this index before merging.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.pick_keys = {}  # position -> {pick_key}
+        self.day_keys = {}   # position -> {date: [pick_key]}
+        super().__init__(records)
+
+    def add(self, record):
+        position = super().add(record)
+        if position >= len(self.records):
+            self.records.append(record)
+        return position
+
+    def _pick_index(self, position):
+        if position not in self.pick_keys:
+            record = self.records[position]
+            keys, days = set(), {}
+            for pick in record.get("processed", []) + record.get("picks", []):
+                key = pick_key(pick)
+                if key not in keys:
+                    keys.add(key)
+                    days.setdefault(key[0], []).append(key)
+            self.pick_keys[position], self.day_keys[position] = keys, days
+        return self.pick_keys[position], self.day_keys[position]
+
+    def merge_picks(self, position, picks, report, field="picks"):
+        """Appends the picks that are not already present to the record's `field` list."""
+        record = self.records[position]
+        keys, days = self._pick_index(position)
+        for pick in picks:
+            key = pick_key(pick)
+            if key in keys:
+                report.duplicates += 1
+                continue
+            same_day = days.get(key[0])
+            if same_day:
+                report.conflicts.append(f"{record_label(record)} on {key[0]}: {key[1:]} vs {[k[1:] for k in same_day]}")
+            record.setdefault(field, []).append(pick)
+            keys.add(key)
+            days.setdefault(key[0], []).append(key)
+            report.added.append(f"{record_label(record)} on {key[0]}")
+
+    def merge(self, incoming, add_unmatched=False, report=None):
+        """
+        Merges the "picks" of each incoming record into its matching record.
+        Unmatched records are appended (add_unmatched) or listed in report.not_found.
+        Returns the MergeReport.
+        """
+        report = report or MergeReport()
+        for record in incoming:
+            position = self.match(record)
+            if position is not None:
+                self.merge_picks(position, record.get("picks", []), report)
+            elif add_unmatched:
+                self.add(record)
+                report.new_records.append(f"{record_label(record)} (Shift: {record.get('shift', '')})")
+            else:
+                report.not_found.append(f"{record_label(record)} (Shift: {record.get('shift', '')})")
+        return report
@@ -1,28 +1,15 @@
+import os
 import pandas as pd
 import datetime
-from fuzzywuzzy import fuzz, process
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Allow imports from vacation_selection
+from vacation_selection.dates import detect_date_format, parse_date
 
-# --- Existing functions (load_hr_data, match_hr_entry, convert_to_pick_format, read_supplemental_export) ---
+# HR matching is shared with the Telestaff import
+from read_telestaff_export import load_hr_data, load_hr_index, match_hr_entry, match_hr_entries
+from merge import ReconciliationIndex, PickMerger
 
-def load_hr_data(hr_excel_path):
-    hr_df = pd.read_excel(hr_excel_path)
-    hr_df["Employee Name"] = hr_df["Employee Name"].astype(str)
-    hr_df["Last Name"] = hr_df["Employee Name"].apply(lambda x: x.split(',')[0].strip().upper())
-    hr_df["First Name"] = hr_df["Employee Name"].apply(
-        lambda x: x.split(',')[1].split()[0].strip().upper() if ',' in x and len(x.split(',')) > 1 else ""
-    )
-    hr_df["full_name"] = hr_df["First Name"] + " " + hr_df["Last Name"]
-    return hr_df
-
-def match_hr_entry(first_name, last_name, hr_df, threshold=80):
-    target_name = f"{first_name} {last_name}".upper()
-    choices = hr_df["full_name"].tolist()
-    best_match = process.extractOne(target_name, choices, scorer=fuzz.token_sort_ratio)
-    print(f"Target: {target_name}, Best Match: {best_match}")  # Debug print
-    if best_match and best_match[1] >= threshold:
-        hr_match = hr_df[hr_df["full_name"] == best_match[0]].iloc[0]
-        return hr_match
-    return None
+# --- Existing functions (convert_to_pick_format, read_supplemental_export) ---
 
 def convert_to_pick_format(day_date, selection_value):
     """
@@ -92,7 +79,16 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
     print("Detected groups:", groups)
     
     hr_df = load_hr_data(hr_excel_path) if hr_excel_path else None
-    
+    hr_entries = {}
+    if hr_df is not None:
+        names = [(str(first).strip(), str(last).strip()) for first, last in zip(df["First Name"], df["Last Name"])]
+        hr_entries = match_hr_entries(names, hr_df, load_hr_index(hr_excel_path, hr_df))
+    
+    # One format per column across the whole export, so an ambiguous 01/02 reads the same on every row
+    hire_date_format = detect_date_format(df["Employee Hire Date"])
+    day_format = detect_date_format(str(value) for group in groups for value in df[group["day_col"]]
+                                    if pd.notna(value) and not isinstance(value, datetime.date))
+
     results = []
     for idx, row in df.iterrows():
         first_name = str(row["First Name"]).strip()
@@ -110,7 +106,7 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
             "name": f"{first_name}, {last_name[0] if last_name else ''} (ID: '{emp_id}')",
             "rank": rank,
             "shift": shift,
-            "hireDate": pd.to_datetime(hire_date).strftime('%Y-%m-%d') if pd.notna(hire_date) else None,
+            "hireDate": parse_date(hire_date, hire_date_format).strftime('%Y-%m-%d') if pd.notna(hire_date) else None,
             "years_of_service": row["Years of Service"],
             "email": email,
             "awarded_vacation_days": row["Vacation Days Allowed"],
@@ -122,13 +118,13 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
         }
         
         if hr_df is not None:
-            hr_entry = match_hr_entry(first_name, last_name, hr_df)
+            hr_entry = hr_entries.get((first_name, last_name))
             if hr_entry is not None:
                 firefighter_entry["idnum"] = str(hr_entry.get("Employee Number", firefighter_entry["idnum"]))
                 hr_hire_date = hr_entry.get("Hire Date")
                 if pd.notna(hr_hire_date):
                     try:
-                        firefighter_entry["hireDate"] = pd.to_datetime(hr_hire_date).strftime('%Y-%m-%d')
+                        firefighter_entry["hireDate"] = parse_date(hr_hire_date).strftime('%Y-%m-%d')
                     except Exception as e:
                         print("Error converting HR Hire Date:", e)
         
@@ -138,10 +134,8 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
             if pd.isna(day_val) or pd.isna(selection_val):
                 continue
             try:
-                if isinstance(day_val, (datetime.datetime, pd.Timestamp)):
-                    day_str = day_val.strftime('%Y-%m-%d')
-                else:
-                    day_str = pd.to_datetime(str(day_val)).strftime('%Y-%m-%d')
+                day_str = parse_date(day_val if isinstance(day_val, datetime.date) else str(day_val),
+                                     day_format).strftime('%Y-%m-%d')
             except Exception:
                 continue
             pick = convert_to_pick_format(day_str, str(selection_val))
@@ -156,77 +150,28 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
 
 def match_supplemental_to_current(supp_record, current_data, threshold=80):
     """
-    Attempt to match a supplemental record (with keys "fname", "lname", "shift") to a firefighter record
-    in current_data. Uses exact name matching first, then fuzzy matching.
-    Returns the matching record if found, else None.
+    Attempt to match a supplemental record (with keys "idnum", "fname", "lname", "shift") to a
+    firefighter record in current_data, by ID, exact name, then fuzzy name within the shift.
+    Returns the matching record if found, else None.  For many records use a PickMerger.
     """
-    target_fname = supp_record.get("fname", "").strip().upper()
-    target_lname = supp_record.get("lname", "").strip().upper()
-    target_shift = supp_record.get("shift", "").strip().upper()
-    target_full = f"{target_fname} {target_lname}"
-    
-    candidates = [rec for rec in current_data if rec.get("shift", "").strip().upper() == target_shift]
-    
-    # Exact name match.
-    for rec in candidates:
-        if (rec.get("fname", "").strip().upper() == target_fname and 
-            rec.get("lname", "").strip().upper() == target_lname):
-            return rec
-    
-    # Fuzzy match if no exact match.
-    best_match = None
-    best_score = 0
-    for rec in candidates:
-        full_name_current = f"{rec.get('fname', '').strip().upper()} {rec.get('lname', '').strip().upper()}"
-        score = fuzz.token_sort_ratio(target_full, full_name_current)
-        if score > best_score:
-            best_score = score
-            best_match = rec
-    if best_score >= threshold:
-        return best_match
-    return None
+    position = ReconciliationIndex(current_data).match(supp_record, threshold)
+    return current_data[position] if position is not None else None
 
-def append_supplemental_picks(current_data, supplemental_data):
+def append_supplemental_picks(current_data, supplemental_data, merger=None):
     """
     Takes the current merged firefighter data and the supplemental records,
     and appends supplemental picks (from the "picks" key of each supplemental record)
-    to the corresponding firefighter's "picks" list (if not already present).
-    
+    to the corresponding firefighter's "picks" list (if not already present, compared by
+    date, type, determination and increments).  Same-day picks that differ are added and
+    reported as conflicts.
+
+    `merger` is a PickMerger over current_data to reuse; one is built otherwise.
     Returns updated current_data and a log list.
     """
-    logs = []
-    not_found = []  # Track supplemental records that could not be matched.
-    appended_count = 0
-
-    for supp_record in supplemental_data:
-        # Attempt to match the supplemental record with current_data.
-        match_rec = match_supplemental_to_current(supp_record, current_data)
-        if not match_rec:
-            not_found.append(f"{supp_record.get('fname','')} {supp_record.get('lname','')} (Shift: {supp_record.get('shift','')})")
-            continue
-
-        # For each supplemental pick, check if it's already in the "picks" list.
-        for supp_pick in supp_record.get("picks", []):
-            # Create a key tuple to compare: (date, type, determination, increments)
-            supp_key = (supp_pick.get("date"), supp_pick.get("type"), supp_pick.get("determination"), supp_pick.get("increments"))
-            exists = False
-            for pick in match_rec.get("picks", []):
-                pick_key = (pick.get("date"), pick.get("type"), pick.get("determination"), pick.get("increments"))
-                if pick_key == supp_key:
-                    exists = True
-                    break
-            if not exists:
-                # Append supplemental pick to the "picks" list.
-                match_rec.setdefault("picks", []).append(supp_pick)
-                logs.append(f"Supplemental pick for {match_rec.get('fname','')} {match_rec.get('lname','')} on {supp_pick.get('date')} added.")
-                appended_count += 1
-
-    logs.append(f"\nSupplemental picks appended: {appended_count}.")
-    if not_found:
-        logs.append("No matching current record found for supplemental entries:")
-        for entry in not_found:
-            logs.append(" - " + entry)
-    return current_data, logs
+    if merger is None:
+        merger = PickMerger(current_data)
+    report = merger.merge(supplemental_data)
+    return current_data, report.log_lines("Supplemental")
 
 
 # --- Example usage ---
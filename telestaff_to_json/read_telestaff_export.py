@@ -2,7 +2,14 @@ import os
 import json
 import pandas as pd
 import datetime
-from fuzzywuzzy import fuzz, process
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Allow imports from vacation_selection
+from vacation_selection.dates import detect_date_format, parse_date, DateParser
+from vacation_selection.identity import IdentityIndex
+from merge import PickMerger
+
+# Telestaff day headers carry no year ("10/02"); the year is resolved from the report range
+day_header_parser = DateParser(formats=('%m/%d',))
 
 # --- HR Functions (shared) ---
 def load_hr_data(hr_excel_path):
@@ -15,15 +22,32 @@ def load_hr_data(hr_excel_path):
     hr_df["full_name"] = hr_df["First Name"] + " " + hr_df["Last Name"]
     return hr_df
 
-def match_hr_entry(first_name, last_name, hr_df, threshold=80):
-    target_name = f"{first_name} {last_name}".upper()
-    choices = hr_df["full_name"].tolist()
-    best_match = process.extractOne(target_name, choices, scorer=fuzz.token_sort_ratio)
-    print(f"HR Matching: Target: {target_name}, Best Match: {best_match}")
-    if best_match and best_match[1] >= threshold:
-        hr_match = hr_df[hr_df["full_name"] == best_match[0]].iloc[0]
-        return hr_match
-    return None
+def load_hr_index(hr_excel_path, hr_df):
+    """Identity index of the HR rows; positions are hr_df row positions.  Cached between runs."""
+    return IdentityIndex.for_hr_file(hr_excel_path, hr_df.to_dict(orient="records"))
+
+def match_hr_entry(first_name, last_name, hr_df, threshold=80, index=None):
+    """HR row for a name (by exact or best fuzzy token_sort_ratio >= threshold), or None."""
+    if index is None:
+        index = IdentityIndex.from_hr_records(hr_df.to_dict(orient="records"), threshold=threshold)
+    match = index.resolve(first=first_name, last=last_name)
+    return hr_df.iloc[match.position] if match else None
+
+def match_hr_entries(names, hr_df, index):
+    """
+    Resolves [(first_name, last_name), ...] against the HR rows in one pass.
+    Returns {(first_name, last_name): HR row} for the names that matched.
+    """
+    names = list(dict.fromkeys(names))
+    matches = index.resolve_many([{"first": first, "last": last} for first, last in names])
+    return {name: hr_df.iloc[match.position] for name, match in zip(names, matches) if match}
+
+def split_roster_name(name_str):
+    """ "Smith, John (Capt)" -> ("John", "Smith") """
+    parts = name_str.split(',')
+    last_name = parts[0].strip() if parts else ""
+    first_name = parts[1].split('(')[0].strip() if len(parts) > 1 else ""
+    return first_name, last_name
 
 # --- Telestaff Import ---
 def convert_to_processed_format(vacation_dates, holiday_dates):
@@ -51,6 +75,7 @@ def convert_to_processed_format(vacation_dates, holiday_dates):
 def read_telestaff_export(excel_path, hr_excel_path="./HR_data_plus_ranks.xlsx"):
     try:
         hr_df = load_hr_data(hr_excel_path)
+        hr_index = load_hr_index(hr_excel_path, hr_df)
         print(f"Loaded HR data with {len(hr_df)} records from {hr_excel_path}")
     except Exception as e:
         print("Error loading HR data:", e)
@@ -64,22 +89,21 @@ def read_telestaff_export(excel_path, hr_excel_path="./HR_data_plus_ranks.xlsx")
         start_date_str, end_date_str = date_range_str.split(" - ")
     else:
         start_date_str, _, end_date_str = date_range_str.partition(" through ")
-    start_date = pd.to_datetime(start_date_str.strip(), format='%m/%d/%Y')
-    end_date = pd.to_datetime(end_date_str.strip(), format='%m/%d/%Y')
+    start_date = parse_date(start_date_str)
+    end_date = parse_date(end_date_str)
 
     data_header = df_full.iloc[4, :]
     raw_day_headers = data_header.iloc[4:].tolist()
     full_day_headers = []
     for dh in raw_day_headers:
         if isinstance(dh, (pd.Timestamp, datetime.datetime)):
-            parsed = dh
+            parsed = parse_date(dh)
         else:
             try:
-                parsed = pd.to_datetime(str(dh).strip(), format='%m/%d', errors='coerce')
-            except Exception as e:
-                print(f"Error parsing date header {dh}: {e}")
+                parsed = day_header_parser.parse(str(dh))
+            except ValueError:
                 parsed = None
-        if pd.isna(parsed) or parsed is None:
+        if parsed is None:
             full_day_headers.append(None)
         else:
             parsed = parsed.replace(year=start_date.year)
@@ -95,6 +119,12 @@ def read_telestaff_export(excel_path, hr_excel_path="./HR_data_plus_ranks.xlsx")
     df_data['Shift'] = df_data['Shift'].ffill()
     df_data['Rank'] = df_data['Rank'].ffill()
 
+    # Resolve every roster name against HR at once
+    hr_entries = {}
+    if hr_df is not None:
+        roster_names = [split_roster_name(str(name)) for name in df_data['Name'] if pd.notna(name)]
+        hr_entries = match_hr_entries(roster_names, hr_df, hr_index)
+
     results = []
     for idx, row in df_data.iterrows():
         raw_shift = str(row['Shift']).strip()
@@ -103,10 +133,7 @@ def read_telestaff_export(excel_path, hr_excel_path="./HR_data_plus_ranks.xlsx")
         name_field = row['Name']
         if pd.isna(name_field):
             continue
-        name_str = str(name_field)
-        parts = name_str.split(',')
-        last_name = parts[0].strip() if parts else ""
-        first_name = parts[1].split('(')[0].strip() if len(parts) > 1 else ""
+        first_name, last_name = split_roster_name(str(name_field))
         
         vacations = []
         holidays = []
@@ -132,7 +159,7 @@ def read_telestaff_export(excel_path, hr_excel_path="./HR_data_plus_ranks.xlsx")
         hr_rank = str(rank).strip()
         
         if hr_df is not None:
-            hr_entry = match_hr_entry(first_name, last_name, hr_df)
+            hr_entry = hr_entries.get((first_name, last_name))
             if hr_entry is not None:
                 emp_id = hr_entry.get("Employee Number")
                 if emp_id is not None:
@@ -140,7 +167,7 @@ def read_telestaff_export(excel_path, hr_excel_path="./HR_data_plus_ranks.xlsx")
                 hire_date = hr_entry.get("Hire Date")
                 if pd.notna(hire_date):
                     try:
-                        hire_date = pd.to_datetime(hire_date).strftime('%Y-%m-%d')
+                        hire_date = parse_date(hire_date).strftime('%Y-%m-%d')
                     except Exception as e:
                         print("Error converting Hire Date:", e)
                         hire_date = str(hire_date)
@@ -235,7 +262,16 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
     print("Supplemental Detected groups:", groups)
     
     hr_df = load_hr_data(hr_excel_path) if hr_excel_path else None
+    hr_entries = {}
+    if hr_df is not None:
+        names = [(str(first).strip(), str(last).strip()) for first, last in zip(df["First Name"], df["Last Name"])]
+        hr_entries = match_hr_entries(names, hr_df, load_hr_index(hr_excel_path, hr_df))
     
+    # One format per column across the whole export, so an ambiguous 01/02 reads the same on every row
+    hire_date_format = detect_date_format(df["Employee Hire Date"])
+    day_format = detect_date_format(str(value) for group in groups for value in df[group["day_col"]]
+                                    if pd.notna(value) and not isinstance(value, datetime.date))
+
     results = []
     for idx, row in df.iterrows():
         first_name = str(row["First Name"]).strip()
@@ -253,7 +289,7 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
             "name": f"{first_name}, {last_name[0] if last_name else ''} (ID: '{emp_id}')",
             "rank": rank,
             "shift": shift,
-            "hireDate": pd.to_datetime(hire_date).strftime('%Y-%m-%d') if pd.notna(hire_date) else None,
+            "hireDate": parse_date(hire_date, hire_date_format).strftime('%Y-%m-%d') if pd.notna(hire_date) else None,
             "years_of_service": row["Years of Service"],
             "email": email,
             "awarded_vacation_days": row["Vacation Days Allowed"],
@@ -265,13 +301,13 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
         }
         
         if hr_df is not None:
-            hr_entry = match_hr_entry(first_name, last_name, hr_df)
+            hr_entry = hr_entries.get((first_name, last_name))
             if hr_entry is not None:
                 firefighter_entry["idnum"] = str(hr_entry.get("Employee Number", firefighter_entry["idnum"]))
                 hr_hire_date = hr_entry.get("Hire Date")
                 if pd.notna(hr_hire_date):
                     try:
-                        firefighter_entry["hireDate"] = pd.to_datetime(hr_hire_date).strftime('%Y-%m-%d')
+                        firefighter_entry["hireDate"] = parse_date(hr_hire_date).strftime('%Y-%m-%d')
                     except Exception as e:
                         print("Error converting HR Hire Date:", e)
                 # You may update awarded days similarly if desired.
@@ -282,10 +318,8 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
             if pd.isna(day_val) or pd.isna(selection_val):
                 continue
             try:
-                if isinstance(day_val, (datetime.datetime, pd.Timestamp)):
-                    day_str = day_val.strftime('%Y-%m-%d')
-                else:
-                    day_str = pd.to_datetime(str(day_val)).strftime('%Y-%m-%d')
+                day_str = parse_date(day_val if isinstance(day_val, datetime.date) else str(day_val),
+                                     day_format).strftime('%Y-%m-%d')
             except Exception:
                 continue
             pick = convert_to_pick_format_supp(day_str, str(selection_val))
@@ -299,27 +333,13 @@ def read_supplemental_export(excel_path, hr_excel_path=None):
 def merge_exports(telestaff_data, supplemental_data):
     """
     Merges telestaff and supplemental firefighter records.
-    For each supplemental record, try to match based on shift, fname, and lname.
-    If a match is found, extend its "picks" list with supplemental picks.
-    Otherwise, add the supplemental record as new.
+    Each supplemental record is matched by ID, then name within its shift. If a match is
+    found, its supplemental picks that are not already present are added to the "picks" list.
+    Otherwise, the supplemental record is added as new.
     """
-    # Build lookup from telestaff data using key = (shift, fname, lname)
-    lookup = {}
-    for rec in telestaff_data:
-        key = (rec.get("shift", "").strip().upper(),
-               rec.get("fname", "").strip().upper(),
-               rec.get("lname", "").strip().upper())
-        lookup[key] = rec
-
-    for s_rec in supplemental_data:
-        key = (s_rec.get("shift", "").strip().upper(),
-               s_rec.get("fname", "").strip().upper(),
-               s_rec.get("lname", "").strip().upper())
-        if key in lookup:
-            # Merge supplemental picks into existing record.
-            lookup[key]["picks"].extend(s_rec.get("picks", []))
-        else:
-            telestaff_data.append(s_rec)
+    report = PickMerger(telestaff_data).merge(supplemental_data, add_unmatched=True)
+    print(f"Merged supplemental data: {len(report.added)} picks added, {report.duplicates} duplicates skipped, "
+          f"{len(report.conflicts)} same-day conflicts, {len(report.new_records)} new records.")
     return telestaff_data
 
 # --- Unified Processing and Output ---
@@ -1,89 +1,59 @@
+"""
+Writes the Telestaff leave import file from firefighter JSON files.
+
+Usage:
+    python telestaff_format.py --json A_ffighters.json B_ffighters.json --output "Telestaff Format.csv"
+
+The drafting run writes the same file directly from its in-memory picks
+({runtime}-Telestaff-{shift}.csv); this tool is for JSON that was edited or merged afterwards.
+
+With --since SNAPSHOT only the rows added, removed or modified since the snapshot are
+written (the change is in the Note column), and the snapshot is updated to the full file:
+    python telestaff_format.py --json A_ffighters.json --output delta.csv --since "Telestaff Snapshot.csv"
+"""
+import argparse
+import json
 import os
+import sys
+
 import pandas as pd
 
-# Define paths
-input_folder = "telestaff conversion"  # Folder containing shift files
-output_file = "telestaff conversion/Telestaff Format.csv"  # Output file path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Allow imports from vacation_selection
+from vacation_selection.telestaff_export import (build_import_rows, json_pick_frame, write_telestaff_delta,
+                                                 write_telestaff_import)
+
 
-# Initialize an empty list to store formatted data
-formatted_data = []
+def read_json_records(json_path):
+    """Reads a firefighter .json array or .jsonl file."""
+    with open(json_path, "r") as f:
+        if json_path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
 
-def format_data(df, shift):
-    formatted_rows = []
-    current_name_id = ""  # To store the current "Name (ID)"
-    
-    for _, row in df.iterrows():
-        # Check if the row contains a new "Name (ID)" and "Rank"
-        if isinstance(row["Name (ID)"], str):
-            current_name_id = row["Name (ID)"]  # Update the current "Name (ID)"
-        
-        # Skip rows without a valid "Date Requested" (i.e., blank spacer rows)
-        if pd.isna(row["Date Requested"]):
-            continue
-        
-        # Skip rejected picks
-        if row["Determination"] == "Rejected":
-            continue
-        
-        # Extract Payroll ID
-        payroll_id = ""
-        if isinstance(current_name_id, str):
-            id_match = current_name_id.strip().split("ID: ")
-            if len(id_match) > 1:
-                payroll_id = id_match[1].split(")")[0]  # Get the numeric ID
-        
-        # Determine Start Time and Duration based on "Increments" value
-        if row["Increments"] == "FULL":
-            start_time = "7:00:00"
-            duration = 48  # 48-hour shift
-        elif row["Increments"] in ["AM", "day_1"]:
-            start_time = "7:00:00"
-            duration = 24  # First 24-hour segment
-        elif row["Increments"] in ["PM", "day_2"]:
-            start_time = "7:00:00"  # Start time for second day
-            duration = 24  # Second 24-hour segment
-        else:
-            continue  # Skip rows with unknown increments
-        
-        # Append formatted row
-        formatted_rows.append({
-            "Payroll ID": payroll_id,
-            "Work Code": row["Type"][0] if pd.notna(row["Type"]) else "",  # First letter of "Type"
-            "List": "",
-            "Start Date": row["Date Requested"],
-            "Counts": "",
-            "Shift": shift,
-            "Start Time": start_time,
-            "Duration (hours)": duration,
-            "Region": "",  # Required header, leave empty
-            "Outcome": "",  # Required header, leave empty
-            "Detail Code": "",  # Required header, leave empty
-            "Note": ""  # Required header, leave empty
-        })
-    
-    return pd.DataFrame(formatted_rows)
 
+def format_json_files(json_paths):
+    """Telestaff import rows for all firefighters in the given JSON files."""
+    frames = [json_pick_frame(read_json_records(json_path)) for json_path in json_paths]
+    return build_import_rows(pd.concat(frames, ignore_index=True))
 
-# Process each file in the input folder
-for filename in os.listdir(input_folder):
-    if filename.endswith(".csv"):
-        file_path = os.path.join(input_folder, filename)
-        df = pd.read_csv(file_path)
-        
-        # Determine the shift from the filename (e.g., -A, -B, -C)
-        shift = filename.split('-')[-1].split('.')[0]  # Extract shift
-        
-        # Format the data and append it
-        formatted_df = pd.DataFrame(format_data(df, shift))
-        formatted_data.append(formatted_df)
 
-# Concatenate all formatted data
-final_df = pd.concat(formatted_data, ignore_index=True)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the Telestaff import file from firefighter JSON files.")
+    parser.add_argument("--json", nargs="+", required=True, help="Firefighter JSON/JSONL files (any shifts)")
+    parser.add_argument("--output", default="telestaff conversion/Telestaff Format.csv")
+    parser.add_argument("--since", help="Snapshot of the last export: write only the changed rows, then update it")
+    args = parser.parse_args(argv)
 
-# Ensure output directory exists
-os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    rows = format_json_files(args.json)
+    if args.since:
+        os.makedirs(os.path.dirname(args.since) or ".", exist_ok=True)
+        delta = write_telestaff_delta(rows, args.since, args.output)
+        print(f"{len(delta)} changed rows (of {len(rows)}) saved to: {args.output}; snapshot updated: {args.since}")
+    else:
+        write_telestaff_import(rows, args.output)
+        print(f"Formatted data saved to: {args.output}")
 
-# Export to CSV
-final_df.to_csv(output_file, index=False)
 
-print(f"Formatted data saved to: {output_file}")
+if __name__ == "__main__":
+    main()
@@ -1,115 +1,136 @@
 import os
 import json
+import hashlib
 from read_telestaff_export import read_telestaff_export
 import read_supplemental_export as rse
-from fuzzywuzzy import fuzz
+from vacation_selection.catalog import RunCatalog
+from merge import ReconciliationIndex, PickMerger
+
+# Per-member hashes of the last sync, kept in the output folder
+SYNC_STATE_FILENAME = "telestaff_sync_state.json"
 
 def load_current_json(json_folder, shift_type):
     """
     Loads the current JSON file for the given shift type from json_folder.
     Expected filename format: [YYYY.MM.DD]-FFighters-[A,B, or C]_ffighters.json
+    The run catalog is used when the folder has one; otherwise the folder is scanned.
     Returns the JSON data as a list of dictionaries.
     """
-    json_files = [f for f in os.listdir(json_folder) 
-                  if f.endswith(f"FFighters-{shift_type}_ffighters.json")]
-    if not json_files:
-        print(f"No JSON file found for shift type {shift_type} in {json_folder}")
-        return []
-    json_files.sort(reverse=True)
-    json_path = os.path.join(json_folder, json_files[0])
+    json_path = RunCatalog(json_folder).latest_output("ffighters", shift_type)
+    if not json_path or not os.path.exists(json_path):
+        json_files = [f for f in os.listdir(json_folder)
+                      if f.endswith(f"FFighters-{shift_type}_ffighters.json")]
+        if not json_files:
+            print(f"No JSON file found for shift type {shift_type} in {json_folder}")
+            return []
+        json_files.sort(reverse=True)
+        json_path = os.path.join(json_folder, json_files[0])
     with open(json_path, 'r') as jf:
         data = json.load(jf)
     print(f"Loaded current JSON file: {json_path}")
     return data
 
-def normalize_text(text):
-    """Normalizes text by stripping whitespace and converting to uppercase."""
-    return text.strip().upper()
-
 def match_ffighters(new_record, current_data, threshold=80):
     """
     Attempts to match the new_record against current_data.
     First, if an idnum exists, it checks for an exact id match.
     If that fails, it checks for an exact name match.
     Finally, it uses fuzzy matching on the full name (first and last) with the given threshold.
-    
+
     Returns the matching record from current_data if found, otherwise None.
+    For many records, build a ReconciliationIndex once instead.
+    """
+    position = ReconciliationIndex(current_data).match(new_record, threshold)
+    return current_data[position] if position is not None else None
+
+def pick_key(entry):
+    return (entry["date"], entry["type"], entry["determination"])
+
+# Balances are summed in half-day units so they stay exact; FULL is both halves
+UNITS_PER_DAY = 2
+
+def increment_units(increments):
+    return UNITS_PER_DAY if increments.upper() == "FULL" else 1
+
+def recompute_balances(firefighter_entry, logs):
     """
-    shift_new = normalize_text(new_record.get("shift", ""))
-    new_fname = normalize_text(new_record.get("fname", ""))
-    new_lname = normalize_text(new_record.get("lname", ""))
-    new_id = str(new_record.get("idnum", "")).strip()
-
-    # Filter candidates by shift.
-    candidates = [rec for rec in current_data if normalize_text(rec.get("shift", "")) == shift_new]
-
-    # Primary: If new record has an ID, try to match based on ID.
-    if new_id:
-        for rec in candidates:
-            current_id = str(rec.get("idnum", "")).strip()
-            if new_id == current_id and new_id != "":
-                print(f"ID match found for ID {new_id} in shift {shift_new}")
-                return rec
-
-    # Secondary: Exact name match.
-    for rec in candidates:
-        cur_fname = normalize_text(rec.get("fname", ""))
-        cur_lname = normalize_text(rec.get("lname", ""))
-        if new_fname == cur_fname and new_lname == cur_lname:
-            print(f"Exact name match found: {new_fname} {new_lname}")
-            return rec
-
-    # Tertiary: Fuzzy matching on full names.
-    best_match = None
-    best_score = 0
-    full_name_new = f"{new_fname} {new_lname}"
-    for rec in candidates:
-        cur_fname = normalize_text(rec.get("fname", ""))
-        cur_lname = normalize_text(rec.get("lname", ""))
-        full_name_current = f"{cur_fname} {cur_lname}"
-        score = fuzz.token_sort_ratio(full_name_new, full_name_current)
-        if score > best_score:
-            best_score = score
-            best_match = rec
-    if best_score >= threshold:
-        print(f"Fuzzy match: {full_name_new} matched with {normalize_text(best_match.get('fname',''))} {normalize_text(best_match.get('lname',''))} (Score: {best_score})")
-        return best_match
-    print(f"No match found for {full_name_new} (Best fuzzy score: {best_score})")
-    return None
-
-def update_availability(firefighter_entry, operation, day_type, increments, logs, log_message):
+    Sets approved_days_count, used_vacation_days and used_holiday_days from the approved
+    processed picks in one pass, and logs if more days are used than were awarded.
     """
-    Updates the firefighter's availability based on the operation.
-    Computes change (1 for FULL, 0.5 for HALF) and adjusts used days and approved count.
-    Logs a warning if used days exceed awarded days.
+    approved = 0
+    used = {"Vacation": 0, "Holiday": 0}
+    for entry in firefighter_entry["processed"]:
+        if entry["determination"] == "Approved":
+            units = increment_units(entry["increments"])
+            approved += units
+            if entry["type"] in used:
+                used[entry["type"]] += units
+
+    firefighter_entry["approved_days_count"] = approved / UNITS_PER_DAY
+    firefighter_entry["used_vacation_days"] = used["Vacation"] / UNITS_PER_DAY
+    firefighter_entry["used_holiday_days"] = used["Holiday"] / UNITS_PER_DAY
+
+    for pick_type, used_field, awarded_field in (("Vacation", "used_vacation_days", "awarded_vacation_days"),
+                                                 ("Holiday", "used_holiday_days", "awarded_holiday_days")):
+        day_type = pick_type.lower()
+        awarded = firefighter_entry.get(awarded_field)
+        if awarded is not None and used[pick_type] > awarded * UNITS_PER_DAY:
+            logs.append(f"⚠️ {firefighter_entry['fname']} {firefighter_entry['lname']} exceeded awarded {day_type} days: used {firefighter_entry[used_field]} vs awarded {awarded}.")
+
+def reconcile_picks(match_record, new_record, logs):
     """
-    change = 1 if increments.upper() == "FULL" else 0.5
-
-    if operation == "addition":
-        if day_type == "Vacation":
-            firefighter_entry["used_vacation_days"] = (firefighter_entry.get("used_vacation_days") or 0) + change
-        elif day_type == "Holiday":
-            firefighter_entry["used_holiday_days"] = (firefighter_entry.get("used_holiday_days") or 0) + change
-        firefighter_entry["approved_days_count"] = (firefighter_entry.get("approved_days_count") or 0) + change
-        logs.append(log_message + " [Addition]")
-    elif operation == "removal":
-        if day_type == "Vacation":
-            firefighter_entry["used_vacation_days"] = (firefighter_entry.get("used_vacation_days") or 0) - change
-        elif day_type == "Holiday":
-            firefighter_entry["used_holiday_days"] = (firefighter_entry.get("used_holiday_days") or 0) - change
-        firefighter_entry["approved_days_count"] = (firefighter_entry.get("approved_days_count") or 0) - change
-        logs.append(log_message + " [Removal]")
-
-    if day_type == "Vacation":
-        awarded = firefighter_entry.get("awarded_vacation_days")
-        if awarded is not None and (firefighter_entry.get("used_vacation_days") or 0) > awarded:
-            logs.append(f"⚠️ {firefighter_entry['fname']} {firefighter_entry['lname']} exceeded awarded vacation days: used {(firefighter_entry.get('used_vacation_days') or 0)} vs awarded {awarded}.")
-    elif day_type == "Holiday":
-        awarded = firefighter_entry.get("awarded_holiday_days")
-        if awarded is not None and (firefighter_entry.get("used_holiday_days") or 0) > awarded:
-            logs.append(f"⚠️ {firefighter_entry['fname']} {firefighter_entry['lname']} exceeded awarded holiday days: used {(firefighter_entry.get('used_holiday_days') or 0)} vs awarded {awarded}.")
-
-def compare_and_update(current_data, new_data):
+    Replaces match_record's processed picks with the reconciled set, compared by
+    (date, type, determination) and ignoring increments: JSON picks also in Telestaff or
+    Rejected are kept, other JSON picks are removed and Telestaff-only picks are added.
+    """
+    label = f"[{new_record['fname']} {new_record['lname']}]"
+    json_processed = match_record.get("processed", [])
+    telestaff_processed = new_record.get("processed", [])
+    json_processed_set = {pick_key(entry) for entry in json_processed}
+    telestaff_processed_set = {pick_key(entry) for entry in telestaff_processed}
+
+    updated_processed = []
+    for entry in json_processed:
+        if entry["determination"] == "Rejected":
+            updated_processed.append(entry)
+            logs.append(f"{label} {entry['date']} ({entry['type']}) was REJECTED and remains in JSON.")
+        elif pick_key(entry) in telestaff_processed_set:
+            updated_processed.append(entry)
+            logs.append(f"{label} {entry['date']} ({entry['type']}) MATCHED Telestaff data.")
+        else:
+            logs.append(f"{label} {entry['date']} ({entry['type']}) was REMOVED (not found in Telestaff). [Removal]")
+
+    for entry in telestaff_processed:
+        if pick_key(entry) not in json_processed_set:
+            updated_processed.append(entry)
+            logs.append(f"{label} {entry['date']} ({entry['type']}) was ADDED from Telestaff. [Addition]")
+
+    match_record["processed"] = sorted(updated_processed, key=lambda x: x["date"])
+    recompute_balances(match_record, logs)
+
+def member_key(record):
+    """Stable key of a member across syncs: shift plus ID, or plus name when there is no ID."""
+    identity = str(record.get("idnum") or "").strip() or f"{record.get('fname', '')} {record.get('lname', '')}".upper()
+    return f"{str(record.get('shift', '')).strip().upper()}|{identity}"
+
+def content_hash(record):
+    """Hash of a member's leave state: their processed picks, in a canonical order."""
+    picks = sorted(pick_key(entry) + (entry.get("increments"),) for entry in record.get("processed", []))
+    return hashlib.sha256(json.dumps(picks, default=str).encode("utf-8")).hexdigest()
+
+def load_sync_state(path):
+    """Hashes kept by the last sync: {member key: {"telestaff": hash, "record": hash}}."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_sync_state(path, sync_state):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(sync_state, f, indent=1, sort_keys=True)
+
+def compare_and_update(current_data, new_data, index=None, sync_state=None):
     """
     Compares and updates JSON firefighter data using new Telestaff exports.
     For each new record, attempts to match using ID (if available) or fuzzy name matching.
@@ -118,80 +139,42 @@ def compare_and_update(current_data, new_data):
     For JSON firefighters not found in the Telestaff export, their "processed" picks are cleared
     and summary fields are reset to zero.
     
+    `index` is a ReconciliationIndex (or PickMerger) over current_data to reuse; one is built otherwise.
+
+    `sync_state` (from load_sync_state) enables incremental syncs: a member whose Telestaff
+    picks and matched JSON record both hash the same as after the last sync is left as is,
+    without reconciliation or per-member logs, and only counted in the summary.  The dict is
+    updated in place with this sync's hashes; save it with save_sync_state.
+
     Returns:
         updated_data: Updated JSON firefighter list (with cleared picks for firefighters not in Telestaff)
         logs: List of log messages
     """
     logs = []
+    if index is None:
+        index = ReconciliationIndex(current_data)
     matched_indices = set()
     added_firefighters = []   # Track new records added from Excel.
     removed_firefighters = [] # Track firefighters cleared from JSON.
+    unchanged_count = 0
 
     # Process each new record: update matching record or add as new.
     for new_record in new_data:
-        match_record = match_ffighters(new_record, current_data)
-        if match_record:
-            # Found a match; update its processed picks.
-            index = current_data.index(match_record)
-            matched_indices.add(index)
-            json_processed = match_record.get("processed", [])
-            telestaff_processed = new_record.get("processed", [])
-            json_processed_set = {(entry["date"], entry["type"], entry["determination"]) for entry in json_processed}
-            telestaff_processed_set = {(entry["date"], entry["type"], entry["determination"]) for entry in telestaff_processed}
-
-            updated_processed = []
-
-            # Retain picks in JSON that match Telestaff, or are marked as Rejected.
-            for entry in json_processed:
-                entry_key = (entry["date"], entry["type"], entry["determination"])
-                if entry["determination"] == "Rejected":
-                    updated_processed.append(entry)
-                    logs.append(f"[{new_record['fname']} {new_record['lname']}] {entry['date']} ({entry['type']}) was REJECTED and remains in JSON.")
-                elif entry_key in telestaff_processed_set:
-                    updated_processed.append(entry)
-                    logs.append(f"[{new_record['fname']} {new_record['lname']}] {entry['date']} ({entry['type']}) MATCHED Telestaff data.")
-                else:
-                    update_availability(
-                        match_record,
-                        "removal",
-                        entry["type"],
-                        entry["increments"],
-                        logs,
-                        f"[{new_record['fname']} {new_record['lname']}] {entry['date']} ({entry['type']}) was REMOVED (not found in Telestaff)."
-                    )
-
-            # Add new picks from Telestaff not already in JSON.
-            for entry in telestaff_processed:
-                entry_key = (entry["date"], entry["type"], entry["determination"])
-                if entry_key not in json_processed_set:
-                    updated_processed.append(entry)
-                    update_availability(
-                        match_record,
-                        "addition",
-                        entry["type"],
-                        entry["increments"],
-                        logs,
-                        f"[{new_record['fname']} {new_record['lname']}] {entry['date']} ({entry['type']}) was ADDED from Telestaff."
-                    )
-
-            match_record["processed"] = sorted(updated_processed, key=lambda x: x["date"])
-
-            # Recalculate summary fields.
-            approved = 0
-            used_vacation = 0
-            used_holiday = 0
-            for entry in match_record["processed"]:
-                if entry["determination"] == "Approved":
-                    inc = 1 if entry["increments"].upper() == "FULL" else 0.5
-                    approved += inc
-                    if entry["type"] == "Vacation":
-                        used_vacation += inc
-                    elif entry["type"] == "Holiday":
-                        used_holiday += inc
-
-            match_record["approved_days_count"] = approved
-            match_record["used_vacation_days"] = used_vacation
-            match_record["used_holiday_days"] = used_holiday
+        position = index.match(new_record)
+        if position is not None:
+            matched_indices.add(position)
+            match_record = current_data[position]
+            if sync_state is not None:
+                key = member_key(new_record)
+                telestaff_hash = content_hash(new_record)
+                previous = sync_state.get(key)
+                if previous and previous["telestaff"] == telestaff_hash and previous["record"] == content_hash(match_record):
+                    unchanged_count += 1
+                    continue
+                reconcile_picks(match_record, new_record, logs)
+                sync_state[key] = {"telestaff": telestaff_hash, "record": content_hash(match_record)}
+            else:
+                reconcile_picks(match_record, new_record, logs)
         else:
             logs.append(f"New entry found in Excel for {new_record['fname']} {new_record['lname']} (ID: {new_record.get('idnum', 'N/A')}); adding to JSON.")
             added_firefighters.append({
@@ -200,7 +183,10 @@ def compare_and_update(current_data, new_data):
                 "shift": new_record.get("shift", "Unknown")
             })
             current_data.append(new_record)
-            matched_indices.add(len(current_data) - 1)  # Mark the newly added record as matched.
+            matched_indices.add(index.add(new_record))  # Mark the newly added record as matched.
+            if sync_state is not None:
+                sync_state[member_key(new_record)] = {"telestaff": content_hash(new_record),
+                                                      "record": content_hash(new_record)}
 
     # For JSON firefighters not found in the Telestaff export,
     # clear all their picks and reset summary fields.
@@ -221,7 +207,10 @@ def compare_and_update(current_data, new_data):
     logs.append("\n========== FINAL SUMMARY ==========")
     logs.append("SUMMARY OF UPDATES:")
     logs.append(f"Total records processed from Telestaff: {len(new_data)}")
-    logs.append(f"Total current JSON records: {len(current_data)}\n")
+    logs.append(f"Total current JSON records: {len(current_data)}")
+    if sync_state is not None:
+        logs.append(f"Unchanged since last sync (skipped): {unchanged_count}")
+    logs.append("")
     
     logs.append("NEW FIREFIGHTERS ADDED:")
     if added_firefighters:
@@ -279,14 +268,20 @@ def main():
         if current_data:
             combined_current_data.extend(current_data)
 
-    # Perform the update on the combined dataset.
-    updated_data, logs = compare_and_update(combined_current_data, combined_new_data)
+    # One index over the current records serves the Telestaff update and the supplemental merge.
+    merger = PickMerger(combined_current_data)
+
+    # Perform the update on the combined dataset, skipping members unchanged since the last sync.
+    sync_state_path = os.path.join(output_folder, SYNC_STATE_FILENAME)
+    sync_state = load_sync_state(sync_state_path)
+    updated_data, logs = compare_and_update(combined_current_data, combined_new_data, index=merger,
+                                            sync_state=sync_state)
 
     # ---- New Lines: Process supplemental export ----
     supplemental_excel_path = "./telestaff_to_json/supplemental_exports/2025 SUPPLEMENTAL VACATION REQUEST FORM - Form Responses.csv"
     hr_excel_path = "./HR_data_plus_ranks.xlsx"  # Provide HR file if needed.
     supplemental_data = rse.read_supplemental_export(supplemental_excel_path, hr_excel_path=hr_excel_path)
-    updated_data, supp_logs = rse.append_supplemental_picks(updated_data, supplemental_data)
+    updated_data, supp_logs = rse.append_supplemental_picks(updated_data, supplemental_data, merger=merger)
     logs.extend(supp_logs)
     # ---------------------------------------------------
 
@@ -298,6 +293,7 @@ def main():
     with open(updated_json_path, 'w') as outf:
         json.dump(updated_data, outf, indent=4)
     print(f"\nUpdated merged JSON file written to {updated_json_path}")
+    save_sync_state(sync_state_path, sync_state)
 
     # Write one merged log file.
     log_filename = f"{output_date}-ConversionLog_merged.log"
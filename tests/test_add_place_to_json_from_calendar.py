@@ -0,0 +1,103 @@
+# tests/test_add_place_to_json_from_calendar.py
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "telestaff_to_json"))
+from add_place_to_json_from_calendar import CalendarPlaces, assign_places, parse_row_label, restore_places  # noqa: E402
+
+CALENDAR_A = """Date,First,Second,Third,Fourth,Fifth,Sixth
+2025-01-05,"Jaeger, B - 23 (FULL)","Smith, J - 7 (FULL)",,,,
+2025-01-06 (AM),"Lee, C (AM)","Smith, J (AM)",,,,
+Mar 04-5,"Smith, J - 7 (FULL)",,,,,
+"""
+CALENDAR_B = """Date,First,Second,Third,Fourth,Fifth,Sixth
+2025-01-07,"Gomez, R - 301 (FULL)","Ng, T - 12 (FULL)",,,,
+"""
+# Two increments: Smith was granted day_2 first, then Ng took day_1 and Smith the rest of the day
+CALENDAR_48 = """Date,First,Second,Third,Fourth,Fifth,Sixth
+Oct 28-29 (day_1),"Ng, T (day_1)","Smith, J (FULL)",,,,
+Oct 28-29 (day_2),"Smith, J (FULL)","Lee, C (day_2)",,,,
+"""
+
+
+def fighter(idnum, fname, lname, *picks):
+    return {"idnum": idnum, "fname": fname, "lname": lname,
+            "processed": [pick_dict(*pick) for pick in picks]}
+
+
+def pick_dict(date, determination, increments="FULL"):
+    return {"date": date, "determination": determination, "increments": increments, "place": -1}
+
+
+class TestAddPlace(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.calendars = []
+        for name, content in (("calendar-A.csv", CALENDAR_A), ("calendar-B.csv", CALENDAR_B)):
+            path = os.path.join(self.folder.name, name)
+            with open(path, "w") as f:
+                f.write(content)
+            self.calendars.append(path)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.folder.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_parse_row_label(self):
+        self.assertEqual(parse_row_label("2025-01-06 (AM)"), ("2025-01-06", "AM"))
+        self.assertEqual(parse_row_label("2025-01-05"), ("2025-01-05", None))
+        self.assertEqual(parse_row_label("Mar 04-5 (day_2)", 2025), ("2025-03-04", "day_2"))
+        self.assertEqual(parse_row_label("Total"), (None, None))
+        with self.assertRaises(ValueError):
+            parse_row_label("Mar 04-5")
+
+    def test_places_follow_the_last_granted_increment(self):
+        places = CalendarPlaces().add_csv(self.write("calendar-48.csv", CALENDAR_48), 2025)
+        records = [
+            fighter(7, "John", "Smith", ("2025-10-28", "Approved")),
+            fighter(12, "Tom", "Ng", ("2025-10-28", "Approved", "day_1")),
+            fighter(5, "Cy", "Lee", ("2025-10-28", "Approved", "day_2")),
+        ]
+        assign_places(records, places)
+        # The draft writes a FULL pick's place per increment, so day_2's position sticks
+        self.assertEqual([r["processed"][0]["place"] for r in records], [0, 0, 1])
+
+    def test_year_is_required_for_48_hour_calendars(self):
+        with self.assertRaises(ValueError):
+            restore_places([], [self.write("calendar-48.csv", CALENDAR_48)], self.folder.name)
+
+    def test_exact_name_and_fuzzy_places(self):
+        places = CalendarPlaces()
+        for path in self.calendars:
+            places.add_csv(path, 2025)
+        records = [
+            fighter(7, "John", "SMITH", ("2025-01-05", "Approved"), ("2025-01-06", "Approved"),
+                    ("2025-03-04", "Approved"), ("2025-01-09", "Approved"), ("2025-01-05", "Rejected")),
+            fighter(301, "Rita", "Gomes", ("2025-01-07", "Approved")),  # Misspelled last name
+        ]
+        counts = assign_places(records, places)
+        self.assertEqual([p["place"] for p in records[0]["processed"]], [1, 1, 0, None, None])
+        self.assertEqual(records[1]["processed"][0]["place"], 0)
+        self.assertEqual(counts, {"exact": 2, "name": 1, "fuzzy": 1, "missing": 1})
+
+    def test_restore_places_writes_every_file(self):
+        json_path = os.path.join(self.folder.name, "B.json")
+        with open(json_path, "w") as f:
+            json.dump([fighter(12, "Tom", "Ng", ("2025-01-07", "Approved"))], f)
+        outputs, totals = restore_places([json_path], self.calendars, self.folder.name, 2025)
+        with open(outputs[0]) as f:
+            self.assertEqual(json.load(f)[0]["processed"][0]["place"], 1)
+        self.assertEqual(totals["exact"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
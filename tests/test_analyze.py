@@ -0,0 +1,99 @@
+# tests/test_analyze.py
+import unittest
+from datetime import date
+
+from vacation_selection.analyze import OnlineAnalytics, analyze_results, build_pick_table
+from vacation_selection.cal import make_calendar
+from vacation_selection.firefighter import FFighter, Pick
+
+
+def make_ffighter(idnum, shift, rank, processed):
+    ff = FFighter(idnum, f"First{idnum}", "Test", date(2010, 1, idnum), rank, shift, [])
+    ff.processed = processed
+    return ff
+
+
+class TestAnalyzeResults(unittest.TestCase):
+
+    def setUp(self):
+        self.ffighters = [
+            make_ffighter(1, "A", "Captain", [
+                Pick(date(2025, 1, 6), determination="Approved"),
+                Pick(date(2025, 1, 7), determination="Rejected", reason="Max days off already reached"),
+            ]),
+            make_ffighter(2, "B", "Firefighter", [
+                Pick(date(2025, 3, 3), determination="Approved"),
+                Pick(date(2025, 3, 4), determination="Approved"),
+                Pick(date(2025, 3, 10), determination="Rejected", reason="Day already has maximum firefighters off"),
+            ]),
+            make_ffighter(3, "C", "Captain", []),
+        ]
+
+    def test_counts_and_shape(self):
+        analysis = analyze_results(self.ffighters)
+
+        self.assertEqual(analysis["total"]["processed"], 5)
+        self.assertEqual(analysis["total"]["approved"], 3)
+        self.assertAlmostEqual(analysis["total"]["approval_rate"], 60.0)
+        self.assertAlmostEqual(analysis["total"]["average_picks_per_person"], 5 / 3)
+        self.assertEqual(analysis["by_rank"]["Captain"]["top_rejected_reasons"], {"Max days off already reached": 1})
+        self.assertEqual(analysis["by_shift"]["B"]["monthly_approvals"][3], 2)
+        self.assertEqual(analysis["by_shift"]["B"]["monthly_denials"][3], 1)
+        # Shifts without processed picks still get a group, but no monthly breakdown
+        self.assertEqual(analysis["by_shift"]["C"]["processed"], 0)
+        self.assertNotIn("monthly_approvals", analysis["by_shift"]["C"])
+
+    def test_weeks_are_per_group(self):
+        analysis = analyze_results(self.ffighters)
+
+        self.assertEqual(analysis["total"]["top_5_weeks"], [(2, 2), (10, 2), (11, 1)])
+        self.assertEqual(analysis["by_shift"]["A"]["top_5_weeks"], [(2, 2)])
+        self.assertEqual(analysis["by_shift"]["B"]["top_5_weeks"], [(10, 2), (11, 1)])
+
+    def test_pick_table_columns(self):
+        table = build_pick_table(self.ffighters)
+        self.assertEqual(len(table), 5)
+        self.assertEqual(list(table["week"]), [2, 2, 10, 10, 11])
+        self.assertEqual(list(table["shift"]), ["A", "A", "B", "B", "B"])
+
+    def test_no_firefighters(self):
+        analysis = analyze_results([])
+        self.assertEqual(analysis["total"]["processed"], 0)
+        self.assertEqual(analysis["total"]["top_5_weeks"], [])
+
+
+class TestOnlineAnalytics(unittest.TestCase):
+
+    def make_captains(self, first, last):
+        return [make_ffighter(i, "A", "Captain", []) for i in range(first, last + 1)]
+
+    def test_matches_full_analysis(self):
+        ffighters = self.make_captains(1, 5)
+        for ff in ffighters:
+            ff.picks = [Pick(date(2025, 10, 2), increments="day_1"), Pick(date(2025, 10, 8))]
+
+        analytics = OnlineAnalytics(ffighters)
+        make_calendar(ffighters, silent_mode=True, subscribers=[analytics.on_events])
+
+        self.assertEqual(analytics.as_dict(), analyze_results(ffighters))
+        self.assertEqual(analytics.as_dict()["total"]["processed"], 10)
+
+    def test_supplemental_round_adds_deltas(self):
+        ffighters = self.make_captains(1, 2)
+        for ff in ffighters:
+            ff.picks = [Pick(date(2025, 10, 2))]
+        results = make_calendar(ffighters, silent_mode=True)
+
+        # Seed from the first round, then only the new round's decisions are counted
+        analytics = OnlineAnalytics()
+        analytics.observe(ffighters)
+        ffighters[0].picks = [Pick(date(2025, 11, 4))]
+        make_calendar(ffighters, existing_calendar_data=results, silent_mode=True, count=1,
+                      subscribers=[analytics.on_events])
+
+        self.assertEqual(analytics.as_dict()["total"]["processed"], 3)
+        self.assertEqual(analytics.as_dict(), analyze_results(ffighters))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_catalog.py
+import os
+import shutil
+import tempfile
+import unittest
+
+from vacation_selection.catalog import RunManifest, RunCatalog, StageCache, CATALOG_FILENAME, stage_key
+from vacation_selection.file_io import read_analysis_from_json, write_analysis_to_json
+
+
+class TestRunCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def record_run(self, run_id, shifts=("A", "B")):
+        manifest = RunManifest(run_id, self.test_dir, seed=7)
+        with manifest.stage("write_outputs"):
+            for shift in shifts:
+                path = os.path.join(self.test_dir, f"{run_id}-FFighters-{shift}_ffighters.json")
+                with open(path, "w") as f:
+                    f.write("[]")
+                manifest.add_output(path, "ffighters", shift)
+        manifest.add_output(write_analysis_to_json({"run": run_id}, self.test_dir, run_id), "analysis")
+        return manifest.write()
+
+    def test_latest_output_per_shift(self):
+        self.record_run("2025.01.01 10.00")
+        self.record_run("2025.01.02 10.00", shifts=("A",))
+
+        catalog = RunCatalog(self.test_dir)
+        self.assertEqual(catalog.latest_run()["run_id"], "2025.01.02 10.00")
+        self.assertEqual(catalog.latest_run()["seed"], 7)
+        self.assertIn("write_outputs", catalog.latest_run()["timings"])
+        self.assertTrue(catalog.latest_output("ffighters", "A").endswith("2025.01.02 10.00-FFighters-A_ffighters.json"))
+        self.assertTrue(catalog.latest_output("ffighters", "B").endswith("2025.01.01 10.00-FFighters-B_ffighters.json"))
+        self.assertEqual(read_analysis_from_json(self.test_dir), {"run": "2025.01.02 10.00"})
+
+    def test_retention_compresses_old_runs(self):
+        for day in range(1, 4):
+            self.record_run(f"2025.01.0{day} 10.00")
+
+        compressed = RunCatalog(self.test_dir).apply_retention(keep=1)
+        self.assertEqual(compressed, ["2025.01.01 10.00", "2025.01.02 10.00"])
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "2025.01.01 10.00.zip")))
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "2025.01.01 10.00-analysis.json")))
+
+        # The retention events are part of the catalog, so a fresh reader sees them
+        catalog = RunCatalog(self.test_dir)
+        self.assertEqual(catalog.runs["2025.01.02 10.00"]["status"], "compressed")
+        self.assertEqual(catalog.apply_retention(keep=1), [])
+        with open(os.path.join(self.test_dir, CATALOG_FILENAME)) as f:
+            self.assertEqual(len(f.readlines()), 5)
+
+
+class TestStageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def stages(self, exclusions_hash):
+        def step(name, result):
+            def compute(value):
+                self.calls.append(name)
+                return (value or []) + [result]
+            return compute
+        read_key = stage_key("read", "picks-hash")
+        validate_key = stage_key("validate", read_key, "hr-hash")
+        exclusions_key = stage_key("exclusions", validate_key, exclusions_hash)
+        return [("read", read_key, step("read", 1)), ("validate", validate_key, step("validate", 2)),
+                ("exclusions", exclusions_key, step("exclusions", exclusions_hash))]
+
+    def test_resumes_after_last_cached_stage(self):
+        cache = StageCache(self.test_dir)
+        self.assertEqual(cache.run(self.stages("x1")), [1, 2, "x1"])
+        self.assertEqual(self.calls, ["read", "validate", "exclusions"])
+
+        # New exclusions only: reading and validation come from the cache
+        self.calls = []
+        manifest = RunManifest("2025.01.01 10.00", self.test_dir)
+        self.assertEqual(cache.run(self.stages("x2"), manifest), [1, 2, "x2"])
+        self.assertEqual(self.calls, ["exclusions"])
+        self.assertEqual(manifest.cached_stages, ["read", "validate"])
+
+        # Nothing changed: the last result is loaded
+        self.calls = []
+        self.assertEqual(cache.run(self.stages("x2")), [1, 2, "x2"])
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_config.py
+import pickle
+import random
+import threading
+import unittest
+from datetime import date
+
+from vacation_selection.cal import make_calendar
+from vacation_selection.config import RunConfig, active_config, use_config
+from vacation_selection.firefighter import FFighter, Pick
+from vacation_selection.increment import Increment
+
+# Single 48-hour increment, two people off, versus the default day_1/day_2 with six
+FULL_SHIFT = RunConfig(increment_names=("FULL",), max_total_ffighters_allowed=2)
+SPLIT_SHIFT = RunConfig()
+
+
+def draft(config):
+    """Five captains ask for day_1 of the same shift; returns their determinations."""
+    with use_config(config):
+        ffighters = [FFighter(i, f"First{i}", "Test", date(2010, 1, i), "Captain", "A",
+                              [Pick(date(2025, 10, 2), increments="day_1")]) for i in range(1, 6)]
+        results = make_calendar(ffighters, silent_mode=True)
+    day = results["calendar"][date(2025, 10, 2)]
+    return [ff.processed[0].determination for ff in ffighters], day
+
+
+class TestRunConfig(unittest.TestCase):
+
+    def test_class_defaults_outside_a_run(self):
+        self.assertEqual(active_config(), RunConfig.from_class_defaults())
+        self.assertEqual(active_config().increment_names, tuple(Increment.increment_names))
+        with use_config(FULL_SHIFT):
+            self.assertIs(active_config(), FULL_SHIFT)
+            self.assertEqual(Increment.tables().full, 0b1)
+        self.assertEqual(Increment.tables().full, 0b11)
+
+    def test_days_keep_their_config(self):
+        determinations, day = draft(FULL_SHIFT)
+        self.assertIs(day.config, FULL_SHIFT)
+        self.assertEqual(determinations.count("Approved"), 2)
+        self.assertEqual(list(day.increments), [0])
+
+        determinations, day = draft(SPLIT_SHIFT)
+        self.assertEqual(determinations.count("Approved"), 3)  # Captain limit per increment
+        self.assertEqual(len(day.increments), 2)
+
+    def test_concurrent_runs(self):
+        expected = {name: draft(config)[0] for name, config in [("full", FULL_SHIFT), ("split", SPLIT_SHIFT)]}
+        results = {}
+
+        def run(name, config):
+            for _ in range(20):
+                results.setdefault(name, set()).add(tuple(draft(config)[0]))
+
+        threads = [threading.Thread(target=run, args=("full", FULL_SHIFT)),
+                   threading.Thread(target=run, args=("split", SPLIT_SHIFT))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {name: {tuple(value)} for name, value in expected.items()})
+
+    def test_firefighters_must_match_the_config(self):
+        ffighters = [FFighter(1, "First1", "Test", date(2010, 1, 1), "Captain", "A", [Pick(date(2025, 10, 2))])]
+        with self.assertRaisesRegex(ValueError, "increment"):
+            make_calendar(ffighters, silent_mode=True, config=FULL_SHIFT)
+        with use_config(FULL_SHIFT):
+            ffighters[0].picks.append(Pick(date(2025, 10, 8)))  # Parsed under the config, but the owner was not
+            with self.assertRaises(ValueError):
+                make_calendar(ffighters, silent_mode=True)
+
+    def test_each_run_rolls_its_own_dice(self):
+        def dice(seed):
+            ffighters = [FFighter(i, f"First{i}", "Test", date(2010, 1, 1), "Captain", "A", [Pick(date(2025, 10, i))])
+                         for i in range(1, 6)]
+            random.seed(seed)  # The global generator is not used when the run has its own
+            make_calendar(ffighters, silent_mode=True, rng=random.Random(7))
+            return [ff.dice for ff in ffighters]
+
+        self.assertEqual(dice(1), dice(2))
+
+    def test_display_and_pickling(self):
+        pick = Pick(date(2025, 10, 2), increments="day_2")
+        self.assertEqual(pick.format_date_display(SPLIT_SHIFT), "10/03")
+        self.assertEqual(pick.format_date_display(SPLIT_SHIFT.replace(shift_duration_hours=24)), "10/02")
+
+        restored = pickle.loads(pickle.dumps(FULL_SHIFT))
+        self.assertEqual(restored, FULL_SHIFT)
+        self.assertIs(restored.tables, FULL_SHIFT.tables)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# tests/test_dates.py
+import unittest
+from datetime import date, datetime
+from vacation_selection.dates import DateParser
+
+
+class TestDateParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = DateParser()
+
+    def test_parse_known_formats(self):
+        self.assertEqual(self.parser.parse("2024-11-15"), date(2024, 11, 15))
+        self.assertEqual(self.parser.parse("11/15/2024"), date(2024, 11, 15))
+        self.assertEqual(self.parser.parse("9-5-2023"), date(2023, 9, 5))
+        self.assertEqual(self.parser.parse("2024-11-15T00:00:00"), date(2024, 11, 15))
+
+    def test_parse_date_like_objects(self):
+        self.assertEqual(self.parser.parse(datetime(2024, 1, 2, 8, 30)), date(2024, 1, 2))
+        self.assertEqual(self.parser.parse(date(2024, 1, 2)), date(2024, 1, 2))
+        with self.assertRaises(TypeError):
+            self.parser.parse(20240102)
+
+    def test_unrecognized_format(self):
+        with self.assertRaises(ValueError):
+            self.parser.parse("not a date")
+
+    def test_single_values_do_not_change_each_other(self):
+        # Month-first wins for ambiguous values, and a day-first value does not flip later ones
+        parsed = [self.parser.parse(value) for value in ("01/02/2024", "13/02/2024", "01/02/2024")]
+        self.assertEqual(parsed, [date(2024, 1, 2), date(2024, 2, 13), date(2024, 1, 2)])
+
+    def test_parse_column_detects_day_first(self):
+        # 15/11 rules out month-first for the whole column, so 01/02 is read as 1 Feb
+        values = ["01/02/2025", "15/11/2024", ""]
+        self.assertEqual(self.parser.detect_format(values), '%d/%m/%Y')
+        self.assertEqual(self.parser.parse_column(values), [date(2025, 2, 1), date(2024, 11, 15), None])
+        self.assertEqual(self.parser.parse("01/02/2025"), date(2025, 1, 2))  # Nothing is remembered
+
+    def test_cache_is_bounded(self):
+        parser = DateParser(cache_size=2)
+        for day in range(1, 6):
+            parser.parse(f"2024-01-0{day}")
+        self.assertLessEqual(parser._parse_string.cache_info().currsize, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
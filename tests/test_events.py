@@ -0,0 +1,82 @@
+# tests/test_events.py
+import threading
+import unittest
+from datetime import date
+
+from vacation_selection import events
+from vacation_selection.cal import make_calendar, validate_pick_with_reasoning
+from vacation_selection.firefighter import FFighter, Pick
+
+
+def make_ffighter(idnum, picks):
+    return FFighter(idnum, f"First{idnum}", "Test", date(2010, 1, idnum), "Firefighter", "A", picks)
+
+
+class TestDraftEvents(unittest.TestCase):
+
+    def test_make_calendar_streams_typed_events(self):
+        batches = []
+        ffighters = [make_ffighter(i, [Pick(date(2025, 10, 2), increments="day_1")]) for i in range(1, 9)]
+        make_calendar(ffighters, silent_mode=True, subscribers=[batches.append])
+
+        received = [event for batch in batches for event in batch]
+        kinds = [event.kind for event in received]
+        self.assertEqual(kinds[0], events.ROUND_STARTED)
+        self.assertEqual(kinds[-1], events.ROUND_ENDED)
+        self.assertEqual(kinds.count(events.CONSIDERED), 8)
+        self.assertEqual(kinds.count(events.APPROVED), 6)
+
+        denied = [event for event in received if event.kind == events.DENIED]
+        self.assertEqual([event.code for event in denied], ["increments_full", "increments_full"])
+        self.assertIs(denied[0].pick, denied[0].ffighter.processed[-1])
+        # The stream is closed once the draft is done
+        self.assertEqual(events.active_streams(), ())
+
+    def test_events_are_batched(self):
+        batches = []
+        ffighters = [make_ffighter(i, [Pick(date(2025, 10, 2))]) for i in range(1, 4)]
+        with events.subscribed([batches.append], batch_size=2):
+            make_calendar(ffighters, silent_mode=True)
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual(sum(len(batch) for batch in batches), 8)
+
+    def test_partial_grant_event(self):
+        ffighter = make_ffighter(1, [])
+        ffighter.current_pick = Pick(date(2025, 10, 2))
+        ffighter.approved_shifts_count = ffighter.max_shifts_off - 0.5
+
+        batches = []
+        validate_pick_with_reasoning(ffighter, {}, {}, subscribers=[batches.append])
+        self.assertEqual([event.kind for event in batches[0]], [events.CONSIDERED, events.PARTIAL])
+
+    def test_concurrent_drafts_keep_their_events(self):
+        received = {}
+        first_round_done = threading.Barrier(4, timeout=5)  # Keeps all four drafts running at once
+
+        def run(idnum):
+            ffighters = [make_ffighter(idnum, [Pick(date(2025, 10, day)) for day in range(1, 6)])]
+            batches = []
+
+            def on_events(batch):
+                if not batches:
+                    first_round_done.wait()
+                batches.append(batch)
+
+            make_calendar(ffighters, silent_mode=True, count=1, subscribers=[on_events])
+            received[idnum] = {event.ffighter.idnum for batch in batches for event in batch
+                               if isinstance(event, events.DecisionEvent)}
+
+        threads = [threading.Thread(target=run, args=(idnum,)) for idnum in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(received, {idnum: {idnum} for idnum in range(1, 5)})
+
+    def test_denial_codes(self):
+        self.assertEqual(events.denial_code("Schedule Reassignment: (Training Division)"), "exclusion")
+        self.assertEqual(events.denial_code("Something new"), "other")
+
+
+if __name__ == '__main__':
+    unittest.main()
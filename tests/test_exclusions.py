@@ -0,0 +1,52 @@
+# tests/test_exclusions.py
+import unittest
+from datetime import date
+
+from vacation_selection.exclusions import ExclusionMatcher, apply_exclusions
+from vacation_selection.firefighter import FFighter
+
+
+def make_ffighter(idnum, fname, lname):
+    return FFighter(idnum, fname, lname, date(2010, 1, 1), "Captain", "A", [])
+
+
+def make_exclusion(fname, lname, **extra):
+    return {"FName": fname, "LName": lname, "Leave Start": date(2025, 3, 1), "Leave End": None,
+            "Reason": "Schedule Reassignment", **extra}
+
+
+class TestExclusionMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.ffighters = [
+            make_ffighter(1, "John", "Smith"),
+            make_ffighter(2, "Jon", "Smyth"),
+            make_ffighter(3, "Maria", "O'Hara"),
+            make_ffighter(4, "Chris", "Lee"),
+            make_ffighter(5, "Chris", "Lee"),
+        ]
+        self.matcher = ExclusionMatcher(self.ffighters)
+
+    def test_id_wins_over_name(self):
+        self.assertEqual(self.matcher.match(make_exclusion("John", "Smith", ID=2.0)), [self.ffighters[1]])
+
+    def test_exact_normalized_and_swapped_names(self):
+        self.assertEqual(self.matcher.match(make_exclusion("maria", "OHARA")), [self.ffighters[2]])
+        self.assertEqual(self.matcher.match(make_exclusion("Smith", "John")), [self.ffighters[0]])
+
+    def test_fuzzy_picks_best_score_not_first_match(self):
+        # "Jonn Smyth" is within the threshold of both 1 and 2, but closest to 2
+        self.assertEqual(self.matcher.match(make_exclusion("Jonn", "Smyth")), [self.ffighters[1]])
+
+    def test_unmatched_and_ambiguous_in_one_pass(self):
+        exclusions = [make_exclusion("Maria", "Ohara"), make_exclusion("Chris", "Lee"), make_exclusion("Nobody", "Here")]
+        unmatched, ambiguous = apply_exclusions(exclusions, self.ffighters)
+        self.assertEqual(unmatched, ["Nobody Here"])
+        self.assertEqual(len(ambiguous), 1)
+        self.assertTrue(ambiguous[0].startswith("Chris Lee -> "))
+        self.assertEqual(len(self.ffighters[2].exclusions), 1)
+        self.assertEqual(self.ffighters[3].exclusions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
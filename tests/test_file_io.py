@@ -53,6 +53,19 @@ class TestFileIO(unittest.TestCase):
         self.assertEqual(ffighters[0].name, self.test_ffighters[0].name)
         self.assertEqual(ffighters[0].rank, self.test_ffighters[0].rank)
 
+    def test_streaming_json_modes_round_trip(self):
+        """Compact and JSON Lines output read back the same as the pretty format."""
+        for mode in ("compact", "jsonl"):
+            file_name = write_ffighters_to_json(self.test_ffighters, self.suffix, self.test_dir, self.runtime, mode=mode)
+            try:
+                ffighters = read_ffighters_from_json(file_name)
+                self.assertEqual(len(ffighters), 1)
+                self.assertEqual(ffighters[0].name, self.test_ffighters[0].name)
+                self.assertEqual([pick.date for pick in ffighters[0].picks],
+                                 [pick.date for pick in self.test_ffighters[0].picks])
+            finally:
+                os.remove(file_name)
+
     def test_write_picks_to_csv(self):
         """Test writing firefighter picks to a CSV file."""
         write_picks_to_csv(self.test_ffighters, self.suffix, self.test_dir, self.runtime)
@@ -1,5 +1,6 @@
 # tests/test_firefighter.py
 import unittest
+from vacation_selection.config import RunConfig, use_config
 from vacation_selection.firefighter import FFighter, Pick
 from datetime import datetime, date
 
@@ -52,5 +53,29 @@ class TestFFighter(unittest.TestCase):
         self.assertEqual(ffighter.name, 'Doe, J')
         self.assertEqual(ffighter.rank, 'Captain')
 
+    def test_balances_in_increment_units(self):
+        """Balances count whole increments; caps keep their shift value but compare in units."""
+        self.ffighter.awarded_vacation_shifts = 0.75  # Room for one half-shift increment
+        self.assertEqual((self.ffighter.awarded_vacation_units, self.ffighter.awarded_vacation_shifts), (1, 0.75))
+
+        picks = list(self.picks)
+        for _ in picks:
+            self.ffighter.process_next_pick()
+            self.ffighter.approve_current_pick()
+        self.assertEqual([pick.type for pick in picks], ["Vacation", "Holiday"])
+        self.assertEqual((self.ffighter.approved_units, self.ffighter.used_holiday_units), (2, 1))
+        self.assertEqual(self.ffighter.approved_shifts_count, 1.0)
+
+        restored = FFighter.from_dict(self.ffighter.to_dict())
+        self.assertEqual((restored.approved_units, restored.used_vacation_units), (2, 1))
+
+    def test_balances_keep_their_units_per_shift(self):
+        """Shifts are converted with the width the firefighter was created under, not the active config's."""
+        self.ffighter.approved_units = 1
+        with use_config(RunConfig(increment_names=("FULL",))):
+            self.assertEqual(self.ffighter.approved_shifts_count, 0.5)
+            self.ffighter.used_vacation_shifts = 1
+        self.assertEqual((self.ffighter.approved_shifts_count, self.ffighter.used_vacation_units), (0.5, 2))
+
 if __name__ == '__main__':
     unittest.main()
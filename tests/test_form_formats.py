@@ -0,0 +1,42 @@
+# tests/test_form_formats.py
+import unittest
+from vacation_selection.form_formats import FormFormat, get_form_format, numbered_pick_columns
+
+
+class TestFormFormats(unittest.TestCase):
+
+    def test_registered_years(self):
+        self.assertEqual(get_form_format(2024).year, 2024)
+        self.assertEqual(get_form_format(2025).year, 2025)
+        with self.assertRaises(ValueError):
+            get_form_format(1999)
+
+    def test_compile_reports_missing_columns(self):
+        with self.assertRaises(ValueError) as context:
+            get_form_format(2025).compile(["First Name", "Last Name"])
+        self.assertIn("Employee Hire Date", str(context.exception))
+
+    def test_pick_cells_use_compiled_indexes(self):
+        headers = ["First Name", "Last Name", "Rank", "Employee ID #", "Employee Hire Date", "Shift",
+                   "Acknowledgment of Form Completion",
+                   "Shift Selection 2", "Day 1", "Shift Selection 1", "Day 2"]
+        compiled = get_form_format(2025).compile(headers)
+        row = ["John", "Doe", "Captain", "1", "01/01/2015", "A", "", "day_2", "10/02/2025", "day_1", "10/04/2025"]
+
+        self.assertEqual(compiled.field(row, "lname"), "Doe")
+        self.assertEqual(list(compiled.pick_cells(row)), [
+            ("Day 1", "10/02/2025", "Untyped", "day_1"),
+            ("Day 2", "10/04/2025", "Untyped", "day_2"),
+        ])
+
+    def test_format_from_dict(self):
+        form_format = FormFormat.from_dict({
+            "year": 2030,
+            "fields": {"fname": "F", "lname": "L", "rank": "R", "idnum": "ID", "hire_date": "H", "shift": "S"},
+            "numbered_pick_columns": {"first": 1, "last": 2, "day": "Pick {n}", "increments": "Half {n}"},
+        })
+        self.assertEqual(form_format.pick_columns, numbered_pick_columns(1, 2, "Pick {n}", increments="Half {n}"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# tests/test_identity.py
+import os
+import tempfile
+import unittest
+
+from vacation_selection.identity import IdentityIndex, parse_name
+
+HR_RECORDS = [
+    {"Employee Number": 101, "Employee Name": "Obiedo, Salvador Gabriel"},
+    {"Employee Number": 102, "Employee Name": "Smith, John"},
+    {"Employee Number": 103, "Employee Name": "Smith, Jane"},
+]
+
+
+class TestIdentityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = IdentityIndex.from_hr_records(HR_RECORDS)
+
+    def test_parse_name(self):
+        self.assertEqual(parse_name("Obiedo, Salvador Gabriel"), ("Salvador", "Gabriel", "Obiedo"))
+        self.assertEqual(parse_name("John Q Public"), ("John", "Q", "Public"))
+
+    def test_resolution_order(self):
+        self.assertEqual(self.index.resolve(102.0, "Nobody", "Here").method, "id")
+        match = self.index.resolve(None, "jane", "smith")
+        self.assertEqual((match.position, match.method), (2, "name"))
+        match = self.index.resolve(None, "Salvadore", "Obiedo")
+        self.assertEqual((match.position, match.method), (0, "fuzzy"))
+        self.assertIsNone(self.index.resolve(None, "Maria", "Lopez"))
+
+    def test_top_2_scorer_uses_middle_names(self):
+        index = IdentityIndex.from_hr_records(HR_RECORDS, scorer="top_2")
+        self.assertEqual(index.resolve(None, "Salvador", "Obiedo", middle="G").position, 0)
+
+    def test_groups_partition_matches(self):
+        index = IdentityIndex()
+        index.add(1, "John", "Smith", group="A")
+        index.add(2, "John", "Smith", group="B")
+        self.assertEqual(index.resolve(None, "John", "Smith", group="b").position, 1)
+        self.assertIsNone(index.resolve(2, "Someone", "Else", group="A"))
+
+    def test_cache_is_reused_until_the_hr_file_changes(self):
+        with tempfile.TemporaryDirectory() as folder:
+            hr_path = os.path.join(folder, "hr.xlsx")
+            with open(hr_path, "w") as f:
+                f.write("v1")
+            index = IdentityIndex.for_hr_file(hr_path, HR_RECORDS, cache_dir=folder)
+            index.resolve_many([{"first": "Salvadore", "last": "Obiedo"}])
+
+            cached = IdentityIndex.for_hr_file(hr_path, HR_RECORDS, cache_dir=folder)
+            self.assertEqual(cached.resolved, index.resolved)
+            self.assertEqual(cached.resolve(103, "x", "y").position, 2)
+
+            with open(hr_path, "w") as f:
+                f.write("v2")
+            self.assertEqual(IdentityIndex.for_hr_file(hr_path, HR_RECORDS, cache_dir=folder).resolved, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
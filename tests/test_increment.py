@@ -0,0 +1,37 @@
+# tests/test_increment.py
+import unittest
+from datetime import date
+
+from vacation_selection.firefighter import Pick
+from vacation_selection.increment import Increment, increment_tables
+
+
+class TestIncrementMasks(unittest.TestCase):
+
+    def test_two_increment_names_round_trip(self):
+        for text, mask in [("day_1", 0b01), ("day_2", 0b10), ("day_1day_2", 0b11), ("FULL", 0b11),
+                           ("AM", 0b01), ("PM", 0b10), ("AMPM", 0b11)]:
+            self.assertEqual(Increment.process_increments(text), mask)
+        self.assertEqual([Increment.increments_to_plain_text(mask) for mask in range(4)],
+                         ["ERROR", "day_1", "day_2", "FULL"])
+        self.assertEqual(Increment.process_increments([0, 1]), 0b10)
+
+    def test_one_and_three_increments(self):
+        single = increment_tables(("FULL",))
+        self.assertEqual((single.masks["AMPM"], single.masks["FULL"], single.text[1]), (1, 1, "FULL"))
+
+        three = increment_tables(("day_1", "day_2", "day_3"))
+        self.assertEqual(three.masks["day_1day_3"], 0b101)
+        self.assertEqual(three.text[0b101], "day_1+day_3")
+        self.assertEqual((three.counts[0b111], three.bits[0b110]), (3, (1, 2)))
+
+    def test_pick_serializes_as_text(self):
+        pick = Pick(date(2025, 10, 2), "Vacation", "Approved", increments="day_1day_2")
+        pick.approved_increments = Increment.process_increments("day_2")
+        self.assertEqual(pick.to_dict()["increments"], "day_2")
+        self.assertEqual(pick.to_dict()["date_display"], "10/03")
+        self.assertEqual(Pick.from_dict(pick.to_dict()).increments, 0b10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# tests/test_main.py
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from vacation_selection.main import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.work_dir.cleanup)
+        self.picks = os.path.join(self.work_dir.name, "picks.csv")
+        with open(self.picks, "w") as f:
+            f.write("")  # No firefighters
+        self.hr = os.path.join(self.work_dir.name, "missing.xlsx")
+
+    def test_errors_reach_a_caller_in_another_thread(self):
+        errors = []
+
+        def run():
+            try:
+                main(self.picks, self.hr, 2025, use_cache=False)
+            except ValueError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(errors), 1)
+
+    def test_cli_exits_with_status_1(self):
+        result = subprocess.run([sys.executable, "-m", "vacation_selection.main", "--picks", self.picks,
+                                 "--hr", self.hr, "--format", "2025", "--no-cache"],
+                                cwd=self.work_dir.name, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=ROOT))
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("ERROR", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
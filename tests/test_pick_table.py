@@ -0,0 +1,129 @@
+# tests/test_pick_table.py
+import copy
+import gc
+import pickle
+import threading
+import unittest
+import weakref
+from datetime import date
+
+import numpy as np
+
+from vacation_selection.firefighter import FFighter, Pick
+from vacation_selection import pick_table
+from vacation_selection.pick_table import PickTable, default_table, rows_of
+
+
+def make_ffighter(idnum, picks):
+    return FFighter(idnum, f"First{idnum}", f"Last{idnum}", date(2015, 1, 1), "Captain", "A", picks)
+
+
+class TestPickTable(unittest.TestCase):
+
+    def setUp(self):
+        # Picks other tests left alive keep the shared default table; start each test with a new one
+        self._default_table = pick_table._default_table
+        pick_table._default_table = None
+        self.addCleanup(setattr, pick_table, "_default_table", self._default_table)
+        self.table = PickTable()
+        self.picks = [
+            Pick(date(2025, 10, 2), "Vacation", increments="day_1", table=self.table),
+            Pick(date(2025, 10, 8), determination="Rejected", reason="Max days off already reached",
+                 place=3, source="Telestaff", table=self.table),
+        ]
+
+    def test_pick_is_a_view_of_its_row(self):
+        pick = self.picks[1]
+        self.assertEqual((pick.table, pick.row), (self.table, 1))
+        self.assertEqual((pick.date, pick.type, pick.determination), (date(2025, 10, 8), "Untyped", "Rejected"))
+        self.assertEqual((pick.reason, pick.place, pick.source), ("Max days off already reached", 3, "Telestaff"))
+        self.assertIsNone(self.picks[0].reason)
+        self.assertIsNone(self.picks[0].place)
+        self.assertIsNone(self.picks[0].approved_increments)
+
+        pick.determination = "Approved"
+        pick.approved_increments = 0b10
+        pick.reason = None
+        self.assertEqual(self.table.determinations.decode(self.table.determination[1]), "Approved")
+        self.assertEqual((pick.approved_increments, pick.reason), (0b10, None))
+        self.assertEqual(len(self.table.reasons), 1)  # Reason text is interned once
+
+    def test_views_and_arrays(self):
+        with self.table.views() as columns:
+            self.assertTrue(np.shares_memory(columns["date"], np.frombuffer(self.table.date, dtype="i")))
+            self.assertEqual(list(columns["requested"]), [0b01, 0b11])
+        # arrays() are copies, so the table can keep growing while they are held
+        columns = self.table.arrays()
+        Pick(date(2025, 12, 1), table=self.table)
+        self.assertEqual(len(columns["date"]), 2)
+
+        frame = self.table.to_pandas(rows=[1, 0])
+        self.assertEqual(list(frame["date"].dt.day), [8, 2])
+        self.assertEqual(list(frame["type"]), ["Untyped", "Vacation"])
+        self.assertEqual(frame["reason"].isna().tolist(), [False, True])
+
+    def test_reading_while_another_thread_appends(self):
+        errors = []
+
+        def append():
+            try:
+                for _ in range(20000):
+                    self.table.append(date(2025, 10, 2), "Vacation", "Unaddressed", 0b11)
+            except BufferError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=append)
+        thread.start()
+        while thread.is_alive():
+            self.table.arrays()
+        thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.table.arrays()["date"]), 20002)
+
+    def test_tables_are_freed_with_their_picks(self):
+        table = PickTable()
+        picks = [Pick(date(2025, 10, 2), table=table) for _ in range(3)]
+        table = weakref.ref(table)
+        del picks
+        gc.collect()
+        self.assertIsNone(table())
+
+        # The default table starts over once none of its picks are left
+        first = default_table()
+        pick = Pick(date(2025, 10, 2))
+        self.assertIs(pick.table, first)
+        first = weakref.ref(first)
+        del pick
+        gc.collect()
+        self.assertIsNone(first())
+        self.assertEqual(len(default_table()), 0)
+
+        # Reloading the same firefighters does not keep the previous load's rows
+        records = [make_ffighter(1, list(self.picks)).to_dict()]
+        first = FFighter.from_dict(records[0])
+        second = FFighter.from_dict(records[0])
+        self.assertEqual(len(first.picks[0].table), 2)
+        self.assertIsNot(second.picks[0].table, first.picks[0].table)
+
+    def test_owner_and_pickling(self):
+        ffighter = make_ffighter(1, list(self.picks))
+        self.assertIs(self.picks[0].ffighter, ffighter)
+
+        restored = pickle.loads(pickle.dumps(ffighter))
+        self.assertEqual(len(restored.picks[0].table), len(self.table))  # The table is pickled once
+        self.assertEqual([pick.to_dict() for pick in restored.picks], [pick.to_dict() for pick in self.picks])
+        self.assertIs(restored.picks[1].ffighter, restored)
+        clone = copy.deepcopy(self.picks[1])
+        self.assertIsNot(clone.table, self.table)
+        self.assertEqual(clone.to_dict(), self.picks[1].to_dict())
+        self.assertEqual(len(self.table), 2)  # Copying adds no rows to the original
+
+    def test_rows_of_mixed_tables(self):
+        other = Pick(date(2025, 11, 4))
+        table, rows = rows_of([self.picks[0], other])
+        self.assertEqual(len(table), 2)
+        self.assertEqual(list(table.arrays(rows)["date"]), [date(2025, 10, 2).toordinal(), date(2025, 11, 4).toordinal()])
+
+
+if __name__ == '__main__':
+    unittest.main()
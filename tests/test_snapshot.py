@@ -0,0 +1,49 @@
+# tests/test_snapshot.py
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from vacation_selection.cal import make_calendar
+from vacation_selection.firefighter import FFighter, Pick
+from vacation_selection.snapshot import save_snapshot, load_snapshot
+
+
+def make_ffighter(idnum, picks):
+    return FFighter(idnum, f"First{idnum}", "Test", date(2010, 1, idnum), "Captain", "A", picks)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        # Four captains ask for the same day; only three can be approved
+        self.ffighters = [make_ffighter(i, [Pick(date(2025, 10, 2), increments="day_1")]) for i in range(1, 5)]
+        self.shift_calendars = {"A": make_calendar(self.ffighters, silent_mode=True)}
+        handle, self.snapshot_path = tempfile.mkstemp(suffix=".vsnap")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.snapshot_path)
+
+    def test_round_trip_keeps_draft_state(self):
+        save_snapshot(self.snapshot_path, self.ffighters, self.shift_calendars)
+        ffighters, shift_calendars = load_snapshot(self.snapshot_path)
+
+        increment = shift_calendars["A"]["calendar"][date(2025, 10, 2)].increments[0]
+        self.assertEqual(increment.rank_counts["Captain"], 3)
+        self.assertEqual(len(increment.runner_ups), 1)
+        self.assertEqual(shift_calendars["A"]["rejected"], self.shift_calendars["A"]["rejected"])
+        self.assertEqual([ff.approved_shifts_count for ff in ffighters],
+                         [ff.approved_shifts_count for ff in self.ffighters])
+        # Calendar entries still point at the restored firefighter objects
+        self.assertIs(increment.ffighters[0], ffighters[0])
+
+    def test_rejects_other_files(self):
+        with open(self.snapshot_path, "wb") as f:
+            f.write(b"not a snapshot")
+        with self.assertRaises(ValueError):
+            load_snapshot(self.snapshot_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "matplotlib", "tkinter", "fuzzywuzzy"]
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_import_has_no_side_effects(self):
+        """Importing the package and the headless entry point loads no heavy modules and writes nothing."""
+        code = ("import sys, vacation_selection, vacation_selection.main; "
+                f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])")
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = subprocess.run([sys.executable, "-c", code], cwd=work_dir, capture_output=True, text=True,
+                                    env=dict(os.environ, PYTHONPATH=ROOT), check=True)
+            self.assertEqual(result.stdout.strip(), "[]")
+            self.assertEqual(os.listdir(work_dir), [])
+
+    def test_run_py_headless_loads_no_gui(self):
+        """run.py with arguments goes to the headless CLI without importing the GUI or pandas."""
+        code = ("import runpy, sys\n"
+                "sys.argv = ['run.py', '--help']\n"
+                "try:\n"
+                f"    runpy.run_path({os.path.join(ROOT, 'run.py')!r}, run_name='__main__')\n"
+                "except SystemExit:\n"
+                "    pass\n"
+                f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])")
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = subprocess.run([sys.executable, "-c", code], cwd=work_dir, capture_output=True, text=True,
+                                    env=dict(os.environ, PYTHONPATH=ROOT), check=True)
+            self.assertIn("--picks", result.stdout)
+            self.assertEqual(result.stdout.strip().splitlines()[-1], "[]")
+
+    def test_submodules_load_on_access(self):
+        import vacation_selection
+        self.assertTrue(hasattr(vacation_selection.dates, "parse_date"))
+        with self.assertRaises(AttributeError):
+            vacation_selection.not_a_module
+
+
+if __name__ == '__main__':
+    unittest.main()
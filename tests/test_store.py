@@ -0,0 +1,87 @@
+# tests/test_store.py
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from vacation_selection.cal import make_calendar
+from vacation_selection.firefighter import FFighter, Pick
+from vacation_selection.file_io import (
+    write_ffighters_to_json, read_ffighters_from_json, write_analysis_to_json, read_analysis_from_json
+)
+from vacation_selection.store import RunStore, STORE_FILENAME
+
+
+def make_ffighter(idnum, picks, rank="Captain"):
+    return FFighter(idnum, f"First{idnum}", "Test", date(2010, 1, idnum), rank, "A", picks)
+
+
+class TestRunStore(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, STORE_FILENAME)
+        # Four captains ask for the same day; only three can be approved
+        self.ffighters = [make_ffighter(i, [Pick(date(2025, 10, 2), increments="day_1"),
+                                            Pick(date(2025, 10, 4))]) for i in range(1, 5)]
+        self.calendar = make_calendar(self.ffighters, silent_mode=True)["calendar"]
+
+    def tearDown(self):
+        for file_name in os.listdir(self.test_dir):
+            os.remove(os.path.join(self.test_dir, file_name))
+        os.rmdir(self.test_dir)
+
+    def test_round_trip_ffighters(self):
+        with RunStore(self.db_path) as store:
+            store.write_ffighters("run-1", self.ffighters)
+            ffighters = store.read_ffighters()
+
+        self.assertEqual([ff.idnum for ff in ffighters], ["1", "2", "3", "4"])
+        original, restored = self.ffighters[3], ffighters[3]
+        self.assertEqual(restored.approved_shifts_count, original.approved_shifts_count)
+        self.assertEqual([(p.date, p.determination, p.approved_increments) for p in restored.processed],
+                         [(p.date, p.determination, p.approved_increments) for p in original.processed])
+
+    def test_rewriting_a_shift_replaces_it(self):
+        with RunStore(self.db_path) as store:
+            store.write_ffighters("run-1", self.ffighters)
+            store.write_ffighters("run-1", self.ffighters)
+            self.assertEqual(len(store.read_ffighters("run-1")), 4)
+
+    def test_reading_a_shift_loads_only_its_picks(self):
+        other_shift = FFighter(9, "First9", "Test", date(2010, 2, 1), "Captain", "B",
+                               [Pick(date(2025, 10, 6)), Pick(date(2025, 10, 7))])
+        with RunStore(self.db_path) as store:
+            store.write_ffighters("run-1", self.ffighters + [other_shift])
+            ffighters = store.read_ffighters("run-1", shift="A")
+
+        self.assertEqual([ff.idnum for ff in ffighters], ["1", "2", "3", "4"])
+        # All picks read share one table, which holds shift A's picks and no others
+        self.assertEqual(len(ffighters[0].processed[0]._table), 8)
+
+    def test_query_picks_and_increments(self):
+        with RunStore(self.db_path) as store:
+            store.write_ffighters("run-1", self.ffighters)
+            store.write_increments("run-1", "A", self.calendar)
+            store.write_increments("run-1", "A", self.calendar, kind="runner_up")
+
+            denied = store.query_picks(date_from=date(2025, 10, 2), date_to=date(2025, 10, 2),
+                                       determination="Rejected")
+            self.assertEqual([row["idnum"] for row in denied], ["4"])
+            self.assertEqual(len(store.query_picks(idnum=1)), 2)
+
+            runner_ups = store.query_increments(day=date(2025, 10, 2), kind="runner_up")
+            self.assertEqual([(row["increment"], row["idnum"]) for row in runner_ups], [("day_1", "4")])
+
+    def test_file_io_backend_switch(self):
+        write_ffighters_to_json(self.ffighters, "A_ffighters", self.test_dir, "run-1", backend="sqlite")
+        write_analysis_to_json({"total": 4}, self.test_dir, "run-1", backend="sqlite")
+
+        self.assertEqual(len(read_ffighters_from_json(self.db_path, backend="sqlite")), 4)
+        self.assertEqual(read_analysis_from_json(self.test_dir, backend="sqlite"), {"total": 4})
+        with self.assertRaises(ValueError):
+            write_ffighters_to_json(self.ffighters, "A", self.test_dir, "run-1", backend="xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
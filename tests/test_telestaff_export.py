@@ -0,0 +1,87 @@
+# tests/test_telestaff_export.py
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from vacation_selection.cal import make_calendar
+from vacation_selection.config import RunConfig
+from vacation_selection.firefighter import FFighter, Pick
+from vacation_selection.telestaff_export import (TELESTAFF_COLUMNS, build_import_rows, diff_import_rows, json_pick_frame,
+                                                 pick_frame, write_telestaff_delta)
+
+
+def make_ffighter(idnum, picks):
+    return FFighter(idnum, f"First{idnum}", "Test", date(2010, 1, idnum), "Captain", "A", picks)
+
+
+class TestTelestaffExport(unittest.TestCase):
+
+    def setUp(self):
+        # Four captains ask for the same day; the fourth is rejected
+        self.ffighters = [make_ffighter(i, [Pick(date(2025, 10, 2), "Vacation", increments="day_2")]) for i in range(1, 5)]
+        self.ffighters[0].picks.append(Pick(date(2025, 10, 8), "Holiday", increments="FULL"))
+        make_calendar(self.ffighters, silent_mode=True)
+
+    def test_rows_from_ffighters(self):
+        rows = build_import_rows(pick_frame(self.ffighters))
+        self.assertEqual(list(rows.columns), TELESTAFF_COLUMNS)
+        self.assertEqual(len(rows), 4)  # 3 approved day_2 picks + 1 FULL holiday
+        first = rows[rows["Payroll ID"] == "1"].sort_values("Start Date")
+        # day_2 of a 48-hour shift starts on the second day
+        self.assertEqual(first["Start Date"].tolist(), ["10/03/2025", "10/08/2025"])
+        self.assertEqual(first["Duration (hours)"].tolist(), [24, 48])
+        self.assertEqual(first["Work Code"].tolist(), [pick.type[0] for pick in sorted(self.ffighters[0].processed, key=lambda p: p.date)])
+
+    def test_start_dates_match_the_displayed_dates(self):
+        for config in (RunConfig(), RunConfig(shift_duration_hours=24), RunConfig(transition_date=date(2026, 1, 1))):
+            rows = build_import_rows(pick_frame(self.ffighters, config), config)
+            # A full shift displays as a range; its import row starts on the first day
+            displayed = sorted(pick.format_date_display(config).split(" - ")[0] + "/2025"
+                               for ff in self.ffighters for pick in ff.processed if pick.determination != "Rejected")
+            self.assertEqual(sorted(rows["Start Date"]), displayed)
+
+    def test_json_records_give_the_same_rows(self):
+        records = [ff.to_dict() for ff in self.ffighters]
+        self.assertTrue(build_import_rows(json_pick_frame(records)).equals(build_import_rows(pick_frame(self.ffighters))))
+
+    def test_delta_against_snapshot(self):
+        records = [ff.to_dict() for ff in self.ffighters]
+        with tempfile.TemporaryDirectory() as folder:
+            snapshot, delta_file = os.path.join(folder, "snapshot.csv"), os.path.join(folder, "delta.csv")
+            first = write_telestaff_delta(build_import_rows(json_pick_frame(records)), snapshot, delta_file)
+            self.assertEqual(len(first), 4)  # No snapshot yet: everything is added
+            self.assertEqual(set(first["Note"]), {"Added"})
+
+            # Unchanged: empty delta
+            rows = build_import_rows(json_pick_frame(records))
+            self.assertEqual(len(write_telestaff_delta(rows, snapshot, delta_file)), 0)
+
+            # Holiday becomes AM, one day_2 pick is withdrawn
+            holiday = next(p for p in records[0]["processed"] if p["date"] == "2025-10-08")
+            holiday["increments"] = "AM"
+            records[1]["processed"] = []
+            delta = write_telestaff_delta(build_import_rows(json_pick_frame(records)), snapshot, delta_file)
+            self.assertEqual(sorted(zip(delta["Payroll ID"], delta["Note"])), [("1", "Modified"), ("2", "Removed")])
+            self.assertEqual(delta.loc[delta["Note"] == "Modified", "Duration (hours)"].tolist(), ["24"])
+            self.assertEqual(len(diff_import_rows(build_import_rows(json_pick_frame(records)), rows)), 2)
+
+
+    def test_rows_sharing_a_start_are_all_kept(self):
+        # AM and PM of the same day both start at 7:00
+        records = [{"idnum": 7, "shift": "A", "processed": [
+            {"date": "2025-10-02", "type": "Vacation", "increments": "AM", "determination": "Approved"},
+            {"date": "2025-10-02", "type": "Holiday", "increments": "PM", "determination": "Approved"},
+        ]}]
+        rows = build_import_rows(json_pick_frame(records))
+        delta = diff_import_rows(rows.iloc[0:0], rows)
+        self.assertEqual(sorted(delta["Work Code"]), ["H", "V"])
+        self.assertEqual(len(diff_import_rows(rows, rows.iloc[::-1])), 0)
+
+        records[0]["processed"].pop()
+        delta = diff_import_rows(rows, build_import_rows(json_pick_frame(records)))
+        self.assertEqual(list(zip(delta["Work Code"], delta["Note"])), [("H", "Removed")])
+
+
+if __name__ == '__main__':
+    unittest.main()
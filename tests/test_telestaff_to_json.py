@@ -0,0 +1,104 @@
+# tests/test_telestaff_to_json.py
+import copy
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "telestaff_to_json"))
+from telestaff_to_json import ReconciliationIndex, compare_and_update  # noqa: E402
+from merge import PickMerger  # noqa: E402
+
+
+def pick(day, determination="Approved", increments="FULL", pick_type="Vacation"):
+    return {"date": f"2025-03-{day:02d}", "type": pick_type, "determination": determination, "increments": increments}
+
+
+def record(idnum, fname, lname, shift, processed):
+    return {"idnum": idnum, "fname": fname, "lname": lname, "shift": shift, "processed": processed,
+            "awarded_vacation_days": 2, "awarded_holiday_days": 0}
+
+
+class TestReconciliationIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.current = [record(1, "John", "Smith", "A", []), record(2, "John", "Smith", "B", []),
+                        record("", "Maria", "Lopez", "A", [])]
+        self.index = ReconciliationIndex(self.current)
+
+    def test_match_by_id_name_and_fuzzy_within_shift(self):
+        self.assertEqual(self.index.match({"idnum": 2, "fname": "x", "lname": "y", "shift": "B"}), 1)
+        self.assertEqual(self.index.match({"idnum": "", "fname": "john", "lname": "SMITH", "shift": "a"}), 0)
+        self.assertEqual(self.index.match({"idnum": "", "fname": "Mariah", "lname": "Lopez", "shift": "A"}), 2)
+        self.assertIsNone(self.index.match({"idnum": "", "fname": "Maria", "lname": "Lopez", "shift": "C"}))
+
+
+class TestCompareAndUpdate(unittest.TestCase):
+
+    def test_reconciles_picks_and_balances(self):
+        current = [
+            record(1, "John", "Smith", "A", [pick(1), pick(2, "Rejected"), pick(3)]),
+            record(2, "Ann", "Lee", "A", [pick(4)]),
+        ]
+        new = [
+            record(1, "John", "Smith", "A", [pick(1), pick(5, increments="AM"), pick(6), pick(7)]),
+            record(3, "New", "Person", "B", [pick(8)]),
+        ]
+        updated, logs = compare_and_update(current, new)
+
+        smith = updated[0]
+        self.assertEqual([p["date"][-2:] for p in smith["processed"]], ["01", "02", "05", "06", "07"])
+        self.assertEqual(smith["approved_days_count"], 3.5)
+        self.assertEqual(smith["used_vacation_days"], 3.5)
+        self.assertTrue(any("exceeded awarded vacation days" in line for line in logs))
+        # Not in Telestaff: cleared
+        self.assertEqual(updated[1]["processed"], [])
+        self.assertEqual(updated[1]["approved_days_count"], 0)
+        # Unmatched Telestaff record is added
+        self.assertEqual(updated[2]["idnum"], 3)
+
+    def test_sync_state_skips_unchanged_members(self):
+        current = [record(1, "John", "Smith", "A", [pick(1)]), record(2, "Ann", "Lee", "A", [pick(4)])]
+        new = [record(1, "John", "Smith", "A", [pick(1), pick(5)]), record(2, "Ann", "Lee", "A", [pick(4), pick(6)])]
+        sync_state = {}
+        updated, _ = compare_and_update(current, copy.deepcopy(new), sync_state=sync_state)
+        self.assertEqual(len(sync_state), 2)
+
+        # Same export against the synced records: nothing to reconcile
+        _, logs = compare_and_update(updated, copy.deepcopy(new), sync_state=sync_state)
+        self.assertIn("Unchanged since last sync (skipped): 2", logs)
+        self.assertFalse(any("[Addition]" in line or "[Removal]" in line for line in logs))
+
+        # One member changed in Telestaff: only they are reconciled
+        new[1]["processed"].append(pick(7))
+        updated, logs = compare_and_update(updated, copy.deepcopy(new), sync_state=sync_state)
+        self.assertIn("Unchanged since last sync (skipped): 1", logs)
+        self.assertEqual([p["date"][-2:] for p in updated[0]["processed"]], ["01", "05"])
+        self.assertEqual([p["date"][-2:] for p in updated[1]["processed"]], ["04", "06", "07"])
+
+
+class TestPickMerger(unittest.TestCase):
+
+    def test_dedupes_reports_conflicts_and_unmatched(self):
+        current = [record(1, "John", "Smith", "A", [pick(1)])]
+        current[0]["picks"] = [pick(2, "Unaddressed", "AM")]
+        merger = PickMerger(current)
+        supplemental = [
+            {**record(None, "John", "Smith", "A", []),
+             "picks": [pick(2, "Unaddressed", "AM"), pick(2, "Unaddressed", "PM"), pick(9), pick(9)]},
+            {**record(None, "Nobody", "Here", "A", []), "picks": [pick(3)]},
+        ]
+        report = merger.merge(supplemental)
+
+        self.assertEqual([p["increments"] for p in current[0]["picks"]], ["AM", "PM", "FULL"])
+        self.assertEqual(len(report.added), 2)
+        self.assertEqual(report.duplicates, 2)
+        self.assertEqual(len(report.conflicts), 1)
+        self.assertEqual(report.not_found, ["Nobody Here (Shift: A)"])
+
+        report = merger.merge(supplemental[1:], add_unmatched=True)
+        self.assertEqual(len(current), 2)
+        self.assertEqual(merger.match(supplemental[1]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
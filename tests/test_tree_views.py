@@ -0,0 +1,37 @@
+# tests/test_tree_views.py
+import unittest
+
+from gui.tree_views import RowIndex
+
+
+class TestRowIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [
+            ("a", (101, "Smith, John", "⚪ Captain", "A")),
+            ("b", (102, "Smithers, Ann", "⚪ Lieutenant", "B")),
+            ("c", (203, "Jones, Bob", "🔴 Captain (was Lieutenant)", "A")),
+        ]
+        determinations = {"a": "Approved", "b": "Rejected", "c": "Approved Rejected"}
+        self.index = RowIndex(self.rows, (0, 1, 2, 3), extra_terms=determinations.get)
+
+    def test_prefix_search(self):
+        self.assertEqual(self.index.search("smith"), [0, 1])
+        self.assertEqual(self.index.search("10"), [0, 1])
+        self.assertEqual(self.index.search("203"), [2])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.index.search("captain a"), [0, 2])
+        self.assertEqual(self.index.search("smith lieutenant"), [1])
+        self.assertEqual(self.index.search("jones b"), [2])  # "Bob"
+        self.assertEqual(self.index.search("nobody"), [])
+
+    def test_extra_terms_and_case(self):
+        self.assertEqual(self.index.search("REJECTED"), [1, 2])
+
+    def test_empty_query(self):
+        self.assertIsNone(self.index.search("   "))
+
+
+if __name__ == '__main__':
+    unittest.main()
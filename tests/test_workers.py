@@ -0,0 +1,83 @@
+# tests/test_workers.py
+import time
+import unittest
+from datetime import date
+
+from gui.workers import BackgroundTask, TaskCancelled
+from vacation_selection import events
+from vacation_selection.cal import make_calendar
+from vacation_selection.firefighter import FFighter, Pick
+
+
+class FakeRoot:
+    """Stands in for Tk: runs root.after() callbacks from a simple loop on the test thread."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, delay_ms, callback):
+        self.pending.append(callback)
+
+    def run_until_idle(self, timeout=5):
+        deadline = time.time() + timeout
+        while self.pending and time.time() < deadline:
+            callback = self.pending.pop(0)
+            callback()
+            time.sleep(0.001)
+
+
+class TestBackgroundTask(unittest.TestCase):
+
+    def run_task(self, work, cancel=False):
+        root = FakeRoot()
+        outcome = {"progress": []}
+        task = BackgroundTask(root, work,
+                              on_done=lambda result: outcome.setdefault("done", result),
+                              on_error=lambda error, details: outcome.setdefault("error", error),
+                              on_progress=lambda *progress: outcome["progress"].append(progress),
+                              on_cancelled=lambda: outcome.setdefault("cancelled", True))
+        if cancel:
+            task.cancel()
+        task.start()
+        root.run_until_idle()
+        return outcome
+
+    def test_result_is_delivered_on_the_polling_thread(self):
+        def work(task):
+            task.progress(1, 2, "half")
+            return 42
+        outcome = self.run_task(work)
+        self.assertEqual(outcome["done"], 42)
+        self.assertEqual(outcome["progress"][-1], (1, 2, "half"))
+
+    def test_errors_are_reported(self):
+        def work(task):
+            raise ValueError("bad file")
+        outcome = self.run_task(work)
+        self.assertIsInstance(outcome["error"], ValueError)
+
+    def test_cancel_stops_a_draft_at_a_round_end(self):
+        ffighters = [FFighter(i, f"First{i}", "Test", date(2010, 1, i), "Firefighter", "A",
+                              [Pick(date(2025, 10, day)) for day in range(1, 6)]) for i in range(1, 4)]
+        existing = {"calendar": {}, "rejected": {}}
+
+        def work(task):
+            def on_events(batch):
+                if any(event.kind == events.ROUND_ENDED for event in batch):
+                    task.progress(0, None)
+            make_calendar(ffighters, existing_calendar_data=existing, silent_mode=True, subscribers=[on_events])
+
+        outcome = self.run_task(work, cancel=True)
+        self.assertTrue(outcome["cancelled"])
+        # Only the first round was drafted, and it is recorded in the shared calendar
+        self.assertEqual([len(ff.processed) for ff in ffighters], [2, 2, 2])
+        self.assertEqual(len(existing["calendar"]), 2)
+        self.assertEqual(events.active_streams(), ())
+
+    def test_cancellation_is_not_an_exception(self):
+        # Readers catch Exception for bad rows; cancelling must still get through them
+        self.assertFalse(issubclass(TaskCancelled, Exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,16 @@
 # vacation_selection/__init__.py
-from . import main
-from . import firefighter
-from . import cal
-from . import file_io
-from . import validation
-from . import priority
-from . import setup_logging
-from . import increment
-from . import analyze
\ No newline at end of file
+# Submodules are imported on first use (vacation_selection.main, `from vacation_selection import
+# events`, ...), so importing the package does not load pandas, matplotlib or tkinter.
+import importlib
+
+__all__ = [
+    "main", "firefighter", "cal", "file_io", "validation", "priority", "setup_logging", "increment",
+    "analyze", "dates", "form_formats", "snapshot", "store", "catalog", "events", "exclusions",
+    "identity", "telestaff_export", "pick_table", "config",
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,12 @@
 # analyze.py
 
-import tkinter as tk
-from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.colors as mcolors
-from datetime import datetime
+from datetime import date, datetime
+from collections import Counter
+import numpy as np
+import pandas as pd
 from vacation_selection.file_io import read_analysis_from_json
+from vacation_selection import events
+from vacation_selection.pick_table import rows_of
 
 def use_dummy_data():
     return {"total":{"processed":2412,"approved":1443,"denied":969,"approval_rate":59.82587064676616,"average_picks_per_person":14.023255813953488,"top_rejected_reasons":{"Day already has maximum firefighters off":734,"Increment is a holiday, and already has 1 Captains, and 0 Battalion Chiefs off":5,"Increment is a holiday, and already has 0 Captains, and 1 Battalion Chiefs off":2,"Already requested this day off (FULL)":3,"Max days off already reached":175,"Schedule Reassignment: (PARAMEDIC CLASS)":29,"Schedule Reassignment: (Training Division)":21},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]]},"by_shift":{"C":{"processed":640,"approved":436,"denied":204,"approval_rate":68.125,"top_rejected_reasons":{"Day already has maximum firefighters off":169,"Increment is a holiday, and already has 0 Captains, and 1 Battalion Chiefs off":2,"Increment is a holiday, and already has 1 Captains, and 0 Battalion Chiefs off":1,"Already requested this day off (FULL)":2,"Max days off already reached":19,"Schedule Reassignment: (PARAMEDIC CLASS)":11},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]],"monthly_approvals":{"1":10,"2":36,"3":47,"4":42,"5":41,"6":44,"7":36,"8":41,"9":37,"10":23,"11":41,"12":38},"monthly_denials":{"1":13,"2":19,"3":35,"4":20,"5":11,"6":11,"7":18,"8":6,"9":18,"10":1,"11":23,"12":29}},"B":{"processed":991,"approved":532,"denied":459,"approval_rate":53.68314833501514,"top_rejected_reasons":{"Day already has maximum firefighters off":382,"Max days off already reached":75,"Schedule Reassignment: (PARAMEDIC CLASS)":1,"Schedule Reassignment: (Training Division)":1},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]],"monthly_approvals":{"1":13,"2":44,"3":50,"4":37,"5":50,"6":50,"7":55,"8":44,"9":43,"10":45,"11":49,"12":52},"monthly_denials":{"1":1,"2":23,"3":53,"4":23,"5":27,"6":64,"7":60,"8":25,"9":19,"10":26,"11":68,"12":70}},"A":{"processed":781,"approved":475,"denied":306,"approval_rate":60.819462227912936,"top_rejected_reasons":{"Day already has maximum firefighters off":183,"Increment is a holiday, and already has 1 Captains, and 0 Battalion Chiefs off":4,"Max days off already reached":81,"Already requested this day off (FULL)":1,"Schedule Reassignment: (PARAMEDIC CLASS)":17,"Schedule Reassignment: (Training Division)":20},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]],"monthly_approvals":{"1":14,"2":40,"3":42,"4":45,"5":47,"6":47,"7":49,"8":41,"9":32,"10":50,"11":35,"12":33},"monthly_denials":{"1":1,"2":17,"3":17,"4":20,"5":32,"6":31,"7":41,"8":12,"9":20,"10":40,"11":33,"12":42}}},"by_rank":{"Lieutenant":{"processed":280,"approved":192,"denied":88,"approval_rate":68.57142857142857,"top_rejected_reasons":{"Day already has maximum firefighters off":88},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]]},"Captain":{"processed":155,"approved":104,"denied":51,"approval_rate":67.0967741935484,"top_rejected_reasons":{"Day already has maximum firefighters off":45,"Increment is a holiday, and already has 0 Captains, and 1 Battalion Chiefs off":2,"Increment is a holiday, and already has 1 Captains, and 0 Battalion Chiefs off":4},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]]},"Battalion Chief":{"processed":105,"approved":61,"denied":44,"approval_rate":58.0952380952381,"top_rejected_reasons":{"Day already has maximum firefighters off":43,"Increment is a holiday, and already has 1 Captains, and 0 Battalion Chiefs off":1},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]]},"Apparatus Specialist":{"processed":389,"approved":260,"denied":129,"approval_rate":66.83804627249359,"top_rejected_reasons":{"Day already has maximum firefighters off":128,"Already requested this day off (FULL)":1},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]]},"Firefighter":{"processed":1483,"approved":826,"denied":657,"approval_rate":55.69790964261632,"top_rejected_reasons":{"Day already has maximum firefighters off":430,"Already requested this day off (FULL)":2,"Max days off already reached":175,"Schedule Reassignment: (PARAMEDIC CLASS)":29,"Schedule Reassignment: (Training Division)":21},"top_5_weeks":[[52,114],[48,98],[27,88],[12,84],[16,71]]}},"distribution_of_requests_by_month":{}}
@@ -14,6 +14,70 @@ def use_dummy_data():
 # ===============  Analysis  =================================================================================
 
 
+def _repeat_categorical(values, lengths):
+    """A per-firefighter value repeated for each of their picks, factorized per firefighter instead of per pick."""
+    codes, categories = pd.factorize(pd.Series(values, dtype=object))
+    return pd.Categorical.from_codes(np.repeat(codes, lengths), categories=categories)
+
+
+def build_pick_table(ffighters):
+    """
+    Flattens every processed pick into one columnar table (a DataFrame) with
+    shift, rank, date, ISO week, month, determination, reason and approved/denied flags.
+    The pick columns are gathered straight from the PickTable holding the picks;
+    text columns are categorical, so each is factorized once for all the group-bys.
+    """
+    lengths = [len(ff.processed) for ff in ffighters]
+    pick_table, rows = rows_of(pick for ff in ffighters for pick in ff.processed)
+    columns = pick_table.arrays(rows)
+
+    # Calendar fields are computed once per distinct date, then broadcast back to the picks
+    date_codes, unique_ordinals = pd.factorize(columns["date"])
+    unique_dates = [date.fromordinal(int(ordinal)) for ordinal in unique_ordinals]
+    weeks = np.array([day.isocalendar()[1] for day in unique_dates], dtype=np.int64)
+    months = np.array([day.month for day in unique_dates], dtype=np.int64)
+
+    table = pd.DataFrame({
+        "shift": _repeat_categorical([ff.shift for ff in ffighters], lengths),
+        "rank": _repeat_categorical([ff.rank for ff in ffighters], lengths),
+        "date": np.asarray(unique_dates, dtype=object)[date_codes],
+        "week": weeks[date_codes],
+        "month": months[date_codes],
+        "determination": pick_table.categorical(columns["determination"], pick_table.determinations),
+        "reason": pick_table.categorical(columns["reason"], pick_table.reasons),
+    })
+    table["approved"] = table["determination"] == "Approved"
+    table["denied"] = table["determination"] == "Rejected"
+    return table
+
+
+def _empty_group():
+    return {"processed": 0, "approved": 0, "denied": 0, "approval_rate": 0.0,
+            "top_rejected_reasons": {}, "top_5_weeks": []}
+
+
+def _fill_groups(groups, table, key):
+    """Fills {key value: group dict} from vectorized group-bys of the pick table on `key`."""
+    counts = table.groupby(key, sort=False, observed=True).agg(
+        processed=("date", "size"), approved=("approved", "sum"), denied=("denied", "sum"))
+    for name, row in counts.iterrows():
+        group = groups[name]
+        group["processed"] = int(row["processed"])
+        group["approved"] = int(row["approved"])
+        group["denied"] = int(row["denied"])
+
+    reasons = table[table["denied"]].groupby([key, "reason"], sort=False, dropna=False, observed=True).size()
+    for (name, reason), count in reasons.sort_values(ascending=False, kind="stable").items():
+        groups[name]["top_rejected_reasons"][None if pd.isna(reason) else reason] = int(count)
+
+    # Weekly histogram per group, busiest weeks first (ties go to the earlier week)
+    weeks = table.groupby([key, "week"], observed=True).size().reset_index(name="requests")
+    weeks = weeks.sort_values([key, "requests", "week"], ascending=[True, False, True])
+    for name, top_weeks in weeks.groupby(key, sort=False, observed=True):
+        groups[name]["top_5_weeks"] = [(int(week), int(requests))
+                                       for week, requests in zip(top_weeks["week"][:5], top_weeks["requests"][:5])]
+
+
 def analyze_results(ffighters):
     analysis = {
         "total": {"processed": 0, "approved": 0, "denied": 0, "approval_rate": 0.0, "average_picks_per_person": 0.0,
@@ -23,76 +87,127 @@ def analyze_results(ffighters):
         "distribution_of_requests_by_month": {}  # Added to track requests by month
     }
 
-    picks_per_person = []
-    weekly_requests = {}
-
+    # Every shift and rank gets a group, even if none of its members have processed picks
     for ff in ffighters:
-        shift = ff.shift
-        rank = ff.rank
-
-        # Initialize dicts if they don’t exist
-        if shift not in analysis["by_shift"]:
-            analysis["by_shift"][shift] = {"processed": 0, "approved": 0, "denied": 0, "approval_rate": 0.0,
-                                           "top_rejected_reasons": {}, "top_5_weeks": []}
-
-        if rank not in analysis["by_rank"]:
-            analysis["by_rank"][rank] = {"processed": 0, "approved": 0, "denied": 0, "approval_rate": 0.0,
-                                          "top_rejected_reasons": {}, "top_5_weeks": []}
-
-        # Track picks per person
-        picks_per_person.append(len(ff.processed))
-
-        # Process each pick
-        for pick in ff.processed:
-            analysis["total"]["processed"] += 1
-            analysis["by_shift"][shift]["processed"] += 1
-            analysis["by_rank"][rank]["processed"] += 1
-
-            # Approval or Denial
-            if pick.determination == "Approved":
-                analysis["total"]["approved"] += 1
-                analysis["by_shift"][shift]["approved"] += 1
-                analysis["by_rank"][rank]["approved"] += 1
-            elif pick.determination == "Rejected":
-                analysis["total"]["denied"] += 1
-                analysis["by_shift"][shift]["denied"] += 1
-                analysis["by_rank"][rank]["denied"] += 1
-
-                # Track top rejection reasons
-                reason = pick.reason
-                for group in [analysis["total"], analysis["by_shift"][shift], analysis["by_rank"][rank]]:
-                    group["top_rejected_reasons"][reason] = group["top_rejected_reasons"].get(reason, 0) + 1
-
-            # Track weekly requests
-            week = pick.date.isocalendar()[1]
-            weekly_requests[week] = weekly_requests.get(week, 0) + 1
-
-            # Track monthly approvals/denials by shift
-            month = pick.date.month
-
-            # Initialize if not already set
-            if "monthly_approvals" not in analysis["by_shift"][shift]:
-                analysis["by_shift"][shift]["monthly_approvals"] = {m: 0 for m in range(1, 13)}
-                analysis["by_shift"][shift]["monthly_denials"] = {m: 0 for m in range(1, 13)}
-
-            if pick.determination == "Approved":
-                analysis["by_shift"][shift]["monthly_approvals"][month] += 1
-            elif pick.determination == "Rejected":
-                analysis["by_shift"][shift]["monthly_denials"][month] += 1
-
-
-    # Calculate approval rates and top 5 weeks
+        analysis["by_shift"].setdefault(ff.shift, _empty_group())
+        analysis["by_rank"].setdefault(ff.rank, _empty_group())
+
+    table = build_pick_table(ffighters)
+    table["total"] = pd.Categorical.from_codes(np.zeros(len(table), dtype=np.int8), categories=["total"])
+    _fill_groups({"total": analysis["total"]}, table, "total")
+    _fill_groups(analysis["by_shift"], table, "shift")
+    _fill_groups(analysis["by_rank"], table, "rank")
+
+    # Monthly approvals/denials by shift (only for shifts with processed picks)
+    monthly = table.groupby(["shift", "month"], observed=True).agg(approved=("approved", "sum"), denied=("denied", "sum"))
+    for shift in table["shift"].unique().tolist():
+        analysis["by_shift"][shift]["monthly_approvals"] = {m: 0 for m in range(1, 13)}
+        analysis["by_shift"][shift]["monthly_denials"] = {m: 0 for m in range(1, 13)}
+    for (shift, month), row in monthly.iterrows():
+        analysis["by_shift"][shift]["monthly_approvals"][int(month)] = int(row["approved"])
+        analysis["by_shift"][shift]["monthly_denials"][int(month)] = int(row["denied"])
+
+    # Calculate approval rates
     for group in [analysis["total"]] + list(analysis["by_shift"].values()) + list(analysis["by_rank"].values()):
         group["approval_rate"] = (group["approved"] / group["processed"] * 100) if group["processed"] else 0.0
-        group["top_5_weeks"] = sorted(weekly_requests.items(), key=lambda x: x[1], reverse=True)[:5]
 
     # Average picks per person
-    analysis["total"]["average_picks_per_person"] = sum(picks_per_person) / len(picks_per_person) if picks_per_person else 0
+    analysis["total"]["average_picks_per_person"] = len(table) / len(ffighters) if ffighters else 0
 
     return analysis
 
 
 
+class OnlineAnalytics:
+    """
+    Keeps the analyze_results aggregates up to date from the draft engine's decision events.
+
+    Pass on_events to make_calendar(subscribers=[...]) (and call observe() with existing
+    determinations); once the event buffers are flushed (every round end), as_dict() returns
+    the same shape as analyze_results without another pass over the picks, and later
+    supplemental rounds only add their own decisions.
+    """
+
+    def __init__(self, ffighters=()):
+        self.ffighter_ids = set()
+        self.groups = {"total": {}, "by_shift": {}, "by_rank": {}}
+        self.total = self._new_group()
+        self.monthly = {}  # shift -> {"approved": Counter, "denied": Counter}
+        self.add_ffighters(ffighters)
+
+    @staticmethod
+    def _new_group():
+        return {"processed": 0, "approved": 0, "denied": 0, "reasons": Counter(), "weeks": Counter()}
+
+    def add_ffighters(self, ffighters):
+        """Registers firefighters, so they count towards picks per person and get their shift/rank groups."""
+        for ff in ffighters:
+            self.ffighter_ids.add(id(ff))
+            self.groups["by_shift"].setdefault(ff.shift, self._new_group())
+            self.groups["by_rank"].setdefault(ff.rank, self._new_group())
+
+    def observe(self, ffighters):
+        """Seeds the aggregates from determinations already made (e.g. picks loaded from JSON)."""
+        self.add_ffighters(ffighters)
+        for ff in ffighters:
+            for pick in ff.processed:
+                self._count(ff, pick)
+
+    def on_events(self, batch):
+        for event in batch:
+            if event.kind not in events.DECISION_KINDS:
+                continue
+            if id(event.ffighter) not in self.ffighter_ids:
+                self.add_ffighters([event.ffighter])
+            self._count(event.ffighter, event.pick)
+
+    def _count(self, ff, pick):
+        week = pick.date.isocalendar()[1]
+        approved = pick.determination == "Approved"
+        denied = pick.determination == "Rejected"
+        for group in (self.total, self.groups["by_shift"][ff.shift], self.groups["by_rank"][ff.rank]):
+            group["processed"] += 1
+            group["weeks"][week] += 1
+            if approved:
+                group["approved"] += 1
+            elif denied:
+                group["denied"] += 1
+                group["reasons"][pick.reason] += 1
+
+        monthly = self.monthly.setdefault(ff.shift, {"approved": Counter(), "denied": Counter()})
+        if approved:
+            monthly["approved"][pick.date.month] += 1
+        elif denied:
+            monthly["denied"][pick.date.month] += 1
+
+    @staticmethod
+    def _group_dict(group):
+        return {
+            "processed": group["processed"],
+            "approved": group["approved"],
+            "denied": group["denied"],
+            "approval_rate": (group["approved"] / group["processed"] * 100) if group["processed"] else 0.0,
+            "top_rejected_reasons": dict(group["reasons"].most_common()),
+            "top_5_weeks": sorted(group["weeks"].items(), key=lambda x: (-x[1], x[0]))[:5],
+        }
+
+    def as_dict(self):
+        """The current aggregates, shaped like analyze_results()."""
+        total = self._group_dict(self.total)
+        total["average_picks_per_person"] = (self.total["processed"] / len(self.ffighter_ids)
+                                             if self.ffighter_ids else 0)
+        analysis = {
+            "total": total,
+            "by_shift": {shift: self._group_dict(group) for shift, group in self.groups["by_shift"].items()},
+            "by_rank": {rank: self._group_dict(group) for rank, group in self.groups["by_rank"].items()},
+            "distribution_of_requests_by_month": {}
+        }
+        for shift, monthly in self.monthly.items():
+            analysis["by_shift"][shift]["monthly_approvals"] = {m: monthly["approved"][m] for m in range(1, 13)}
+            analysis["by_shift"][shift]["monthly_denials"] = {m: monthly["denied"][m] for m in range(1, 13)}
+        return analysis
+
+
 # =============== Analysis Utilities ============================
 
 def get_analysis_group(analysis, group_key, subgroup):
@@ -103,13 +218,16 @@ def get_analysis_group(analysis, group_key, subgroup):
 
 
 # =============== Analysis Display ==============================
-
-import matplotlib.colors as mcolors
+# tkinter and matplotlib are imported by the display functions themselves, so analyzing
+# (e.g. a headless run) does not pay for loading them.
 
 def create_monthly_requests_chart(analysis, chart_frame):
     """
     Create stacked bar chart for monthly requests, broken down by shift (A, B, C) and approvals/denials.
     """
+    import tkinter as tk
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     import matplotlib.colors as mcolors
 
     # Base colors for approvals and denials
@@ -195,6 +313,8 @@ def display_key_statistics(tab_frame, analysis):
     """
     Display the key statistics including average picks/person and approval/denial breakdown.
     """
+    from tkinter import ttk
+
     # Summary Frame
     summary_frame = ttk.Frame(tab_frame)
     summary_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -219,6 +339,8 @@ def create_pie_chart(analysis, summary_frame):
     """
     Create a pie chart for total approval/denial and breakdown by rank.
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     import matplotlib.colors as mcolors
 
     # Base colors for approved/denied
@@ -279,6 +401,8 @@ def display_additional_information(parent, analysis):
     Displays denial reasons and most popular weeks split into tabs for each shift and a total panel.
     Optimized for compact layout.
     """
+    from tkinter import ttk
+
     # Create Notebook for Shift Tabs
     notebook = ttk.Notebook(parent)
     notebook.pack(fill="both", expand=True, padx=10, pady=10)
@@ -306,6 +430,8 @@ def add_information_tab(tab, title, denial_reasons, popular_weeks):
     """
     Adds denial reasons and popular weeks to a tab in a compact layout.
     """
+    from tkinter import ttk
+
     # Header
     ttk.Label(tab, text=f"Denial Reasons for {title}:", style="Bold.TLabel").grid(row=0, column=0, sticky="w", padx=5, pady=5)
 
@@ -336,6 +462,8 @@ def apply_styles(root):
     """
     Apply consistent styles to the UI.
     """
+    from tkinter import ttk
+
     root.configure(bg="white")
     style = ttk.Style(root)
     style.theme_use("clam")
@@ -352,6 +480,9 @@ def display_dashboard(analysis):
     Display the analysis results in a Tkinter dashboard with tabs for Key Statistics,
     Monthly Requests, and Additional Information.
     """
+    import tkinter as tk
+    from tkinter import ttk
+
     # Main Window
     root = tk.Tk()
     root.title("Analysis Dashboard")
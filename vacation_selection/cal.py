@@ -1,6 +1,8 @@
-from vacation_selection.setup_logging import setup_logging
-logger = setup_logging('calendar')
+from vacation_selection.setup_logging import get_logger
+logger = get_logger('calendar')
 from vacation_selection.increment import Increment
+from vacation_selection.config import active_config, use_config
+from vacation_selection import events
 
 import random
 from datetime import datetime
@@ -8,23 +10,24 @@ from datetime import datetime
 # Day Class
 # ================================================================================================
 class Day:
-    # Firefighter limit configuration
+    # Firefighter limit configuration (class-level default; a run reads its RunConfig)
     # If True: limit applies to the entire shift (all increments share the same 6-person limit)
     # If False: limit applies per increment (each increment has its own 6-person limit)
     # For 48-hour shifts with independent day_1/day_2: set to False
     # For 24-hour shifts with single FULL increment: set to True
     limit_max_firefighters_at_shift_instead_of_increment = False
 
-    # Note: Increment-related configurations (increment_names, shift_duration_hours,
-    # transition_date, max_total_ffighters_allowed) are now owned by the Increment class.
-    # Access them via Increment.increment_names, Increment.shift_duration_hours, etc.
+    # Note: Increment-related defaults (increment_names, shift_duration_hours,
+    # transition_date, max_total_ffighters_allowed) are owned by the Increment class.
+    # A run's settings come from its RunConfig (see config.py), available as day.config.
 
     @classmethod
     def is_single_increment(cls):
-        """Returns True if only one increment is configured."""
+        """Returns True if only one increment is configured (in the active config)."""
         return Increment.is_single_increment()
 
-    def __init__(self, date):
+    def __init__(self, date, config=None):
+        self.config = config if config is not None else active_config()
         self.date = date
         self.ffighters = {}
         self.increments = {}
@@ -34,13 +37,14 @@ class Day:
             'Captain': 0,
             'Battalion Chief': 0
         }
-        # Create increments based on configuration from Increment class
-        if Increment.is_single_increment():
+        # Create increments based on the run's configuration
+        names = self.config.increment_names
+        if self.config.is_single_increment():
             # Single increment mode (e.g., full 24-hour or 48-hour shift)
-            self.increments = {0: Increment(date, Increment.increment_names[0], only_increment=True)}
+            self.increments = {0: Increment(date, names[0], only_increment=True, config=self.config)}
         else:
             # Multiple increment mode (e.g., AM/PM or day_1/day_2)
-            self.increments = {i: Increment(date, name) for i, name in enumerate(Increment.increment_names)}
+            self.increments = {i: Increment(date, name, config=self.config) for i, name in enumerate(names)}
 
     @staticmethod
     def get_header():
@@ -59,14 +63,14 @@ class Day:
             if inc.only_increment:
                 # For only_increment, use both the firefighter name and idnum
                 ffighters_str = ', '.join([
-                    f"{ff.name} - {ff.idnum} ({pick.increments_plain_text()})"
+                    f"{ff.name} - {ff.idnum} ({pick.increments_plain_text(config=self.config)})"
                     for ff, pick in zip(inc.ffighters, inc.picks)
                 ])
                 inc_str = f"{inc.date}: {ffighters_str}"
             else:
                 # Otherwise, include the increment name along with the firefighter names
                 ffighters_str = ', '.join([
-                    f"{ff.name} ({pick.increments_plain_text()})"
+                    f"{ff.name} ({pick.increments_plain_text(config=self.config)})"
                     for ff, pick in zip(inc.ffighters, inc.picks)
                 ])
                 inc_str = f"{inc.date} ({inc.name}): {ffighters_str}"
@@ -81,7 +85,6 @@ class Day:
         Helper function to iterate over increments and apply the given method.
 
         Args:
-        increments: The list of increment values from the pick.
         method_name: The name of the method to call on each increment.
         *args: Additional arguments to pass to the method.
 
@@ -90,7 +93,7 @@ class Day:
         """
         increments = ffighter.current_pick.increments
 
-        if Day.is_single_increment():
+        if self.config.is_single_increment():
             # Single increment mode - check the only increment
             increment = self.increments.get(0)
             if increment and getattr(increment, method_name)(*args):
@@ -98,12 +101,11 @@ class Day:
                 return True
         else:
             # Multiple increment mode - check each requested increment
-            for inc_index, value in enumerate(increments):
-                if value == 1:  # This increment is requested
-                    increment = self.increments.get(inc_index)
-                    if increment and getattr(increment, method_name)(*args):
-                        self.denial_reason = increment.denial_reason
-                        return True
+            for inc_index in self.config.tables.bits[increments]:
+                increment = self.increments.get(inc_index)
+                if increment and getattr(increment, method_name)(*args):
+                    self.denial_reason = increment.denial_reason
+                    return True
         return False
 
     def is_full(self, ffighter):
@@ -120,55 +122,44 @@ class Day:
         Check if firefighter can be added to this day.
         Returns: (can_add, available_increments, reason)
         - can_add: True if at least one increment is available
-        - available_increments: List of increment flags showing which are available
+        - available_increments: Mask of the increments that are available
         - reason: Denial reason if can_add is False, or partial grant reason if not all increments available
         """
+        tables = self.config.tables
         requested_increments = ffighter.current_pick.get_increments()
-        available_increments = list(requested_increments)  # Copy the requested increments
+        available_increments = requested_increments
 
         # Check if firefighter already has this day
         if self.has_ffighter(ffighter):
             return (False, None, getattr(self, 'denial_reason', "Already requested this day off"))
 
         # Check each requested increment for availability
-        for inc_index, value in enumerate(requested_increments):
-            if value == 1:  # This increment is requested
-                increment = self.increments.get(inc_index)
-                if increment:
-                    # Check if this specific increment is full or rank-full
-                    if increment.is_full():
-                        available_increments[inc_index] = 0  # Mark as unavailable
-                    elif increment.is_rank_full(ffighter):
-                        available_increments[inc_index] = 0  # Mark as unavailable
+        for inc_index in tables.bits[requested_increments]:
+            increment = self.increments.get(inc_index)
+            if increment:
+                # Check if this specific increment is full or rank-full
+                if increment.is_full() or increment.is_rank_full(ffighter):
+                    available_increments &= ~(1 << inc_index)  # Mark as unavailable
 
         # Now check if the available increments would exceed max_shifts_off
-        # Calculate how many shifts the available increments represent
-        num_available = sum(available_increments)
+        # (one increment is one unit, so this is integer math)
+        num_available = tables.counts[available_increments]
         if num_available > 0:
-            increment_value = 1 / len(available_increments)
-            shifts_for_available = num_available * increment_value
-
             # Check if this would exceed the firefighter's max
-            if ffighter.approved_shifts_count + shifts_for_available > ffighter.max_shifts_off:
+            if ffighter.approved_units + num_available > ffighter.max_units:
                 # Reduce available increments to fit within max
-                remaining_capacity = ffighter.max_shifts_off - ffighter.approved_shifts_count
-                max_increments_that_fit = int(remaining_capacity / increment_value)
+                max_increments_that_fit = ffighter.max_units - ffighter.approved_units
 
-                if max_increments_that_fit == 0:
+                if max_increments_that_fit <= 0:
                     return (False, None, "No room for any increments - would exceed max shifts off")
 
                 # Reduce available_increments to only what fits
                 # Prioritize earlier increments (day_1 over day_2)
-                count = 0
-                for i in range(len(available_increments)):
-                    if available_increments[i] == 1:
-                        if count < max_increments_that_fit:
-                            count += 1
-                        else:
-                            available_increments[i] = 0
+                for i in tables.bits[available_increments][max_increments_that_fit:]:
+                    available_increments &= ~(1 << i)
 
         # Check if any increments are still available after all checks
-        if sum(available_increments) == 0:
+        if not available_increments:
             # No increments available - full denial
             return (False, None, "All requested increments are full or would exceed max")
 
@@ -178,7 +169,7 @@ class Day:
             return (True, available_increments, None)
         else:
             # Partial grant - some but not all increments available
-            granted_names = [Increment.increment_names[i] for i, v in enumerate(available_increments) if v == 1]
+            granted_names = [tables.names[i] for i in tables.bits[available_increments]]
             reason = f"Partial grant - only {'+'.join(granted_names)} available"
             return (True, available_increments, reason)
 
@@ -195,11 +186,10 @@ class Day:
         ffighter.current_pick.approved_increments = approved_increments
 
         # Add to each approved increment
-        for inc_index, value in enumerate(approved_increments):
-            if value == 1:
-                increment = self.increments.get(inc_index)
-                if increment:
-                    increment.add_ffighter(ffighter)
+        for inc_index in self.config.tables.bits[approved_increments]:
+            increment = self.increments.get(inc_index)
+            if increment:
+                increment.add_ffighter(ffighter)
         return True
 
 
@@ -261,30 +251,33 @@ def has_reached_max_shifts(ffighter, rejected, calendar=None):
     This is a pre-check before availability checking - it only denies if NO increments can fit.
     Partial grants will be handled by can_add_ffighter if some increments would fit.
     """
-    # Check if already at max
-    if ffighter.approved_shifts_count >= ffighter.max_shifts_off:
+    # Check if already at max.  Balances and caps are whole increment units, so below the
+    # max there is always room for at least one increment.
+    if ffighter.approved_units >= ffighter.max_units:
         deny_ffighter_pick(ffighter, rejected, "Max shifts off already reached", calendar)
         return True
 
-    # Calculate the requested shifts for the current pick
-    increments = ffighter.current_pick.get_increments()  # Tuple like (1, 0), (1, 1), etc.
-
-    # Check if even a single increment would exceed the max
-    # (1 increment = 1/len(increments) of a shift)
-    single_increment_value = 1 / len(increments)
-
-    # If even one increment would exceed the max, deny
-    if ffighter.approved_shifts_count + single_increment_value > ffighter.max_shifts_off:
-        deny_ffighter_pick(ffighter, rejected, "No room for any increments - would exceed max shifts off", calendar)
-        return True
-
     # If we get here, at least one increment could fit
     # The actual approval (full or partial) will be determined by availability in can_add_ffighter
     return False
 
 
 
-def validate_pick_with_reasoning(ffighter, calendar, rejected, bypass_movement=False):
+def validate_pick_with_reasoning(ffighter, calendar, rejected, bypass_movement=False, subscribers=None):
+    """
+    Decides the firefighter's current pick.
+    `subscribers` (callables taking a list of events) receive the events of this decision;
+    subscribers of the enclosing run (events.subscribed) receive them as well.
+    """
+    if subscribers:
+        with events.subscribed(subscribers):
+            return _validate_pick(ffighter, calendar, rejected, bypass_movement)
+    return _validate_pick(ffighter, calendar, rejected, bypass_movement)
+
+
+def _validate_pick(ffighter, calendar, rejected, bypass_movement=False):
+    if not bypass_movement:
+        events.publish(events.PickConsidered, ffighter, ffighter.current_pick)
 
     # Immediate Failures for probationary limitations, max shifts off, and exclusions
     if not bypass_movement and(
@@ -315,6 +308,8 @@ def validate_pick_with_reasoning(ffighter, calendar, rejected, bypass_movement=F
         if not bypass_movement:
             # Approve the pick (potentially with partial grant reason)
             ffighter.approve_current_pick(reason)
+            events.publish(events.PickPartiallyGranted if reason else events.PickApproved,
+                           ffighter, ffighter.processed[-1], reason)
     return True
 
 
@@ -331,6 +326,7 @@ def deny_ffighter_pick(ffighter, rejected, reason, calendar=None):
     """
     ffighter.deny_current_pick(reason)
     rejected.setdefault(ffighter.name, []).append(ffighter.processed[-1].date)
+    events.publish(events.PickDenied, ffighter, ffighter.processed[-1], reason)
 
     # Record as runner-up in the requested increments
     if calendar is not None:
@@ -343,11 +339,10 @@ def deny_ffighter_pick(ffighter, rejected, reason, calendar=None):
             requested_increments = denied_pick.get_increments()
 
             # Add to runner-ups for each requested increment
-            for inc_index, value in enumerate(requested_increments):
-                if value == 1:  # This increment was requested
-                    increment = day.increments.get(inc_index)
-                    if increment:
-                        increment.add_runner_up(ffighter, denied_pick, reason)
+            for inc_index in day.config.tables.bits[requested_increments]:
+                increment = day.increments.get(inc_index)
+                if increment:
+                    increment.add_runner_up(ffighter, denied_pick, reason)
 
 
 def process_ffighter_pick(ffighter, calendar, rejected):
@@ -357,17 +352,17 @@ def process_ffighter_pick(ffighter, calendar, rejected):
     if ffighter.current_pick is None:  # When a ffighter is out of picks
         return 0
 
-    if validate_pick_with_reasoning(ffighter, calendar, rejected):
+    if _validate_pick(ffighter, calendar, rejected):
         return 1
     else:
         return 0
 
 # Other Helpers
 # ================================================================================================
-def randomize_sub_priority(ffighters):
-    """Randomizes the sub-priority of firefighters with matching hire dates."""
+def randomize_sub_priority(ffighters, rng=random):
+    """Randomizes the sub-priority of firefighters with matching hire dates, rolling the dice with `rng`."""
     for ffighter in ffighters:
-        ffighter.dice = random.random()
+        ffighter.dice = rng.random()
     ffighters.sort(key=lambda x: (x.hireDate, x.dice))
 
 def printPriority(arr):
@@ -386,8 +381,41 @@ def add_2_picks_for_ffighter(calendar, rejected, ffighter, count=2):
     while dates_added < count and len(ffighter.picks) > 0:
         dates_added += process_ffighter_pick(ffighter, calendar, rejected)
 
-def make_calendar(ffighters, existing_calendar_data=None, rejected=None, silent_mode=False, count=2):
-    """Analyzes firefighters' picks and fully creates the calendar."""
+def check_config(ffighters, config):
+    """
+    Raises ValueError unless the firefighters were created, and their picks parsed, under the
+    increments of `config`: balances are counted in its units and picks hold its increment bitmasks.
+    """
+    full = config.tables.full
+    for ffighter in ffighters:
+        if ffighter.units_per_shift != config.units_per_shift:
+            raise ValueError(
+                f"{ffighter.name} was loaded with {ffighter.units_per_shift} increment(s) per shift, but the run's "
+                f"config has {config.units_per_shift} {config.increment_names}. "
+                f"Load the firefighters under the run's config (inside use_config).")
+        for pick in ffighter.picks + ffighter.processed:
+            if pick.increments & ~full or (pick.approved_increments or 0) & ~full:
+                raise ValueError(
+                    f"A pick of {ffighter.name} on {pick.date} has increments outside the run's config "
+                    f"{config.increment_names}. Load the picks under the run's config (inside use_config).")
+
+
+def make_calendar(ffighters, existing_calendar_data=None, rejected=None, silent_mode=False, count=2,
+                  subscribers=None, config=None, rng=None):
+    """
+    Analyzes firefighters' picks and fully creates the calendar.
+    `subscribers` (callables taking a list of events) receive the draft's events in batches:
+    round started/ended, and every pick considered, approved, partially granted or denied.
+    `config` is the RunConfig to draft under (the active config by default); the firefighters
+    must have been loaded under it (see check_config).
+    `rng` rolls the tie-breaker dice each round (a random.Random; the global `random` by default).
+    """
+    with use_config(config) as config, events.subscribed(subscribers):
+        check_config(ffighters, config)
+        return _make_calendar(ffighters, existing_calendar_data, silent_mode, rng or random)
+
+
+def _make_calendar(ffighters, existing_calendar_data=None, silent_mode=False, rng=random):
     if existing_calendar_data is None:
         calendar = {}
         rejected = {}
@@ -397,20 +425,31 @@ def make_calendar(ffighters, existing_calendar_data=None, rejected=None, silent_
         rejected = existing_calendar_data.get("rejected", {})
     
     # Until all firefighters have a determination for all picks...
+    round_number = 0
     while any(filter(lambda x: len(x.picks), ffighters)):
-        randomize_sub_priority(ffighters)
+        round_number += 1
+        events.publish(events.RoundStarted, round_number, sum(1 for ff in ffighters if ff.picks))
+        randomize_sub_priority(ffighters, rng)
         if not silent_mode:
             printPriority(ffighters)
         # Grant no more than 2 picks per person per round
         for ffighter in ffighters:
             add_2_picks_for_ffighter(calendar, rejected, ffighter, count=2)
-    
+        events.publish(events.RoundEnded, round_number, sum(1 for ff in ffighters if ff.picks))
+        events.flush()
+
     return {"calendar": calendar, "rejected": rejected}
 
-def recreate_calendar_from_json(ffighters):
+def recreate_calendar_from_json(ffighters, config=None):
     """Rebuilds the calendar structure while maintaining firefighter pick order.
        Uses validate_pick_with_reasoning to check each pick and prints a reason for any failure.
     """
+    with use_config(config) as config:
+        check_config(ffighters, config)
+        return _recreate_calendar_from_json(ffighters)
+
+
+def _recreate_calendar_from_json(ffighters):
     calendar = {}
     rejected = {}
 
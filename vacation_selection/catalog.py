@@ -0,0 +1,282 @@
+# catalog.py
+# Run manifests and the append-only catalog of runs kept in the output folder.
+#
+# Every run writes `{run_id}-manifest.json` (inputs with their hashes, seed, config,
+# stage timings and output paths) and appends one line to `catalog.jsonl`.
+# Lookups such as "latest FFighters file for shift B" read the catalog instead of
+# listing and sorting the output folder.
+#
+# StageCache keeps the result of each headless pipeline stage under a key made of its
+# input hashes, settings and the keys of the stages before it, so a rerun resumes from
+# the last stage whose inputs did not change.
+import hashlib
+import json
+import os
+import pickle
+import random
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+
+import vacation_selection.setup_logging as setup_logging
+from vacation_selection.config import active_config
+
+logger = setup_logging.get_logger("catalog")
+
+CATALOG_FILENAME = "catalog.jsonl"
+MANIFEST_SUFFIX = "-manifest.json"
+STAGE_CACHE_DIRNAME = "stage_cache"
+# Bump when a cached stage result changes shape (e.g. FFighter/Pick gain fields)
+STAGE_CACHE_VERSION = 6
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_seed(seed=None):
+    """The seed to record for a run: `seed` itself, or a new random one."""
+    return seed if seed is not None else random.randrange(2 ** 32)
+
+
+def seed_random(seed=None):
+    """Seeds `random` (used for the dice tie-breaker) and returns the seed so a run can record it."""
+    seed = new_seed(seed)
+    random.seed(seed)
+    return seed
+
+
+def stage_random(seed, stage):
+    """
+    A random.Random of its own for one stage of a seeded run.  It depends only on the seed and
+    the stage name, so a stage rolls the same dice whether or not the stages before it were
+    cached, and runs in other threads cannot disturb it.
+    """
+    return random.Random(f"{seed}:{stage}")
+
+
+class RunManifest:
+    """
+    Collects what a run read, how long each stage took and what it wrote.
+
+    Args:
+        run_id: The run's timestamp string (the `runtime` used in output file names)
+        write_path: Output folder the manifest and catalog live in
+        seed: Seed used for the random tie-breaker, if known
+        config: RunConfig the run drafts under (the active config by default)
+    """
+
+    def __init__(self, run_id, write_path, seed=None, config=None):
+        self.run_id = run_id
+        self.write_path = write_path
+        self.seed = seed
+        self.created = datetime.now().isoformat(timespec="seconds")
+        self.config = (config or active_config()).to_dict()
+        self.inputs = {}
+        self.timings = {}
+        self.cached_stages = []
+        self.outputs = []
+
+    def add_input(self, file_path):
+        if file_path and os.path.exists(file_path):
+            self.inputs[file_path] = file_hash(file_path)
+
+    def add_output(self, file_path, kind, shift=None):
+        """Records an output file.  `kind` is e.g. "ffighters", "calendar", "runner_ups", "picks" or "analysis"."""
+        if file_path:
+            self.outputs.append({"kind": kind, "shift": shift, "path": os.path.relpath(file_path, self.write_path)})
+
+    @contextmanager
+    def stage(self, name):
+        """Times a block of work: `with manifest.stage("calendar"): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(self.timings.get(name, 0) + time.perf_counter() - start, 4)
+
+    def to_dict(self):
+        return {
+            "run_id": self.run_id,
+            "created": self.created,
+            "seed": self.seed,
+            "config": self.config,
+            "inputs": self.inputs,
+            "timings": self.timings,
+            "cached_stages": self.cached_stages,
+            "outputs": self.outputs,
+        }
+
+    def write(self):
+        """Writes the manifest file and appends the run to the catalog.  Returns the manifest path."""
+        os.makedirs(self.write_path, exist_ok=True)
+        manifest_path = os.path.join(self.write_path, f"{self.run_id}{MANIFEST_SUFFIX}")
+        manifest = self.to_dict()
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=4, default=str)
+        RunCatalog(self.write_path).append({"event": "run", **manifest})
+        logger.info(f"Run {self.run_id} recorded in {manifest_path}")
+        return manifest_path
+
+
+def stage_key(*parts):
+    """Cache key of a stage: a hash of its input file hashes, settings and upstream stage keys."""
+    payload = json.dumps([STAGE_CACHE_VERSION, *parts], default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class StageCache:
+    """
+    Pickled stage results in `{cache_dir}/{stage}-{key}.pkl`.
+
+    run() takes the pipeline as a list of (name, key, compute) where compute(value) turns the
+    previous stage's result into this stage's.  Only the result of the last stage with a
+    cached key is loaded; the stages after it are computed and cached.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def path(self, stage, key):
+        return os.path.join(self.cache_dir, f"{stage}-{key}.pkl")
+
+    def has(self, stage, key):
+        return os.path.exists(self.path(stage, key))
+
+    def load(self, stage, key):
+        with open(self.path(stage, key), "rb") as f:
+            return pickle.load(f)
+
+    def save(self, stage, key, value):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(stage, key)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    def run(self, stages, manifest=None):
+        """Returns the last stage's result, resuming after the last cached stage."""
+        start, value = 0, None
+        for position in range(len(stages) - 1, -1, -1):
+            name, key, _ = stages[position]
+            if self.has(name, key):
+                try:
+                    value = self.load(name, key)
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable stage cache {self.path(name, key)}: {e}")
+                    continue
+                start = position + 1
+                logger.info(f"Stage '{name}' loaded from cache; skipping {[stage[0] for stage in stages[:start]]}")
+                if manifest is not None:
+                    manifest.cached_stages.extend(stage[0] for stage in stages[:start])
+                break
+
+        for name, key, compute in stages[start:]:
+            if manifest is not None:
+                with manifest.stage(name):
+                    value = compute(value)
+            else:
+                value = compute(value)
+            self.save(name, key, value)
+        return value
+
+
+class RunCatalog:
+    """
+    Reads the append-only catalog of an output folder.
+
+    The catalog is replayed once on load into an index of runs (oldest first) and of the
+    latest output per (kind, shift), so lookups do not touch the folder listing.
+    """
+
+    def __init__(self, write_path):
+        self.write_path = write_path
+        self.path = os.path.join(write_path, CATALOG_FILENAME)
+        self.runs = {}
+        self.latest_outputs = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    self._apply(json.loads(line))
+
+    def _apply(self, entry):
+        event = entry.get("event")
+        if event == "run":
+            run = {key: value for key, value in entry.items() if key != "event"}
+            run["status"] = "active"
+            self.runs.pop(run["run_id"], None)
+            self.runs[run["run_id"]] = run
+            for output in run["outputs"]:
+                self.latest_outputs[(output["kind"], output["shift"])] = run["run_id"]
+        elif event in ("compressed", "pruned"):
+            run = self.runs.get(entry["run_id"])
+            if run is not None:
+                run["status"] = event
+                run["archive"] = entry.get("archive")
+                for key, run_id in list(self.latest_outputs.items()):
+                    if run_id == entry["run_id"]:
+                        del self.latest_outputs[key]
+
+    def append(self, entry):
+        os.makedirs(self.write_path, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+        self._apply(entry)
+
+    def latest_run(self):
+        """The most recently recorded run (dict), or None."""
+        return next(reversed(self.runs.values()), None)
+
+    def latest_output(self, kind, shift=None):
+        """
+        Path of the newest still-present output of a kind (and shift), or None.
+        e.g. latest_output("ffighters", "B") -> "./output/2025.03.18 14.07-FFighters-B_ffighters.json"
+        """
+        run_id = self.latest_outputs.get((kind, shift))
+        if run_id is None:
+            return None
+        for output in self.runs[run_id]["outputs"]:
+            if output["kind"] == kind and output["shift"] == shift:
+                return os.path.join(self.write_path, output["path"])
+        return None
+
+    def apply_retention(self, keep=10, action="compress"):
+        """
+        Keeps the newest `keep` runs as they are.  Older active runs are either zipped into
+        `{run_id}.zip` (action="compress") or deleted (action="prune"), and the change is
+        appended to the catalog.  Returns the run ids that were touched.
+        """
+        if action not in ("compress", "prune"):
+            raise ValueError(f"Unsupported retention action '{action}'. Expected 'compress' or 'prune'.")
+
+        active = [run for run in self.runs.values() if run["status"] == "active"]
+        expired = active[:-keep] if keep > 0 else active
+        for run in expired:
+            paths = [os.path.join(self.write_path, output["path"]) for output in run["outputs"]]
+            paths.append(os.path.join(self.write_path, f"{run['run_id']}{MANIFEST_SUFFIX}"))
+            paths = [path for path in paths if os.path.exists(path)]
+
+            archive = None
+            if action == "compress":
+                archive = f"{run['run_id']}.zip"
+                with zipfile.ZipFile(os.path.join(self.write_path, archive), "w", zipfile.ZIP_DEFLATED) as zf:
+                    for path in paths:
+                        zf.write(path, os.path.relpath(path, self.write_path))
+            for path in paths:
+                os.remove(path)
+
+            event = "compressed" if action == "compress" else "pruned"
+            self.append({"event": event, "run_id": run["run_id"], "archive": archive})
+            logger.info(f"Retention: {event} run {run['run_id']}")
+        return [run["run_id"] for run in expired]
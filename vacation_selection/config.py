@@ -0,0 +1,127 @@
+# config.py
+"""
+Per-run draft configuration.
+
+A RunConfig holds the settings that shape a draft: the increment names, the per-increment
+limit, the shift length and the 48-hour transition date, and whether the limit applies to
+the whole shift.  The engine hands it to every Day and Increment it creates, and
+make_calendar / main / the writers make it the active config for the duration of the call,
+so code that has no Day at hand (Pick, FFighter, Increment.tables()) reads the same one.
+
+The active config is held in a context variable, so runs with different configs can go
+side by side in threads.  Without one, the class attributes on Increment and Day are
+used, as before.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from functools import lru_cache
+
+
+class RunConfig:
+    """
+    Settings for one draft.  Treat as immutable; use replace() for a variation.
+
+    Args:
+        increment_names: Names of the increments in a shift, e.g. ("day_1", "day_2") or ("FULL",)
+        max_total_ffighters_allowed: Maximum firefighters off per increment
+        shift_duration_hours: 24 or 48
+        transition_date: Date 48-hour shifts begin (dates before it display as a single day)
+        limit_max_firefighters_at_shift_instead_of_increment: Apply the limit to the whole shift
+    """
+
+    def __init__(self, increment_names=("day_1", "day_2"), max_total_ffighters_allowed=6, shift_duration_hours=48,
+                 transition_date=date(2025, 2, 4), limit_max_firefighters_at_shift_instead_of_increment=False):
+        from vacation_selection.increment import increment_tables
+
+        self.increment_names = tuple(increment_names)
+        self.max_total_ffighters_allowed = max_total_ffighters_allowed
+        self.shift_duration_hours = shift_duration_hours
+        self.transition_date = transition_date
+        self.limit_max_firefighters_at_shift_instead_of_increment = limit_max_firefighters_at_shift_instead_of_increment
+        self.tables = increment_tables(self.increment_names)  # Mask lookup tables (see IncrementTables)
+
+    @classmethod
+    def from_class_defaults(cls):
+        """The config described by the Increment/Day class attributes."""
+        from vacation_selection.cal import Day
+        from vacation_selection.increment import Increment
+
+        return _class_defaults((
+            tuple(Increment.increment_names), Increment.max_total_ffighters_allowed, Increment.shift_duration_hours,
+            Increment.transition_date, Day.limit_max_firefighters_at_shift_instead_of_increment,
+        ))
+
+    def replace(self, **changes):
+        """A copy with some settings changed: config.replace(increment_names=("FULL",))"""
+        return RunConfig(**{**self._settings(), **changes})
+
+    def is_single_increment(self):
+        """Returns True if only one increment is configured."""
+        return len(self.increment_names) == 1
+
+    @property
+    def units_per_shift(self):
+        """Increment units in one shift (half-shifts with two increments per shift)."""
+        return self.tables.width
+
+    def spans_two_days(self, day):
+        """True when a shift starting on `day` is a 48-hour shift."""
+        return self.shift_duration_hours == 48 and day >= self.transition_date
+
+    def _settings(self):
+        return {
+            "increment_names": self.increment_names,
+            "max_total_ffighters_allowed": self.max_total_ffighters_allowed,
+            "shift_duration_hours": self.shift_duration_hours,
+            "transition_date": self.transition_date,
+            "limit_max_firefighters_at_shift_instead_of_increment": self.limit_max_firefighters_at_shift_instead_of_increment,
+        }
+
+    def to_dict(self):
+        """The settings as recorded in snapshots and run manifests."""
+        settings = self._settings()
+        settings["increment_names"] = list(self.increment_names)
+        return settings
+
+    def __eq__(self, other):
+        return isinstance(other, RunConfig) and self._settings() == other._settings()
+
+    def __hash__(self):
+        return hash(tuple(self._settings().values()))
+
+    def __repr__(self):
+        return f"RunConfig({', '.join(f'{key}={value!r}' for key, value in self._settings().items())})"
+
+    def __getstate__(self):
+        return self._settings()  # The tables are rebuilt (from the shared cache) on load
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+@lru_cache(maxsize=None)
+def _class_defaults(settings):
+    return RunConfig(*settings)
+
+
+_active = ContextVar("run_config", default=None)
+
+
+def active_config():
+    """The config of the run in progress, or the class-attribute defaults outside of one."""
+    config = _active.get()
+    return config if config is not None else RunConfig.from_class_defaults()
+
+
+@contextmanager
+def use_config(config):
+    """Makes config the active config inside the block (config=None keeps the current one)."""
+    if config is None:
+        yield active_config()
+        return
+    token = _active.set(config)
+    try:
+        yield config
+    finally:
+        _active.reset(token)
@@ -0,0 +1,125 @@
+# dates.py
+from datetime import date, datetime
+from functools import lru_cache
+
+# Formats tried (in order) when a value's format is not known.  Month-first comes before
+# day-first, so an ambiguous value such as 01/02/2024 is read as January 2.
+possible_formats = (
+    '%Y-%m-%d %H:%M:%S',  # e.g., 2024-11-15 08:53:32
+    '%Y-%m-%dT%H:%M:%S',  # e.g., 2024-11-15T00:00:00 (isoformat of a Timestamp)
+    '%Y-%m-%d %H:%M',     # e.g., 2024-11-15 08:53
+    '%Y-%m-%d',           # e.g., 2024-11-15
+    '%m-%d-%Y',           # e.g., 11-15-2024
+    '%m/%d/%Y',           # e.g., 11/15/2024
+    '%d-%m-%Y',           # e.g., 15-11-2024
+    '%d/%m/%Y'            # e.g., 15/11/2024
+)
+
+
+class DateParser:
+    """
+    Parses dates from the strings (and date-like objects) found in our input files.
+
+    A single value is parsed with the first format that fits it.  A column (or a whole
+    file) should be parsed with one format: detect_format() picks it from all the values
+    up front, and parse(value, fmt=...) / parse_column() apply it.  The parser keeps no
+    per-column state, so files and threads sharing it cannot change each other's results.
+    Parsed strings are kept in a bounded cache, since the same pick dates show up over
+    and over across a roster.
+    """
+
+    def __init__(self, formats=possible_formats, cache_size=4096):
+        self.formats = tuple(formats)
+        self._parse_string = lru_cache(maxsize=cache_size)(self._parse_string_uncached)
+
+    def _parse_string_uncached(self, value, fmt):
+        """Returns the date of `value`.  Tries `fmt` first, then every known format."""
+        if fmt is not None:
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                pass
+        for candidate in self.formats:
+            if candidate == fmt:
+                continue
+            try:
+                return datetime.strptime(value, candidate).date()
+            except ValueError:
+                continue
+        raise ValueError(f"Unrecognized date format for '{value}'")
+
+    def parse(self, date_value, fmt=None):
+        """
+        Parses a single value into a `date`.
+        Strings are parsed with `fmt` (usually from detect_format) when it fits, otherwise
+        with the first known format that does; datetimes, pandas Timestamps and dates are
+        converted directly.
+        """
+        # datetime (and pandas Timestamp, which subclasses it) must be checked before date
+        if isinstance(date_value, datetime):
+            return date_value.date()
+        if isinstance(date_value, date):
+            return date_value
+
+        if isinstance(date_value, str):
+            return self._parse_string(date_value.strip(), fmt)
+
+        raise TypeError(f"Unsupported date type: {type(date_value)}")
+
+    def detect_format(self, values):
+        """
+        Returns the known format that parses the most of the (non-blank) string values,
+        preferring the earlier format on a tie, or None if no format parses any of them.
+        Every value is looked at, so one 13/02/2024 makes the whole column day-first.
+        """
+        values = {value.strip() for value in values if isinstance(value, str) and value.strip()}
+        best, best_count = None, 0
+        for fmt in self.formats:
+            count = 0
+            for value in values:
+                try:
+                    datetime.strptime(value, fmt)
+                    count += 1
+                except ValueError:
+                    continue
+            if count > best_count:
+                best, best_count = fmt, count
+                if count == len(values):
+                    break
+        return best
+
+    def parse_column(self, values):
+        """
+        Bulk-parses a whole column with the format detected from all of its values.
+        Blank values become None.
+        """
+        values = list(values)
+        fmt = self.detect_format(values)
+        return [
+            None if value is None or (isinstance(value, str) and not value.strip())
+            else self.parse(value, fmt)
+            for value in values
+        ]
+
+    def reset(self):
+        """Forgets cached values."""
+        self._parse_string.cache_clear()
+
+
+# Shared parser used by all loaders
+date_parser = DateParser()
+
+
+def parse_date(date_value, fmt=None):
+    """Parses a date from various input types, including strings and pandas Timestamps."""
+    return date_parser.parse(date_value, fmt)
+
+
+def detect_date_format(values):
+    """The format to parse a column (or file) of date values with; see DateParser.detect_format."""
+    return date_parser.detect_format(values)
+
+
+def parse_date_column(values):
+    """Parses a list of date values, detecting the column format once."""
+    return date_parser.parse_column(values)
@@ -0,0 +1,173 @@
+# events.py
+# Typed events published by the draft engine (cal.py) while it runs.
+#
+# Subscribers are plain callables that receive a *list* of events.  They are attached to a
+# run with subscribed() (make_calendar(subscribers=...) does this), and only see the events
+# of that run.  Events are buffered per subscriber and handed over in batches (on a full
+# buffer, at the end of every round and when the subscription ends), so a slow subscriber
+# never runs once per pick.
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Event kinds
+CONSIDERED = "considered"
+APPROVED = "approved"
+PARTIAL = "partial"      # Approved, but only some of the requested increments were granted
+DENIED = "denied"
+ROUND_STARTED = "round_started"
+ROUND_ENDED = "round_ended"
+
+DECISION_KINDS = (APPROVED, PARTIAL, DENIED)
+
+DEFAULT_BATCH_SIZE = 256
+
+# Denial codes, matched against the start of a denial reason
+DENIAL_CODES = (
+    ("No days off allowed within the first 182 days", "probation"),
+    ("Reached 4 holidays limit", "probation_holiday_limit"),
+    ("Schedule Reassignment", "exclusion"),
+    ("Max shifts off already reached", "max_shifts_off"),
+    ("No room for any increments", "no_room"),
+    ("All requested increments are full", "increments_full"),
+    ("Day already has maximum firefighters off", "day_full"),
+    ("Increment is a holiday", "holiday_rank_limit"),
+    ("Increment already has", "rank_limit"),
+    ("Already requested this day off", "duplicate"),
+)
+
+
+def denial_code(reason):
+    """Short, stable code for a denial reason (e.g. "day_full"), or "other"."""
+    for prefix, code in DENIAL_CODES:
+        if reason and reason.startswith(prefix):
+            return code
+    return "other"
+
+
+class DraftEvent:
+    kind = None
+    __slots__ = ()
+
+
+class DecisionEvent(DraftEvent):
+    """A pick that was considered or decided.  For decisions the pick is already in ffighter.processed."""
+    __slots__ = ("ffighter", "pick", "reason")
+
+    def __init__(self, ffighter, pick, reason=None):
+        self.ffighter = ffighter
+        self.pick = pick
+        self.reason = reason
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.ffighter.name}, {self.pick.date}, {self.reason!r})"
+
+
+class PickConsidered(DecisionEvent):
+    kind = CONSIDERED
+    __slots__ = ()
+
+
+class PickApproved(DecisionEvent):
+    kind = APPROVED
+    __slots__ = ()
+
+
+class PickPartiallyGranted(DecisionEvent):
+    kind = PARTIAL
+    __slots__ = ()
+
+
+class PickDenied(DecisionEvent):
+    kind = DENIED
+    __slots__ = ()
+
+    @property
+    def code(self):
+        return denial_code(self.reason)
+
+
+class RoundEvent(DraftEvent):
+    """Start or end of a draft round.  `remaining` is the number of firefighters with picks left."""
+    __slots__ = ("round_number", "remaining")
+
+    def __init__(self, round_number, remaining):
+        self.round_number = round_number
+        self.remaining = remaining
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.round_number}, remaining={self.remaining})"
+
+
+class RoundStarted(RoundEvent):
+    kind = ROUND_STARTED
+    __slots__ = ()
+
+
+class RoundEnded(RoundEvent):
+    kind = ROUND_ENDED
+    __slots__ = ()
+
+
+class EventStream:
+    """Buffers events for one subscriber and delivers them in batches."""
+
+    def __init__(self, subscriber, batch_size=DEFAULT_BATCH_SIZE):
+        self.subscriber = subscriber
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def emit(self, event):
+        self.buffer.append(event)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self.subscriber(batch)
+
+
+# Streams of the run in progress, in subscription order.  A context variable holding a tuple,
+# so drafts in different threads never see each other's subscribers and publishing never
+# iterates a list that is being changed.
+_streams = ContextVar("event_streams", default=())
+
+
+def active_streams():
+    """The streams events are published to in the current context."""
+    return _streams.get()
+
+
+@contextmanager
+def subscribed(subscribers, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Delivers every event published inside the with-block (in this context) to `subscribers`,
+    in batches.  Their remaining buffered events are handed over when the block ends.
+    """
+    added = tuple(EventStream(subscriber, batch_size) for subscriber in subscribers or ())
+    if not added:
+        yield added
+        return
+    token = _streams.set(_streams.get() + added)
+    try:
+        yield added
+    finally:
+        _streams.reset(token)
+        for stream in added:
+            stream.flush()
+
+
+def publish(event_type, *args):
+    """Publishes event_type(*args) to the active streams.  The event is only built if someone is listening."""
+    streams = _streams.get()
+    if not streams:
+        return
+    event = event_type(*args)
+    for stream in streams:
+        stream.emit(event)
+
+
+def flush():
+    """Hands every buffered event of the active streams to its subscriber."""
+    for stream in _streams.get():
+        stream.flush()
@@ -0,0 +1,131 @@
+# exclusions.py
+# Matches rows of the exclusions file to firefighters and applies them.
+#
+# Firefighters are indexed once by ID and by normalized name, so each exclusion is
+# resolved with dictionary lookups.  Only exclusions without an ID or exact name hit fall
+# back to fuzzy matching, and then only against firefighters sharing a first- or
+# last-name initial.
+import re
+from difflib import SequenceMatcher
+
+import vacation_selection.setup_logging as setup_logging
+
+logger = setup_logging.get_logger("exclusions")
+
+# Minimum SequenceMatcher ratio for both the first and last name in a fuzzy match
+FUZZY_THRESHOLD = 0.8
+
+# Exclusion columns that may carry the firefighter's ID
+ID_COLUMNS = ("ID", "Employee Number", "idnum")
+
+
+def normalize_name(name):
+    """Lowercase letters and digits only: "O'Hara-Smith " -> "oharasmith"."""
+    if not isinstance(name, str):
+        return ""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def exclusion_id(exclusion):
+    for column in ID_COLUMNS:
+        value = exclusion.get(column)
+        if value is None or value != value:  # Missing or NaN
+            continue
+        value = str(value).strip()
+        if value.endswith(".0"):  # Excel reads whole numbers as floats
+            value = value[:-2]
+        if value not in ("", "0"):
+            return value
+    return None
+
+
+class ExclusionMatcher:
+    """
+    Index of firefighters for resolving exclusions.
+
+    match() tries, in order:
+        1. the exclusion's ID (if the file has an ID column)
+        2. exact normalized first + last name, in either order
+        3. fuzzy: the best average of first/last name ratios, with both ratios >= threshold,
+           among firefighters sharing a first- or last-name initial
+    Several firefighters tied at the same step make the exclusion ambiguous.
+    """
+
+    def __init__(self, ffighters, threshold=FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self.by_id = {}
+        self.by_name = {}
+        self.by_initial = {}
+        for ff in ffighters:
+            self.by_id.setdefault(str(ff.idnum).strip(), []).append(ff)
+            fname, lname = normalize_name(ff.fname), normalize_name(ff.lname)
+            self.by_name.setdefault((fname, lname), []).append(ff)
+            entry = (fname, lname, ff)
+            for initial in {fname[:1], "l" + lname[:1]}:
+                self.by_initial.setdefault(initial, []).append(entry)
+
+    def match(self, exclusion):
+        """Returns the list of best matching firefighters: empty, one, or several if ambiguous."""
+        idnum = exclusion_id(exclusion)
+        if idnum is not None and idnum in self.by_id:
+            return self.by_id[idnum]
+
+        fname, lname = normalize_name(exclusion.get("FName")), normalize_name(exclusion.get("LName"))
+        exact = self.by_name.get((fname, lname)) or self.by_name.get((lname, fname))
+        if exact:
+            return exact
+        return self._fuzzy_match(fname, lname)
+
+    def _fuzzy_match(self, fname, lname):
+        candidates = {}
+        for entry in self.by_initial.get(fname[:1], []) + self.by_initial.get("l" + lname[:1], []):
+            candidates[id(entry[2])] = entry
+
+        best_score = 0
+        best = []
+        for ff_fname, ff_lname, ff in candidates.values():
+            first_ratio = SequenceMatcher(None, fname, ff_fname).ratio()
+            if first_ratio < self.threshold:
+                continue
+            last_ratio = SequenceMatcher(None, lname, ff_lname).ratio()
+            if last_ratio < self.threshold:
+                continue
+            score = (first_ratio + last_ratio) / 2
+            if score > best_score:
+                best_score, best = score, [ff]
+            elif score == best_score:
+                best.append(ff)
+        return best
+
+
+def apply_exclusions(exclusions, ffighters, threshold=FUZZY_THRESHOLD):
+    """
+    Adds each exclusion to its matching firefighter.
+    Ambiguous exclusions (several equally good matches) are not applied.
+
+    Returns:
+        (unmatched, ambiguous): "FName LName" of exclusions with no match, and
+        "FName LName -> candidate, candidate" of ambiguous ones
+    """
+    matcher = ExclusionMatcher(ffighters, threshold)
+    unmatched = []
+    ambiguous = []
+    for exclusion in exclusions:
+        label = f"{exclusion.get('FName')} {exclusion.get('LName')}"
+        matches = matcher.match(exclusion)
+        if not matches:
+            unmatched.append(label)
+        elif len(matches) > 1:
+            ambiguous.append(f"{label} -> " + ", ".join(f"{ff.name} ({ff.idnum})" for ff in matches))
+        else:
+            ff = matches[0]
+            ff.add_exclusion(exclusion['Leave Start'], exclusion.get('Leave End'), exclusion['Reason'])
+            logger.info(f"Exclusion '{label}' applied to '{ff.fname} {ff.lname}'.")
+
+    if unmatched:
+        unmatched_str = "\n".join(unmatched)
+        logger.warning(f"Unmatched exclusions:\n{unmatched_str}")
+    if ambiguous:
+        ambiguous_str = "\n".join(ambiguous)
+        logger.warning(f"Ambiguous exclusions (not applied):\n{ambiguous_str}")
+    return unmatched, ambiguous
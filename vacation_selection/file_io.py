@@ -2,39 +2,43 @@
 import csv
 import json
 import os
-import pandas as pd
 from datetime import datetime, date
 import vacation_selection.setup_logging as setup_logging
 from vacation_selection.firefighter import FFighter, Pick
 from vacation_selection.cal import Day
+from vacation_selection.config import use_config
 from vacation_selection.validation import ensure_rank  # Import validation function
+from vacation_selection.dates import detect_date_format, parse_date
+from vacation_selection.form_formats import get_form_format
+from vacation_selection.pick_table import PickTable
+from vacation_selection.store import RunStore, STORE_FILENAME
+from vacation_selection.catalog import RunCatalog
 
-logger = setup_logging.setup_logging()
+logger = setup_logging.get_logger()
 
 # ================================================================================
 # Reading from CSV
 # ================================================================================
 
-def read_firefighter_data(filename, date_format, file_format):
-    """Reads firefighter data from a CSV file and processes it based on the specified file format."""
+def read_firefighter_data(filename, date_format, file_format, progress=None):
+    """
+    Reads firefighter data from a CSV file and processes it based on the specified file format.
+    `progress`, if given, is called as progress(rows_read) while the file is processed.
+    """
     ffdata = []
     try:
-        with open(filename, mode="r", encoding="utf-8-sig") as csvfile:
+        form_format = get_form_format(file_format)
+        with open(filename, mode="r", encoding="utf-8-sig", newline="") as csvfile:
             logger.debug(f"Successfully opened file: {filename}")
 
-            # Create the CSV reader and read the headers
-            reader = csv.DictReader(csvfile)
-            headers = reader.fieldnames
+            # Create the CSV reader and validate the headers once
+            reader = csv.reader(csvfile)
+            headers = next(reader, [])
             logger.debug(f"File headers: {headers}")
+            compiled_format = form_format.compile(headers)
 
             logger.debug(f"Processing data for File Format: {file_format}")
-            # Read each row based on the specified file format
-            if file_format == 2024:
-                ffdata = process_firefighter_data_2024(reader, date_format)
-            elif file_format == 2025:
-                ffdata = process_firefighter_data_2025(reader, date_format)
-            else:
-                raise ValueError("Unsupported file format year.")
+            ffdata = process_firefighter_data(reader, compiled_format, progress)
             logger.debug("Finished reading firefighter data.")
 
     except Exception as e:
@@ -51,6 +55,7 @@ def read_exclusions_file(file_path):
     Reads exclusions data from an Excel file, processes combined 'LName,FName' column,
     and returns a list of dictionaries with standardized fields.
     """
+    import pandas as pd  # Only the Excel readers need pandas
     exclusions = []
     try:
         logger.info(f"Reading exclusions file: {file_path}")
@@ -99,56 +104,30 @@ def read_exclusions_file(file_path):
 
 # Helper functions to process CSV data
 # ================================================================================
-def process_firefighter_data_2024(reader, date_format):
-    """Processes firefighter data in the 2024 format."""
-    logger.debug("Starting 2024 data processing")
+def process_firefighter_data(reader, compiled_format, progress=None):
+    """Processes csv.reader rows using a form format compiled against the file's headers."""
+    logger.debug(f"Starting {compiled_format.form_format.year} data processing")
+    # Detect each date format once for the whole file, so an ambiguous 01/02 is read the
+    # same way on every row (and day-first if any row can only be day-first)
+    rows = list(reader)
+    hire_date_format = detect_date_format(compiled_format.field_values(rows, "hire_date"))
+    pick_date_format = detect_date_format(compiled_format.pick_day_values(rows))
+    table = PickTable()  # The file's picks, freed with them
     ffdata = []
-    for index, row in enumerate(reader):
+    for index, row in enumerate(rows):
+        if progress:
+            progress(index + 1)
+        if not row:
+            continue
         try:
-            fname = row['First Name']
-            lname = row['Last Name']
-            rank = ensure_rank(row["Rank"])
-            idnum = row['Employee ID #']
-            startDate = parse_date(row['Employee Start Date'])
-            shift = row["Shift"]
-
-            pick_dates = []
-            for x in range(1, 18):
-                day_key = f"Day {x}"
-                type_key = f"Type {x}" if x != 1 else " Type"
-                if day_key in row and row[day_key]:
-                    try:
-                        pick_date = parse_date(row[day_key])
-                        pick_type = row.get(type_key, "Unaddressed")
-                        pick_dates.append(Pick(pick_date, type=pick_type))
-                    except Exception as e:
-                        logger.error(f"Failed to parse pick date '{row[day_key]}' in row {index + 1}: {e}")
-                        continue
-
-            ffdata.append(FFighter(idnum, fname, lname, startDate, rank, shift, pick_dates))
-
-        except Exception as e:
-            logger.error(f"Failed to process row {index + 1}: {e}")
-
-    return ffdata
-
-def process_firefighter_data_2025(reader, date_format):
-    """Processes firefighter data in the 2025 format."""
-    logger.debug("Starting 2025 data processing")
-    ffdata = []
-    for index, row in enumerate(reader):
-        try:
-            logger.debug(f"Processing row {index + 1}: {row}")
-
             # Parse basic firefighter data
             try:
-                fname = row['First Name']
-                lname = row['Last Name']
-                rank = ensure_rank(row["Rank"])
-                idnum = row['Employee ID #']
-                startDate = parse_date(row['Employee Hire Date'])
-                shift = row["Shift"]
-                logger.debug(f"Parsed data - Name: {fname} {lname}, Rank: {rank}, ID: {idnum}, Start Date: {startDate}, Shift: {shift}")
+                fname = compiled_format.field(row, "fname")
+                lname = compiled_format.field(row, "lname")
+                rank = ensure_rank(compiled_format.field(row, "rank"))
+                idnum = compiled_format.field(row, "idnum")
+                startDate = parse_date(compiled_format.field(row, "hire_date"), hire_date_format)
+                shift = compiled_format.field(row, "shift")
             except KeyError as ke:
                 logger.error(f"Missing key in row {index + 1}: {ke}. Row: {row}")
                 continue
@@ -156,77 +135,31 @@ def process_firefighter_data_2025(reader, date_format):
                 logger.error(f"Invalid value in row {index + 1}: {ve}. Row: {row}")
                 continue
 
-            # Check acknowledgment of form completion
-            acknowledgment = row.get('Acknowledgment of Form Completion', '').strip()
-            
+            pick_dates = []
             # If the user prefers to skip the selection, do not add any picks
-            if acknowledgment == "I would prefer to skip the selection, and submit a blank request form.":
+            if compiled_format.skips_selection(row):
                 logger.info(f"Skipping pick selection for {fname} {lname} (ID: {idnum}) as per acknowledgment.")
-                pick_dates = []  # No picks are added
             else:
-                # Parse pick dates and shifts if the user continues with the selection
-                pick_dates = []
-                for x in range(1, 41):
-                    day_key = f"Day {x}"
-                    shift_key = f"Shift Selection {x}"
-                    if day_key in row and row[day_key]:
-                        try:
-                            pick_date = parse_date(row[day_key])
-                            shift_selection = row.get(shift_key, 'AMPM')
-                            pick_dates.append(Pick(pick_date, increments=shift_selection))
-                            logger.debug(f"Added pick - Date: {pick_date}, Shift: {shift_selection} for {fname} {lname}")
-                        except ValueError as ve:
-                            logger.error(f"Failed to parse pick date '{row[day_key]}' in row {index + 1}: {ve}")
-                            continue
-
-            # Create FFighter instance
-            ffighter = FFighter(idnum, fname, lname, startDate, rank, shift, pick_dates)
-            logger.debug(f"Created FFighter instance: {ffighter}")
-
-            ffdata.append(ffighter)
+                for day_column, day_value, pick_type, increments in compiled_format.pick_cells(row):
+                    try:
+                        pick_date = parse_date(day_value, pick_date_format)
+                    except ValueError as ve:
+                        logger.error(f"Failed to parse pick date '{day_value}' ({day_column}) in row {index + 1}: {ve}")
+                        continue
+                    pick_dates.append(Pick(pick_date, type=pick_type, increments=increments, table=table))
+
+            ffdata.append(FFighter(idnum, fname, lname, startDate, rank, shift, pick_dates))
 
         except Exception as e:
             logger.error(f"Unhandled error processing row {index + 1}: {e}. Row: {row}")
-            # Optionally, include stack trace for deeper debugging
             logger.exception(e)
     return ffdata
 
 
-# Helper function to parse dates from strings
-def parse_date(date_value):
-    """Parses a date from various input types, including strings and pandas Timestamps."""
-    from pandas import Timestamp
-
-    # If the value is already a Timestamp, convert it to a date
-    if isinstance(date_value, Timestamp):
-        return date_value.date()
-
-    # If the value is a string, parse it
-    if isinstance(date_value, str):
-        possible_formats = [
-            '%Y-%m-%d %H:%M:%S',  # e.g., 2024-11-15 08:53:32
-            '%Y-%m-%d %H:%M',     # e.g., 2024-11-15 08:53
-            '%Y-%m-%d',           # e.g., 2024-11-15
-            '%m-%d-%Y',           # e.g., 11-15-2024
-            '%m/%d/%Y',           # e.g., 11/15/2024
-            '%d-%m-%Y',           # e.g., 15-11-2024
-            '%d/%m/%Y'            # e.g., 15/11/2024
-        ]
-        for fmt in possible_formats:
-            try:
-                return datetime.strptime(date_value, fmt).date()
-            except ValueError:
-                continue
-        raise ValueError(f"Unrecognized date format for '{date_value}'")
-
-    # If the value is not a recognized type, raise an error
-    raise TypeError(f"Unsupported date type: {type(date_value)}")
-
-
-
 # Read in the HR_Validation File
 def read_hr_validation(filename):
     """Reads HR validation data from an Excel file and returns it as a list of dictionaries."""
+    import pandas as pd  # Only the Excel readers need pandas
     hr_data = []
     try:
         # Read the .xlsx file using pandas
@@ -264,9 +197,10 @@ def print_final(ffighters):
             print(key)
 
 
-def write_picks_to_csv(ffighters, suffix, write_path, runtime, pick_filter=None):
+def write_picks_to_csv(ffighters, suffix, write_path, runtime, pick_filter=None, config=None):
     """Writes the picks and status of each firefighter to a CSV file.
        Optionally, only writes picks that satisfy pick_filter (a function that takes a pick and returns True/False).
+       Dates and increments are displayed per `config` (the active RunConfig by default).
     """
     file_name = f'{write_path}/{runtime}-FFighters-{suffix}.csv'
     with open(file_name, 'w', newline='') as f:
@@ -281,10 +215,11 @@ def write_picks_to_csv(ffighters, suffix, write_path, runtime, pick_filter=None)
                 if pick_filter and not pick_filter(pick):
                     continue
                 writer.writerow([
-                    '', '', pick.format_date_display(), pick.type,
-                    pick.increments_plain_text(), pick.determination, pick.reason
+                    '', '', pick.format_date_display(config), pick.type,
+                    pick.increments_plain_text(config=config), pick.determination, pick.reason
                 ])
             writer.writerow([])
+    return file_name
 
 
 # ==========    JSON    ==============================================================
@@ -294,19 +229,114 @@ class CustomJSONEncoder(json.JSONEncoder):
         if isinstance(obj, date):
             return obj.isoformat()  # Convert `date` to a string in ISO 8601 format
         return super().default(obj)
-    
-def write_ffighters_to_json(ffighters, suffix, write_path, runtime):
-    """Writes the firefighter list and their processed picks to a JSON file."""
+
+
+def _json_default(obj):
+    """`default` hook for the C encoder: dates (and Timestamps) become ISO 8601 strings."""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Output modes for firefighter JSON:
+#   pretty  - a single indented JSON array (human readable, slowest)
+#   compact - a JSON array with one firefighter per line, streamed through the C encoder
+#   jsonl   - JSON Lines, one firefighter per line (written to a .jsonl file)
+JSON_MODES = ("pretty", "compact", "jsonl")
+# Output backends: "json" writes the JSON/CSV files, "sqlite" writes the per-folder RunStore
+BACKENDS = ("json", "sqlite")
+
+_compact_separators = (",", ":")
+
+
+def _ffighter_json_dict(ffighter):
     # Include ID in the name field in the dictionary representation
-    ffighter_data = [
-        {**ffighter.to_dict(), "name": f"{ffighter.name} (ID: {ffighter.idnum})"} 
-        for ffighter in ffighters
-    ]
-    file_name = f"{write_path}/{runtime}-FFighters-{suffix}.json"
+    ff_dict = ffighter.to_dict()
+    ff_dict["name"] = f"{ffighter.name} (ID: {ffighter.idnum})"
+    return ff_dict
+
+
+def _check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported output backend '{backend}'. Expected one of {BACKENDS}.")
+
+
+def store_path(write_path):
+    """Path of the SQLite store kept in an output folder."""
+    return os.path.join(write_path, STORE_FILENAME)
+
+
+def write_ffighters_to_json(ffighters, suffix, write_path, runtime, mode="pretty", backend="json", config=None):
+    """
+    Writes the firefighter list and their processed picks to a JSON file.
+    `mode` is one of JSON_MODES; compact and jsonl stream one firefighter at a time.
+    With backend="sqlite" the firefighters are stored under the `runtime` run in the output folder's store instead.
+    Picks are serialized per `config` (the active RunConfig by default).
+    Returns the file name written.
+    """
+    with use_config(config):
+        return _write_ffighters_to_json(ffighters, suffix, write_path, runtime, mode, backend)
+
+
+def _write_ffighters_to_json(ffighters, suffix, write_path, runtime, mode, backend):
+    _check_backend(backend)
+    if backend == "sqlite":
+        file_name = store_path(write_path)
+        with RunStore(file_name) as store:
+            store.write_ffighters(runtime, ffighters)
+        return file_name
+
+    if mode not in JSON_MODES:
+        raise ValueError(f"Unsupported JSON mode '{mode}'. Expected one of {JSON_MODES}.")
+
+    extension = "jsonl" if mode == "jsonl" else "json"
+    file_name = f"{write_path}/{runtime}-FFighters-{suffix}.{extension}"
 
     with open(file_name, 'w') as json_file:
-        # Use the custom encoder to handle `date` serialization
-        json.dump(ffighter_data, json_file, indent=4, cls=CustomJSONEncoder)
+        if mode == "pretty":
+            ffighter_data = [_ffighter_json_dict(ffighter) for ffighter in ffighters]
+            # Use the custom encoder to handle `date` serialization
+            json.dump(ffighter_data, json_file, indent=4, cls=CustomJSONEncoder)
+        else:
+            separator = "" if mode == "jsonl" else "["
+            for ffighter in ffighters:
+                json_file.write(separator)
+                json_file.write(json.dumps(_ffighter_json_dict(ffighter), separators=_compact_separators,
+                                           default=_json_default))
+                separator = "\n" if mode == "jsonl" else ",\n"
+            if mode == "compact":
+                json_file.write("]\n" if separator != "[" else "[]\n")
+            else:
+                json_file.write("\n")
+    return file_name
+
+
+def iter_json_records(json_file, chunk_size=1 << 16):
+    """
+    Yields the top-level objects of a JSON array or JSON Lines file one at a time,
+    without loading the whole document first.
+    """
+    decoder = json.JSONDecoder()
+    separators = " \t\r\n,[]"
+    buffer = ""
+    for chunk in iter(lambda: json_file.read(chunk_size), ""):
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in separators:
+                position += 1
+            if position >= len(buffer):
+                break
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # Incomplete record; read more
+            yield record
+        buffer = buffer[position:]
+
+    if buffer.strip(separators):
+        raise ValueError(f"Unexpected trailing data in JSON file: {buffer[:50]!r}")
+
 
 def sanitize_ff_dict(ff_dict):
     from datetime import datetime
@@ -318,7 +348,7 @@ def sanitize_ff_dict(ff_dict):
         ff_dict['hireDate'] = datetime.now().strftime('%Y-%m-%d')
     else:
         try:
-            parsed_date = datetime.strptime(raw_hire_date, '%Y-%m-%d')
+            parsed_date = parse_date(raw_hire_date)
             ff_dict['hireDate'] = parsed_date.strftime('%Y-%m-%d')
         except Exception as e:
             logger.error(
@@ -373,8 +403,7 @@ def sanitize_ff_dict(ff_dict):
         for key in ['Leave Start', 'Leave End']:
             if key in exclusion and isinstance(exclusion[key], str):
                 try:
-                    date_str = exclusion[key].split('T')[0]
-                    exclusion[key] = datetime.strptime(date_str, '%Y-%m-%d').date()
+                    exclusion[key] = parse_date(exclusion[key])
                 except Exception as e:
                     logger.error(
                         f"sanitize_ff_dict: Failed to parse {key} '{exclusion.get(key)}' for FFighter id {ff_dict.get('idnum')}. "
@@ -386,31 +415,50 @@ def sanitize_ff_dict(ff_dict):
     return ff_dict
 
 
-def read_ffighters_from_json(file_path):
-    """Reads firefighter data from a JSON file and returns a list of FFighter objects."""
-    from datetime import datetime
+def iter_ffighters_from_json(file_path):
+    """Streams FFighter objects from a pretty, compact or JSON Lines firefighter file."""
+    table = PickTable()  # One table for the file's picks
+    with open(file_path, 'r') as json_file:
+        for ff_dict in iter_json_records(json_file):
+            # Sanitize each dictionary before converting to an FFighter object.
+            yield FFighter.from_dict(sanitize_ff_dict(ff_dict), table)
+
+
+def read_ffighters_from_json(file_path, backend="json", run_id=None):
+    """
+    Reads firefighter data from a JSON (or JSON Lines) file and returns a list of FFighter objects.
+    With backend="sqlite", `file_path` is a store and the given run (latest by default) is read.
+    """
+    _check_backend(backend)
     ffighter_list = []
     try:
-        with open(file_path, 'r') as json_file:
-            ffighter_dicts = json.load(json_file)
-            logger.debug(f"Read {len(ffighter_dicts)} entries from {file_path}")
-            # Sanitize each dictionary before converting to an FFighter object.
-            sanitized_dicts = [sanitize_ff_dict(ff_dict) for ff_dict in ffighter_dicts]
-            ffighter_list = [FFighter.from_dict(ff_dict) for ff_dict in sanitized_dicts]
+        if backend == "sqlite":
+            with RunStore(file_path) as store:
+                ffighter_list = store.read_ffighters(run_id)
+        else:
+            ffighter_list = list(iter_ffighters_from_json(file_path))
     except Exception as e:
         logger.error(f"Failed to read from JSON: {e}")
     logger.info(f"Loaded {len(ffighter_list)} firefighters from {file_path}")
     return ffighter_list
 
 
-def write_analysis_to_json(analysis, write_path, runtime):
+def write_analysis_to_json(analysis, write_path, runtime, backend="json"):
     """
-    Writes the analysis data to a JSON file in the specified output folder.
+    Writes the analysis data to a JSON file in the specified output folder
+    (or onto the `runtime` run of the folder's store with backend="sqlite").
     """
+    _check_backend(backend)
     try:
         # Ensure the write path exists
         os.makedirs(write_path, exist_ok=True)
 
+        if backend == "sqlite":
+            with RunStore(store_path(write_path)) as store:
+                store.write_analysis(runtime, analysis)
+            logger.info(f"Analysis data saved to run {runtime} in {store_path(write_path)}")
+            return store_path(write_path)
+
         # Construct file name
         file_name = f"{write_path}/{runtime}-analysis.json"
         
@@ -418,21 +466,39 @@ def write_analysis_to_json(analysis, write_path, runtime):
         with open(file_name, 'w') as json_file:
             json.dump(analysis, json_file, indent=4, cls=CustomJSONEncoder)
         logger.info(f"Analysis data saved to {file_name}")
+        return file_name
     except Exception as e:
         logger.error(f"Failed to write analysis data to JSON: {e}")
         raise
 
-def read_analysis_from_json(output_folder):
+def read_analysis_from_json(output_folder, backend="json"):
     """
     Loads the most recent analysis JSON file from the specified output folder.
+    With backend="sqlite" the latest analysed run of the folder's store is read instead.
     Returns None if no valid analysis file is found.
     """
+    _check_backend(backend)
     try:
         # Ensure the output folder exists
         if not os.path.exists(output_folder):
             logger.warning(f"Output folder '{output_folder}' does not exist.")
             return None
 
+        if backend == "sqlite":
+            if not os.path.exists(store_path(output_folder)):
+                logger.warning("No analysis store found.")
+                return None
+            with RunStore(store_path(output_folder)) as store:
+                return store.read_analysis()
+
+        # Prefer the run catalog; fall back to scanning the folder for runs written before it existed
+        latest_file = RunCatalog(output_folder).latest_output("analysis")
+        if latest_file and os.path.exists(latest_file):
+            with open(latest_file, 'r') as json_file:
+                analysis_data = json.load(json_file)
+            logger.info(f"Loaded analysis file: {latest_file}")
+            return analysis_data
+
         # Get all analysis files
         analyze_files = [
             f for f in os.listdir(output_folder) if f.endswith("-analysis.json")
@@ -456,8 +522,14 @@ def read_analysis_from_json(output_folder):
         return None
 
 
-def write_calendar_to_csv(calendar, suffix, write_path, runtime):
-    """Writes the calendar data to a CSV file."""
+def write_calendar_to_csv(calendar, suffix, write_path, runtime, backend="json"):
+    """Writes the calendar data to a CSV file (or to the output folder's store with backend="sqlite")."""
+    _check_backend(backend)
+    if backend == "sqlite":
+        with RunStore(store_path(write_path)) as store:
+            store.write_increments(runtime, suffix, calendar, kind="approved")
+        return store_path(write_path)
+
     file_name = f'{write_path}/{runtime}-calendar-{suffix}.csv'
     with open(file_name, 'w', newline='') as f:
         writer = csv.writer(f)
@@ -466,9 +538,10 @@ def write_calendar_to_csv(calendar, suffix, write_path, runtime):
 
         for date in sorted(calendar.keys()):
             calendar[date].write_to_row(writer)
+    return file_name
 
 
-def write_runner_ups_to_csv(calendar, suffix, write_path, runtime):
+def write_runner_ups_to_csv(calendar, suffix, write_path, runtime, backend="json", config=None):
     """
     Writes runner-up data to a CSV file for Captains.
     Runner-ups are firefighters whose picks were denied, listed in order of denial (seniority).
@@ -479,7 +552,16 @@ def write_runner_ups_to_csv(calendar, suffix, write_path, runtime):
         suffix: Suffix for the filename (e.g., shift name)
         write_path: Directory to write the file to
         runtime: Timestamp string for the filename
+        backend: "json" writes the CSV file, "sqlite" stores the runner-ups in the output folder's store
+        config: RunConfig for displaying dates and increments (defaults to each day's config)
     """
+    _check_backend(backend)
+    if backend == "sqlite":
+        with RunStore(store_path(write_path)) as store:
+            count = store.write_increments(runtime, suffix, calendar, kind="runner_up")
+        logger.info(f"Runner-ups stored for run {runtime} ({count} runner-ups)")
+        return store_path(write_path)
+
     file_name = f'{write_path}/{runtime}-runner-ups-{suffix}.csv'
 
     try:
@@ -498,6 +580,7 @@ def write_runner_ups_to_csv(calendar, suffix, write_path, runtime):
 
             for date in sorted_dates:
                 day = calendar[date]
+                day_config = config or day.config
 
                 # Check each increment for runner-ups
                 for inc_index, increment in day.increments.items():
@@ -510,7 +593,7 @@ def write_runner_ups_to_csv(calendar, suffix, write_path, runtime):
                             position = runner_up['position']
 
                             # Format the date display for this increment
-                            date_display = pick.format_date_display()
+                            date_display = pick.format_date_display(day_config)
 
                             writer.writerow([
                                 date_display,
@@ -520,7 +603,7 @@ def write_runner_ups_to_csv(calendar, suffix, write_path, runtime):
                                 ffighter.idnum,
                                 ffighter.rank,
                                 pick.type,
-                                pick.increments_plain_text(),
+                                pick.increments_plain_text(config=day_config),
                                 reason
                             ])
                             runner_up_count += 1
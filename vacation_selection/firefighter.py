@@ -1,22 +1,119 @@
 # firefighter.py
-from datetime import datetime
+from datetime import date as _date, datetime
+import math
 import random
 
+from vacation_selection.config import active_config
+from vacation_selection.dates import parse_date
+from vacation_selection.pick_table import NO_MASK, NO_PLACE, PickTable, assign, default_table
 import vacation_selection.setup_logging as setup_logging
-logger = setup_logging.setup_logging("classes.log")
+logger = setup_logging.get_logger("classes.log")
+
+def _month_day(day):
+    """Same as day.strftime('%m/%d'), without the strftime overhead (called for every pick written)."""
+    return f"{day.month:02d}/{day.day:02d}"
+
 
 class Pick:
-    def __init__(self, date, type="Untyped", determination="Unaddressed", increments='AMPM', reason=None, place=None, source=None):
+    """
+    A pick request.  The fields are stored in a PickTable (see pick_table.py); a Pick is
+    a view of its row, so it only holds the table and the row number.
+    """
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, date, type="Untyped", determination="Unaddressed", increments='AMPM', reason=None, place=None, source=None, table=None):
         from vacation_selection.increment import Increment
 
-        self.date = date
-        self.type = type
-        self.determination = determination
-        self.reason = reason
-        self.increments = Increment.process_increments(increments)  # Requested increments
-        self.approved_increments = None  # Will be set when pick is approved (can differ from requested)
-        self.place = place
-        self.source = source
+        self._table = table if table is not None else default_table()
+        # Requested increments are stored as a bitmask; approved increments are set when the
+        # pick is approved (they can differ from the requested ones)
+        self._row = self._table.append(date, type, determination, Increment.process_increments(increments),
+                                       reason=reason, place=place, source=source)
+
+    def __reduce__(self):
+        # Pickled with its table (once per pickle, however many of its picks are in it)
+        return (_pick_at, (self._table, self._row))
+
+    @property
+    def row(self):
+        return self._row
+
+    @property
+    def table(self):
+        return self._table
+
+    @property
+    def ffighter(self):
+        """The firefighter the pick was assigned to (see pick_table.assign), or None."""
+        return self._table.ffighter_at(self._table.ffighter[self._row])
+
+    @property
+    def date(self):
+        return _date.fromordinal(self._table.date[self._row])
+
+    @date.setter
+    def date(self, value):
+        self._table.date[self._row] = value.toordinal()
+
+    @property
+    def type(self):
+        return self._table.types.decode(self._table.type[self._row])
+
+    @type.setter
+    def type(self, value):
+        self._table.type[self._row] = self._table.types.code(value)
+
+    @property
+    def determination(self):
+        return self._table.determinations.decode(self._table.determination[self._row])
+
+    @determination.setter
+    def determination(self, value):
+        self._table.determination[self._row] = self._table.determinations.code(value)
+
+    @property
+    def reason(self):
+        return self._table.reasons.decode(self._table.reason[self._row])
+
+    @reason.setter
+    def reason(self, value):
+        self._table.reason[self._row] = self._table.reasons.code(value)
+
+    @property
+    def increments(self):
+        """Requested increments (bitmask)."""
+        return self._table.requested[self._row]
+
+    @increments.setter
+    def increments(self, value):
+        self._table.requested[self._row] = value
+
+    @property
+    def approved_increments(self):
+        """Approved increments (bitmask), or None until the pick is approved."""
+        mask = self._table.approved[self._row]
+        return None if mask == NO_MASK else mask
+
+    @approved_increments.setter
+    def approved_increments(self, value):
+        self._table.approved[self._row] = NO_MASK if value is None else value
+
+    @property
+    def place(self):
+        place = self._table.place[self._row]
+        return None if place == NO_PLACE else place
+
+    @place.setter
+    def place(self, value):
+        self._table.place[self._row] = NO_PLACE if value is None else value
+
+    @property
+    def source(self):
+        return self._table.sources.decode(self._table.source[self._row])
+
+    @source.setter
+    def source(self, value):
+        self._table.source[self._row] = self._table.sources.code(value)
 
     def get_increments(self):
         """Returns requested increments."""
@@ -26,13 +123,14 @@ class Pick:
         """Returns approved increments (or requested if not yet set)."""
         return self.approved_increments if self.approved_increments is not None else self.increments
 
-    def increments_plain_text(self, increment=None):
+    def increments_plain_text(self, increment=None, config=None):
         """
-        Convert increment list back to plain text representation.
+        Convert an increment mask back to plain text representation.
         Uses the static method from Increment class.
 
         Args:
-            increment: Optional increment list. If None, uses self.increments
+            increment: Optional increment mask. If None, uses self.increments
+            config: Optional RunConfig. If None, uses the active config
 
         Returns:
             String representation of the increment selection
@@ -42,69 +140,66 @@ class Pick:
         if increment is None:
             increment = self.increments
 
-        return Increment.increments_to_plain_text(increment)
+        return Increment.increments_to_plain_text(increment, config.increment_names if config else None)
 
-    def format_date_display(self):
+    def format_date_display(self, config=None):
         """
         Format the date for display based on approved increments.
         - Full shift (all increments): Shows date range (e.g., "10/2 - 10/3")
         - Single increment: Shows single date (e.g., "10/2" or "10/3")
         - Multiple non-consecutive increments: Shows combined dates
+        Uses the given RunConfig, or the active config.
         """
-        from vacation_selection.increment import Increment
         from datetime import timedelta
 
+        config = config or active_config()
+        day = self.date
         # Use approved increments if available, otherwise use requested
         increments = self.get_approved_increments()
 
         # Check if this is after the transition date and using 48-hour shifts
-        if (Increment.shift_duration_hours == 48 and
-            hasattr(Increment, 'transition_date') and
-            self.date >= Increment.transition_date):
+        if config.spans_two_days(day):
+            tables = config.tables
 
             # Check if all increments are selected (full shift)
-            if all(v == 1 for v in increments):
+            if increments == tables.full:
                 # Full 48-hour shift - show date range
-                end_date = self.date + timedelta(days=1)
-                return f"{self.date.strftime('%m/%d')} - {end_date.strftime('%m/%d')}"
+                end_date = day + timedelta(days=1)
+                return f"{_month_day(day)} - {_month_day(end_date)}"
 
             # Single or partial increment
-            num_increments = sum(increments)
-            if num_increments == 1:
+            selected = tables.bits[increments]
+            if len(selected) == 1:
                 # Find which increment is selected
-                increment_index = increments.index(1)
+                increment_index = selected[0]
                 if increment_index == 0:
                     # First increment (day_1)
-                    return self.date.strftime('%m/%d')
+                    return _month_day(day)
                 else:
                     # Second or later increment (day_2, etc.)
-                    offset_date = self.date + timedelta(days=increment_index)
-                    return offset_date.strftime('%m/%d')
+                    offset_date = day + timedelta(days=increment_index)
+                    return _month_day(offset_date)
             else:
                 # Multiple non-consecutive increments - show combined
-                dates = []
-                for i, v in enumerate(increments):
-                    if v == 1:
-                        offset_date = self.date + timedelta(days=i)
-                        dates.append(offset_date.strftime('%m/%d'))
-                return " + ".join(dates)
+                return " + ".join(_month_day(day + timedelta(days=i)) for i in selected)
         else:
             # 24-hour shift or before transition - show single date
-            return self.date.strftime('%m/%d')
+            return _month_day(day)
     
     # Json Read/Write
-    def to_dict(self):
-        """Converts the Pick object to a dictionary."""
+    def to_dict(self, config=None):
+        """Converts the Pick object to a dictionary (increments per the given or active RunConfig)."""
+        config = config or active_config()
         # For approved picks, show what was actually approved
         # For denied/unaddressed picks, show what was requested
         if self.determination == "Approved" and self.approved_increments is not None:
-            increments_text = self.increments_plain_text(self.approved_increments)
+            increments_text = self.increments_plain_text(self.approved_increments, config)
         else:
-            increments_text = self.increments_plain_text(self.increments)
+            increments_text = self.increments_plain_text(self.increments, config)
 
         return {
-            'date': self.date.strftime('%Y-%m-%d'),
-            'date_display': self.format_date_display(),  # Formatted date for display
+            'date': self.date.isoformat(),
+            'date_display': self.format_date_display(config),  # Formatted date for display
             'type': self.type,
             'determination': self.determination,
             'reason': self.reason,
@@ -114,10 +209,10 @@ class Pick:
         }
 
     @classmethod
-    def from_dict(cls, pick_dict):
-        """Creates a Pick object from a dictionary."""
-        date = datetime.strptime(pick_dict['date'], '%Y-%m-%d').date()  # Ensure date is converted properly
-        increments = pick_dict.get('increments', [1, 1])  # Default to full day
+    def from_dict(cls, pick_dict, table=None):
+        """Creates a Pick object from a dictionary (as a row of `table`, if given)."""
+        date = parse_date(pick_dict['date'])  # Ensure date is converted properly
+        increments = pick_dict.get('increments', "FULL")  # Default to full day
 
         pick = cls(
             date=date,
@@ -125,7 +220,8 @@ class Pick:
             determination=pick_dict.get('determination', "Unaddressed"),
             increments=increments,
             place=pick_dict.get('place'),  # Restores the order position
-            source=pick_dict.get('source')
+            source=pick_dict.get('source'),
+            table=table
         )
         pick.reason = pick_dict.get('reason')
         return pick
@@ -138,7 +234,55 @@ class Pick:
             ret += f' ({self.reason})'
         return ret
 
+
+def shifts_to_units(shifts, units_per_shift):
+    """Whole increment units within `shifts` (a cap of 10.4 shifts allows 20 half-shifts)."""
+    return math.floor(shifts * units_per_shift + 1e-9)
+
+
+def units_to_shifts(units, units_per_shift):
+    return units / units_per_shift
+
+
+def _balance(units_attr):
+    """A balance held in integer increment units, read and written in shifts."""
+    def get(self):
+        return units_to_shifts(getattr(self, units_attr), self.units_per_shift)
+
+    def set(self, shifts):
+        setattr(self, units_attr, round(shifts * self.units_per_shift))
+    return property(get, set)
+
+
+def _cap(shifts_attr, units_attr):
+    """A cap that keeps the value it was given in shifts, plus its whole increment units for comparisons."""
+    def get(self):
+        return getattr(self, shifts_attr)
+
+    def set(self, shifts):
+        setattr(self, shifts_attr, shifts)
+        setattr(self, units_attr, shifts_to_units(shifts, self.units_per_shift))
+    return property(get, set)
+
+
+def _pick_at(table, row):
+    """The Pick viewing an existing row of table."""
+    pick = Pick.__new__(Pick)
+    pick._table, pick._row = table, row
+    return pick
+
+
 class FFighter:
+    # Balances and caps are compared in integer increment units (*_units); the *_shifts
+    # attributes convert to and from shifts for display, JSON and the HR checks, using the
+    # units_per_shift of the config the firefighter was created under.
+    max_shifts_off = _cap("_max_shifts_off", "max_units")
+    awarded_vacation_shifts = _cap("_awarded_vacation_shifts", "awarded_vacation_units")
+    awarded_holiday_shifts = _cap("_awarded_holiday_shifts", "awarded_holiday_units")
+    used_vacation_shifts = _balance("used_vacation_units")
+    used_holiday_shifts = _balance("used_holiday_units")
+    approved_shifts_count = _balance("approved_units")
+
     def __init__(self, idnum, fname, lname, hireDate, rank, shift, picks):
         self.fname = fname
         self.lname = lname
@@ -152,6 +296,9 @@ class FFighter:
         self.processed = []
         self.picks = picks
         self.exclusions = []
+        assign(picks, self)
+        # Fixed here, so balances read the same inside and outside of a run's config
+        self.units_per_shift = active_config().units_per_shift
 
         # Calculate max shifts off and unpack the dictionary
         shifts_off_data = self.calculate_max_shifts_off()
@@ -159,11 +306,17 @@ class FFighter:
         self.awarded_vacation_shifts = shifts_off_data['total_vacation_shifts']
         self.max_shifts_off = shifts_off_data['max_shifts_off']
 
-        self.used_vacation_shifts = 0
-        self.used_holiday_shifts = 0
-        self.approved_shifts_count = 0
+        self.used_vacation_units = 0
+        self.used_holiday_units = 0
+        self.approved_units = 0
         self.current_pick = None  # A holding place for the pick being processed
 
+    def __setstate__(self, state):
+        # Unpickled tables do not keep owners, so record them again
+        self.__dict__.update(state)
+        assign(self.picks, self)
+        assign(self.processed, self)
+
     def process_next_pick(self):
         """Move the next pick from the queue to the holding spot for approval or denial."""
         if self.picks:
@@ -184,17 +337,17 @@ class FFighter:
                 self.current_pick.reason = reason
 
             # Use approved_increments (which may differ from requested for partial grants)
-            approved_increments = self.current_pick.get_approved_increments()
-            approved_hours = sum(approved_increments) * (1 / len(approved_increments))
+            from vacation_selection.increment import Increment
+            approved_units = Increment.tables().counts[self.current_pick.get_approved_increments()]
 
-            if self.used_vacation_shifts + approved_hours <= self.awarded_vacation_shifts:
-                self.used_vacation_shifts += approved_hours
+            if self.used_vacation_units + approved_units <= self.awarded_vacation_units:
+                self.used_vacation_units += approved_units
                 self.current_pick.type = "Vacation"
             else:
-                self.used_holiday_shifts += approved_hours
+                self.used_holiday_units += approved_units
                 self.current_pick.type = "Holiday"
             self.processed.append(self.current_pick)
-            self.approved_shifts_count += approved_hours
+            self.approved_units += approved_units
             self.current_pick = None
 
     def deny_current_pick(self, reason):
@@ -239,8 +392,10 @@ class FFighter:
     
     # Json Read/Write
     @classmethod
-    def from_dict(cls, ff_dict):
-        hire_date = datetime.strptime(ff_dict['hireDate'], '%Y-%m-%d').date()
+    def from_dict(cls, ff_dict, table=None):
+        """Creates an FFighter from a dictionary; its picks become rows of `table` (a new PickTable by default)."""
+        table = table if table is not None else PickTable()
+        hire_date = parse_date(ff_dict['hireDate'])
         ff = cls(
             idnum=ff_dict.get('idnum', 0),
             fname=ff_dict.get('fname', ''),
@@ -248,7 +403,7 @@ class FFighter:
             hireDate=hire_date,
             rank=ff_dict.get('rank', ''),
             shift=ff_dict.get('shift', ''),
-            picks=[Pick.from_dict(pick) for pick in ff_dict.get('picks', [])]
+            picks=[Pick.from_dict(pick, table) for pick in ff_dict.get('picks', [])]
         )
         ff.exclusions = ff_dict.get('exclusions', [])  # Load exclusions
         ff.max_shifts_off = ff_dict.get('max_shifts_off', 0)
@@ -257,7 +412,8 @@ class FFighter:
         ff.used_vacation_shifts = ff_dict.get('used_vacation_shifts', 0)
         ff.used_holiday_shifts = ff_dict.get('used_holiday_shifts', 0)
         ff.approved_shifts_count = ff_dict.get('approved_shifts_count', 0)
-        ff.processed = [Pick.from_dict(proc) for proc in ff_dict.get('processed', [])]
+        ff.processed = [Pick.from_dict(proc, table) for proc in ff_dict.get('processed', [])]
+        assign(ff.processed, ff)
         ff.hr_validations = ff_dict.get('hr_validations', {})
         return ff
 
@@ -271,7 +427,7 @@ class FFighter:
             'name': self.name,
             'rank': self.rank,
             'shift': self.shift,
-            'hireDate': self.hireDate.strftime('%Y-%m-%d'),
+            'hireDate': self.hireDate.isoformat(),
             'max_shifts_off': self.max_shifts_off,
             'awarded_vacation_shifts': self.awarded_vacation_shifts,
             'awarded_holiday_shifts': self.awarded_holiday_shifts,
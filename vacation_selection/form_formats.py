@@ -0,0 +1,196 @@
+# form_formats.py
+# Registry of the Google Form layouts we accept as pick files.
+# Each year's form is declared as data (a FormFormat) and compiled against a file's
+# header row once, so rows can be read by index with a plain csv.reader.
+
+# Registered formats, keyed by year
+form_formats = {}
+
+
+class FormFormat:
+    """
+    Declares the columns of one pick-file layout.
+
+    Args:
+        year: Key used to select this format (the `file_format` passed to read_firefighter_data)
+        fields: Maps FFighter fields (fname, lname, rank, idnum, hire_date, shift) to column names
+        pick_columns: List of (day column, type column or None, increments column or None)
+        default_type: Pick type used when a type column is missing
+        default_increments: Increment selection used when an increments column is missing
+        skip_column: Optional column that can opt a member out of the selection
+        skip_values: Values of skip_column that mean "submit a blank request form"
+    """
+    required_fields = ("fname", "lname", "rank", "idnum", "hire_date", "shift")
+
+    def __init__(self, year, fields, pick_columns, default_type="Untyped", default_increments="AMPM",
+                 skip_column=None, skip_values=()):
+        missing = [field for field in self.required_fields if field not in fields]
+        if missing:
+            raise ValueError(f"Form format {year} does not declare columns for: {missing}")
+        self.year = year
+        self.fields = dict(fields)
+        self.pick_columns = list(pick_columns)
+        self.default_type = default_type
+        self.default_increments = default_increments
+        self.skip_column = skip_column
+        self.skip_values = set(skip_values)
+
+    @classmethod
+    def from_dict(cls, format_dict):
+        """Builds a format from plain data (e.g. loaded from JSON)."""
+        pick_columns = format_dict.get("pick_columns")
+        if pick_columns is None:
+            pick_columns = numbered_pick_columns(**format_dict["numbered_pick_columns"])
+        return cls(
+            year=format_dict["year"],
+            fields=format_dict["fields"],
+            pick_columns=[tuple(columns) for columns in pick_columns],
+            default_type=format_dict.get("default_type", "Untyped"),
+            default_increments=format_dict.get("default_increments", "AMPM"),
+            skip_column=format_dict.get("skip_column"),
+            skip_values=format_dict.get("skip_values", ()),
+        )
+
+    def compile(self, headers):
+        """
+        Validates the header row and precompiles header-to-index maps.
+        Raises ValueError listing any missing required columns.
+        """
+        index = {}
+        for position, header in enumerate(headers):
+            index.setdefault(header, position)
+
+        missing = [column for column in self.fields.values() if column not in index]
+        if missing:
+            raise ValueError(f"File is missing required columns for the {self.year} format: {missing}")
+
+        return CompiledFormFormat(self, index)
+
+
+class CompiledFormFormat:
+    """A FormFormat bound to one file's header row.  Holds column indexes only."""
+
+    def __init__(self, form_format, index):
+        self.form_format = form_format
+        self.field_index = {field: index[column] for field, column in form_format.fields.items()}
+
+        # Only keep pick columns whose day column is actually present in this file
+        self.pick_index = [
+            (day_column,
+             index[day_column],
+             index.get(type_column) if type_column else None,
+             index.get(increments_column) if increments_column else None)
+            for day_column, type_column, increments_column in form_format.pick_columns
+            if day_column in index
+        ]
+        self.skip_index = index.get(form_format.skip_column) if form_format.skip_column else None
+
+    def field(self, row, name):
+        """Returns the raw value of a declared field for a csv.reader row."""
+        position = self.field_index[name]
+        if position >= len(row):
+            raise KeyError(self.form_format.fields[name])
+        return row[position]
+
+    def field_values(self, rows, name):
+        """The raw values of a declared field over many rows (rows too short for it are skipped)."""
+        position = self.field_index[name]
+        return [row[position] for row in rows if position < len(row)]
+
+    def pick_day_values(self, rows):
+        """The raw values of every pick day column over many rows."""
+        return [row[day_position] for row in rows
+                for _, day_position, _, _ in self.pick_index if day_position < len(row)]
+
+    def skips_selection(self, row):
+        """True if the member asked to submit a blank request form."""
+        if self.skip_index is None or self.skip_index >= len(row):
+            return False
+        return row[self.skip_index].strip() in self.form_format.skip_values
+
+    def pick_cells(self, row):
+        """
+        Yields (day column, day value, type, increments) for every filled-in pick on the row.
+        Missing type/increments columns fall back to the format defaults.
+        """
+        row_length = len(row)
+        default_type = self.form_format.default_type
+        default_increments = self.form_format.default_increments
+        for day_column, day_position, type_position, increments_position in self.pick_index:
+            if day_position >= row_length or not row[day_position]:
+                continue
+            pick_type = row[type_position] if type_position is not None and type_position < row_length else default_type
+            increments = (row[increments_position]
+                          if increments_position is not None and increments_position < row_length
+                          else default_increments)
+            yield day_column, row[day_position], pick_type, increments
+
+
+def numbered_pick_columns(first, last, day="Day {n}", type=None, increments=None, overrides=None):
+    """
+    Builds pick_columns for forms that number their pick columns ("Day 1", "Day 2", ...).
+    `overrides` maps a number to its own (day, type, increments) tuple for odd headers.
+    """
+    overrides = overrides or {}
+    columns = []
+    for n in range(first, last + 1):
+        if n in overrides or str(n) in overrides:
+            columns.append(tuple(overrides.get(n, overrides.get(str(n)))))
+            continue
+        columns.append((
+            day.format(n=n),
+            type.format(n=n) if type else None,
+            increments.format(n=n) if increments else None,
+        ))
+    return columns
+
+
+def register_form_format(form_format):
+    """Adds (or replaces) a format in the registry."""
+    form_formats[form_format.year] = form_format
+    return form_format
+
+
+def get_form_format(year):
+    """Returns the registered format for a year, or raises ValueError."""
+    try:
+        return form_formats[year]
+    except KeyError:
+        raise ValueError("Unsupported file format year.")
+
+
+# ================================================================================
+# Registered Formats
+# ================================================================================
+
+# 2024 Form: 17 picks, each with a leave type. The first type column is named " Type".
+register_form_format(FormFormat(
+    year=2024,
+    fields={
+        "fname": "First Name",
+        "lname": "Last Name",
+        "rank": "Rank",
+        "idnum": "Employee ID #",
+        "hire_date": "Employee Start Date",
+        "shift": "Shift",
+    },
+    pick_columns=numbered_pick_columns(1, 17, type="Type {n}", overrides={1: ("Day 1", " Type", None)}),
+    default_type="Unaddressed",
+))
+
+# 2025 Form: 40 picks, each with a shift (increment) selection, and an opt-out acknowledgment.
+register_form_format(FormFormat(
+    year=2025,
+    fields={
+        "fname": "First Name",
+        "lname": "Last Name",
+        "rank": "Rank",
+        "idnum": "Employee ID #",
+        "hire_date": "Employee Hire Date",
+        "shift": "Shift",
+    },
+    pick_columns=numbered_pick_columns(1, 40, increments="Shift Selection {n}"),
+    default_increments="AMPM",
+    skip_column="Acknowledgment of Form Completion",
+    skip_values=("I would prefer to skip the selection, and submit a blank request form.",),
+))
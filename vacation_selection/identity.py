@@ -0,0 +1,263 @@
+# identity.py
+# One identity-resolution index shared by HR validation and the Telestaff import tools.
+#
+# Names are parsed and normalized once when a record is added.  IDs and exact names resolve
+# with dictionary lookups; only the rest are fuzzy scored, and those results are memoized.
+# An index built for an HR file can be saved next to the run outputs and is reused by
+# later runs as long as the HR file's contents are unchanged.
+import json
+import os
+
+import vacation_selection.setup_logging as setup_logging
+from vacation_selection.catalog import file_hash
+
+logger = setup_logging.get_logger("identity")
+
+IDENTITY_CACHE_VERSION = 1
+DEFAULT_THRESHOLD = 80
+
+
+def parse_name(name_str):
+    """
+    Parses a string into (first, middle, last).
+    Supports the format "LastName, FirstName MiddleName"
+    or simple fallbacks like "First Last" if no comma.
+    Returns (first, middle, last) as strings (may be empty if missing).
+    """
+    name_str = (name_str or "").strip()
+    if not name_str:
+        return "", "", ""
+
+    if ',' in name_str:
+        # e.g. "Obiedo, Salvador Gabriel"
+        last_part, first_part = name_str.split(',', 1)
+        last_part = last_part.strip()
+        parts = first_part.strip().split()
+        if not parts:
+            return "", "", last_part
+        return parts[0], " ".join(parts[1:]), last_part
+    else:
+        # Fallback: assume "First Middle Last" or "First Last"
+        parts = name_str.split()
+        if len(parts) == 1:
+            return parts[0], "", ""
+        return parts[0], " ".join(parts[1:-1]), parts[-1]
+
+
+def normalize_text(text):
+    """Strips whitespace and uppercases; non-strings (None, NaN) become ""."""
+    return text.strip().upper() if isinstance(text, str) else ""
+
+
+def normalize_id(idnum):
+    """"1234", 1234 and 1234.0 all become "1234"; missing or zero IDs become ""."""
+    if idnum is None or idnum != idnum:  # None or NaN
+        return ""
+    idnum = str(idnum).strip()
+    if idnum.endswith(".0"):
+        idnum = idnum[:-2]
+    return "" if idnum == "0" else idnum
+
+
+def token_sort_score(first, middle, last, other):
+    """fuzz.token_sort_ratio of "FIRST LAST" against another entry's."""
+    from fuzzywuzzy import fuzz  # Imported on first fuzzy comparison; most lookups hit the ID or exact name
+    return fuzz.token_sort_ratio(f"{first} {last}", f"{other[0]} {other[2]}")
+
+
+def top_2_score(first, middle, last, other):
+    """
+    Average of the two best fuzz.ratio scores between the "FIRST LAST" and
+    "FIRST MIDDLE LAST" forms of both names.
+    """
+    from fuzzywuzzy import fuzz
+    combos = [f"{first} {last}".strip(), f"{first} {middle} {last}".strip()]
+    other_combos = [f"{other[0]} {other[2]}".strip(), f"{other[0]} {other[1]} {other[2]}".strip()]
+    scores = sorted((fuzz.ratio(a, b) for a in combos for b in other_combos if a and b), reverse=True)
+    if not scores:
+        return 0
+    if len(scores) == 1:
+        return scores[0]
+    return (scores[0] + scores[1]) / 2.0
+
+
+SCORERS = {"token_sort": token_sort_score, "top_2": top_2_score}
+
+
+class IdentityMatch:
+    """Result of a resolution: the matched entry's position, how it matched and the score."""
+    __slots__ = ("position", "method", "score")
+
+    def __init__(self, position, method, score=100):
+        self.position = position
+        self.method = method  # "id", "name" or "fuzzy"
+        self.score = score
+
+    def __repr__(self):
+        return f"IdentityMatch({self.position}, {self.method!r}, {self.score})"
+
+
+class IdentityIndex:
+    """
+    Index of people by ID and normalized name, optionally partitioned by a group (e.g. shift).
+
+    resolve() tries, in order: the ID, the exact "FIRST LAST" name, then the best fuzzy score
+    >= threshold within the group (the first entry wins ties).  Positions are the order in
+    which entries were added, so they index the caller's record list.
+
+    Args:
+        scorer: "token_sort" (fuzz.token_sort_ratio on "FIRST LAST") or "top_2"
+                (average of the two best fuzz.ratio scores, using middle names)
+        threshold: Minimum fuzzy score
+    """
+
+    def __init__(self, scorer="token_sort", threshold=DEFAULT_THRESHOLD):
+        self.scorer = scorer
+        self.threshold = threshold
+        self.names = []     # (FIRST, MIDDLE, LAST) per position
+        self.ids = []       # Normalized ID per position
+        self.groups = []    # Normalized group per position
+        self.by_id = {}     # (group, id) -> first position with that ID
+        self.by_name = {}   # (group, "FIRST LAST") -> first position with that name
+        self.by_group = {}  # group -> positions
+        self.resolved = {}  # Memoized fuzzy results: "group|FIRST|MIDDLE|LAST" -> [position, score]
+        self.source_hash = None
+        self.cache_path = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, idnum=None, first="", last="", middle="", group=None):
+        """Adds an entry and returns its position."""
+        position = len(self.names)
+        name = (normalize_text(first), normalize_text(middle), normalize_text(last))
+        group = normalize_text(group)
+        idnum = normalize_id(idnum)
+        self.names.append(name)
+        self.ids.append(idnum)
+        self.groups.append(group)
+        self._index(position)
+        self.resolved.clear()  # A new entry can beat a memoized fuzzy result
+        return position
+
+    def _index(self, position):
+        first, _, last = self.names[position]
+        group = self.groups[position]
+        if self.ids[position]:
+            self.by_id.setdefault((group, self.ids[position]), position)
+        self.by_name.setdefault((group, f"{first} {last}"), position)
+        self.by_group.setdefault(group, []).append(position)
+
+    # ----- Resolution -----
+    def resolve(self, idnum=None, first="", last="", middle="", group=None, label=None):
+        """Returns an IdentityMatch, or None if nothing matched."""
+        first, middle, last = normalize_text(first), normalize_text(middle), normalize_text(last)
+        group = normalize_text(group)
+        label = label or f"{first} {last}"
+
+        idnum = normalize_id(idnum)
+        if idnum and (group, idnum) in self.by_id:
+            logger.debug(f"ID match found for ID {idnum}" + (f" in group {group}" if group else ""))
+            return IdentityMatch(self.by_id[(group, idnum)], "id")
+
+        position = self.by_name.get((group, f"{first} {last}"))
+        if position is not None:
+            logger.debug(f"Exact name match found: {label}")
+            return IdentityMatch(position, "name")
+
+        key = f"{group}|{first}|{middle}|{last}"
+        if key not in self.resolved:
+            self.resolved[key] = self._best_fuzzy(first, middle, last, group)
+        position, score = self.resolved[key]
+        if position is not None and score >= self.threshold:
+            matched = self.names[position]
+            logger.info(f"Fuzzy match for {label} -> {matched[0]} {matched[2]} (Score: {score})")
+            return IdentityMatch(position, "fuzzy", score)
+        logger.warning(f"No acceptable fuzzy match for {label} (Best Score: {score})")
+        return None
+
+    def _best_fuzzy(self, first, middle, last, group):
+        scorer = SCORERS[self.scorer]
+        best_position, best_score = None, 0
+        for position in self.by_group.get(group, []):
+            score = scorer(first, middle, last, self.names[position])
+            if score > best_score:
+                best_position, best_score = position, score
+        return [best_position, best_score]
+
+    def resolve_many(self, queries):
+        """
+        Resolves a list of dicts with any of idnum, first, middle, last, group, label.
+        Returns one IdentityMatch or None per query, and saves new fuzzy results if the index is cached.
+        """
+        before = len(self.resolved)
+        matches = [self.resolve(**query) for query in queries]
+        unmatched = sum(match is None for match in matches)
+        logger.info(f"Resolved {len(matches) - unmatched} of {len(matches)} identities ({unmatched} unmatched)")
+        if self.cache_path and len(self.resolved) != before:
+            self.save(self.cache_path)
+        return matches
+
+    # ----- HR files -----
+    @classmethod
+    def from_hr_records(cls, hr_records, scorer="token_sort", threshold=DEFAULT_THRESHOLD):
+        """Index of HR rows ({"Employee Number", "Employee Name": "Last, First Middle", ...})."""
+        index = cls(scorer, threshold)
+        for record in hr_records:
+            first, middle, last = parse_name(str(record.get("Employee Name") or ""))
+            index.add(record.get("Employee Number"), first, last, middle)
+        return index
+
+    @classmethod
+    def for_hr_file(cls, hr_path, hr_records, cache_dir=".//output", scorer="token_sort",
+                    threshold=DEFAULT_THRESHOLD):
+        """
+        Index of an HR file's rows, loaded from cache_dir if the file was indexed before with
+        the same contents and scorer, otherwise built and saved there.
+        """
+        if not hr_path or not os.path.exists(hr_path):
+            return cls.from_hr_records(hr_records, scorer, threshold)
+        source_hash = file_hash(hr_path)
+        cache_path = os.path.join(cache_dir, f"identity-{source_hash[:16]}-{scorer}.json")
+        index = cls.load(cache_path, source_hash, threshold) if os.path.exists(cache_path) else None
+        if index is None or len(index) != len(hr_records):
+            index = cls.from_hr_records(hr_records, scorer, threshold)
+            index.source_hash = source_hash
+            index.save(cache_path)
+        index.cache_path = cache_path
+        return index
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "version": IDENTITY_CACHE_VERSION,
+                "source_hash": self.source_hash,
+                "scorer": self.scorer,
+                "names": self.names,
+                "ids": self.ids,
+                "groups": self.groups,
+                "resolved": self.resolved,
+            }, f)
+
+    @classmethod
+    def load(cls, path, source_hash=None, threshold=DEFAULT_THRESHOLD):
+        """Loads a saved index, or returns None if it is stale or unreadable."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring identity cache {path}: {e}")
+            return None
+        if data.get("version") != IDENTITY_CACHE_VERSION or (source_hash and data.get("source_hash") != source_hash):
+            return None
+        index = cls(data["scorer"], threshold)
+        index.source_hash = data["source_hash"]
+        index.names = [tuple(name) for name in data["names"]]
+        index.ids = data["ids"]
+        index.groups = data["groups"]
+        for position in range(len(index.names)):
+            index._index(position)
+        index.resolved = data["resolved"]
+        logger.debug(f"Loaded identity index for {len(index)} records from {path}")
+        return index
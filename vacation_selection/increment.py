@@ -1,12 +1,16 @@
 # increment.py
-from vacation_selection.setup_logging import setup_logging
-logger = setup_logging('Increment')
+from vacation_selection.setup_logging import get_logger
+logger = get_logger('Increment')
 from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from vacation_selection.config import active_config
 
 # Increment Class
 # ================================================================================================
 class Increment:
-    # Class-level configurations for increment structure
+    # Class-level defaults for runs that are not given a RunConfig (see config.py).
+    # A run reads its settings from its RunConfig, never from these attributes.
     # Configuration: Define increment names for the shift structure
     # For 24-hour shifts (1x24hr): ["FULL"]
     # For 24-hour shifts (2x12hr): ["AM", "PM"]
@@ -25,10 +29,11 @@ class Increment:
 
     @classmethod
     def is_single_increment(cls):
-        """Returns True if only one increment is configured."""
-        return len(cls.increment_names) == 1
+        """Returns True if only one increment is configured (in the active config)."""
+        return active_config().is_single_increment()
 
-    def __init__(self, date, name, only_increment=False ):
+    def __init__(self, date, name, only_increment=False, config=None):
+        self.config = config if config is not None else active_config()
         self.date = date
         self.is_holiday = check_holiday(date)
         self.name = name
@@ -51,9 +56,7 @@ class Increment:
         For 24-hour shifts, shows single date.
         """
         # Check if this is after the transition date and using 48-hour shifts
-        if (Increment.shift_duration_hours == 48 and
-            hasattr(Increment, 'transition_date') and
-            self.date >= Increment.transition_date):
+        if self.config.spans_two_days(self.date):
             # Calculate end date (48 hours = 2 days)
             end_date = self.date + timedelta(days=1)
 
@@ -69,23 +72,24 @@ class Increment:
     def write_to_row(self, writer):
         """Write the increment details to the CSV row."""
         date_display = self.format_date_display()
+        max_ffighters = self.config.max_total_ffighters_allowed
 
         # Prepare the list of firefighters with increment details
         if self.only_increment:
             # Include only the firefighter names with increments_plain_text()
-            all_ffighters = [f"{ff.name} - {ff.idnum} ({pick.increments_plain_text()})" for ff, pick in zip(self.ffighters, self.picks)]
-            row = [date_display] + (all_ffighters + [""] * self.max_total_ffighters_allowed)[:self.max_total_ffighters_allowed]
+            all_ffighters = [f"{ff.name} - {ff.idnum} ({pick.increments_plain_text(config=self.config)})" for ff, pick in zip(self.ffighters, self.picks)]
+            row = [date_display] + (all_ffighters + [""] * max_ffighters)[:max_ffighters]
         else:
             # Include firefighter names with increment names
-            all_ffighters = [f"{ff.name} ({pick.increments_plain_text()})" for ff, pick in zip(self.ffighters, self.picks)]
-            row = [f"{date_display} ({self.name})"] + (all_ffighters + [""] * self.max_total_ffighters_allowed)[:self.max_total_ffighters_allowed]
+            all_ffighters = [f"{ff.name} ({pick.increments_plain_text(config=self.config)})" for ff, pick in zip(self.ffighters, self.picks)]
+            row = [f"{date_display} ({self.name})"] + (all_ffighters + [""] * max_ffighters)[:max_ffighters]
 
         writer.writerow(row)
 
 
 
     def is_full(self):
-        isfull = len(self.ffighters) >= Increment.max_total_ffighters_allowed
+        isfull = len(self.ffighters) >= self.config.max_total_ffighters_allowed
         if isfull:
             self.denial_reason = "Day already has maximum firefighters off"
         return isfull
@@ -100,8 +104,8 @@ class Increment:
         num_battalion_chiefs = self.rank_counts['Battalion Chief']
 
         # Calculate maximums
-        max_firefighters_off = self.max_total_ffighters_allowed  # No dependencies
-        max_apparatus_specialists_off = self.max_total_ffighters_allowed  # No dependencies
+        max_firefighters_off = self.config.max_total_ffighters_allowed  # No dependencies
+        max_apparatus_specialists_off = self.config.max_total_ffighters_allowed  # No dependencies
         max_lieutenants_off = 5 - num_captains
         max_captains_off = 3 - num_battalion_chiefs
         max_battalion_chiefs_off = min(2, 3 - num_captains)
@@ -177,96 +181,122 @@ class Increment:
             'position': len(self.runner_ups) + 1  # 1-indexed position
         })
 
+    @classmethod
+    def tables(cls):
+        """The IncrementTables of the active config's increment names (built once per configuration)."""
+        return active_config().tables
+
     @staticmethod
-    def process_increments(shift_selection):
+    def process_increments(shift_selection, tables=None):
         """
-        Process increment selection string into a list of increment flags.
-        Supports both legacy (AM/PM) and new (day_1/day_2) naming.
-        Can be extended to support 3+ increments.
+        Process an increment selection into its bitmask: bit i is set when increment i of
+        the configured increment names is selected.
+        Supports both legacy (AM/PM) and new (day_1/day_2) naming, and 1, 2 or 3+ increments.
 
         Args:
-            shift_selection: String representing the increment selection (e.g., "day_1", "day_1day_2", "FULL")
+            shift_selection: String representing the increment selection (e.g., "day_1", "day_1day_2", "FULL"),
+                             or an existing mask / list of 0-1 flags
+            tables: Optional IncrementTables (a RunConfig's tables). If None, uses the active config
 
         Returns:
-            List of integers (0 or 1) representing which increments are selected
+            Integer bitmask of the selected increments
 
-        Examples:
+        Examples (increment_names = ["day_1", "day_2"]):
             >>> Increment.process_increments("day_1")
-            [1, 0]
-            >>> Increment.process_increments("day_1day_2")
-            [1, 1]
+            1
+            >>> Increment.process_increments("day_2")
+            2
             >>> Increment.process_increments("FULL")
-            [1, 1]
+            3
         """
-        increment_mapping = {
-            # Legacy 24-hour shift names (2x12hr segments)
-            "AM": [1, 0],
-            "PM": [0, 1],
-            "AMPM": [1, 1],
-            "FULL": [1, 1],
-            # New 48-hour shift names (2x24hr segments)
-            "day_1": [1, 0],
-            "day_2": [0, 1],
-            "day_1day_2": [1, 1],
-            # Future 3-increment support
-            "INCREMENT1": [1, 0, 0],
-            "INCREMENT2": [0, 1, 0],
-            "INCREMENT1INCREMENT2": [1, 1, 0],
-            "INCREMENT3": [0, 0, 1],
-            "INCREMENT1INCREMENT3": [1, 0, 1],
-            "INCREMENT2INCREMENT3": [0, 1, 1],
-            "INCREMENT1INCREMENT2INCREMENT3": [1, 1, 1],
-        }
-        if shift_selection in increment_mapping:
-            return increment_mapping[shift_selection]
-        else:
-            # Log or raise an error if an unexpected value is passed
-            logger.warning(f"Unexpected shift selection '{shift_selection}', defaulting to 'FULL'")
-            return [1, 1]
+        if isinstance(shift_selection, int):
+            return shift_selection
+        if tables is None:
+            tables = Increment.tables()
+        if isinstance(shift_selection, (list, tuple)):
+            return sum(1 << i for i, flag in enumerate(shift_selection[:tables.width]) if flag)
+        mask = tables.masks.get(shift_selection)
+        if mask is not None:
+            return mask
+        # Log or raise an error if an unexpected value is passed
+        logger.warning(f"Unexpected shift selection '{shift_selection}', defaulting to 'FULL'")
+        return tables.full
 
     @staticmethod
-    def increments_to_plain_text(increment_list, increment_names=None):
+    def increments_to_plain_text(increment_mask, increment_names=None):
         """
-        Convert increment list back to plain text representation.
+        Convert an increment mask back to plain text representation.
 
         Args:
-            increment_list: List of integers (0 or 1) representing which increments are selected
-            increment_names: Optional list of increment names. If None, uses Increment.increment_names
+            increment_mask: Bitmask of the selected increments (see process_increments)
+            increment_names: Optional list of increment names. If None, uses the active config's names
 
         Returns:
             String representation of the increment selection
 
         Examples:
-            >>> Increment.increments_to_plain_text([1, 0], ["day_1", "day_2"])
+            >>> Increment.increments_to_plain_text(0b01, ["day_1", "day_2"])
             'day_1'
-            >>> Increment.increments_to_plain_text([1, 1], ["day_1", "day_2"])
+            >>> Increment.increments_to_plain_text(0b11, ["day_1", "day_2"])
             'FULL'
-            >>> Increment.increments_to_plain_text([1, 0, 1], ["day_1", "day_2", "day_3"])
+            >>> Increment.increments_to_plain_text(0b101, ["day_1", "day_2", "day_3"])
             'day_1+day_3'
         """
-        # Use Increment's own class variable if not provided
-        if increment_names is None:
-            increment_names = Increment.increment_names
-
-        increment_tuple = tuple(increment_list)
-        num_increments = len(increment_names)
-
-        # Handle FULL (all increments selected)
-        if all(v == 1 for v in increment_list):
-            return "FULL"
-
-        # Handle single increment selections
-        for i, name in enumerate(increment_names):
-            expected_pattern = [1 if j == i else 0 for j in range(num_increments)]
-            if increment_tuple == tuple(expected_pattern):
-                return name
+        # Use the active config's increment names if not provided
+        tables = Increment.tables() if increment_names is None else increment_tables(tuple(increment_names))
+        if isinstance(increment_mask, (list, tuple)):
+            increment_mask = sum(1 << i for i, flag in enumerate(increment_mask) if flag)
+        if 0 < increment_mask <= tables.full:
+            return tables.text[increment_mask]
+        return "ERROR"
 
-        # Handle combinations (for display purposes)
-        selected = [increment_names[i] for i, v in enumerate(increment_list) if v == 1]
-        if selected:
-            return "+".join(selected)
 
-        return "ERROR"
+# Increment Masks
+# ================================================================================================
+# Alternate names, position by position, accepted as selections under any configuration
+INCREMENT_NAME_ALIASES = [
+    ("AM", "PM"),                              # Legacy 24-hour shift names (2x12hr segments)
+    ("day_1", "day_2"),                        # 48-hour shift names (2x24hr segments)
+    ("INCREMENT1", "INCREMENT2", "INCREMENT3"),  # Future 3-increment support
+]
+
+
+class IncrementTables:
+    """
+    Lookup tables for one increment configuration, indexed by selection mask.
+
+    names:  the configured increment names; bit i of a mask selects names[i]
+    full:   the mask with every increment selected
+    masks:  selection text -> mask, for the configured names, their concatenations
+            ("day_1day_2"), the legacy aliases and "FULL"
+    text:   mask -> plain text: "FULL", the single name, or the names joined with "+"
+    counts: mask -> number of selected increments
+    bits:   mask -> indexes of the selected increments, in order
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.width = len(names)
+        self.full = (1 << self.width) - 1
+        masks = range(self.full + 1)
+        self.bits = [tuple(i for i in range(self.width) if mask >> i & 1) for mask in masks]
+        self.counts = [len(bits) for bits in self.bits]
+        self.text = ["ERROR"] + [
+            "FULL" if mask == self.full else "+".join(names[i] for i in self.bits[mask]) for mask in masks[1:]
+        ]
+
+        self.masks = {"FULL": self.full}
+        for family in [names] + INCREMENT_NAME_ALIASES:
+            usable = family[:self.width]
+            for mask in range(1, 1 << len(usable)):
+                self.masks.setdefault("".join(usable[i] for i in self.bits[mask]), mask)
+            self.masks.setdefault("".join(family), self.full)  # e.g. "AMPM" under a single increment
+
+
+@lru_cache(maxsize=None)
+def increment_tables(names):
+    """IncrementTables for a tuple of increment names."""
+    return IncrementTables(names)
 
 
 def check_holiday(day: date) -> bool:
@@ -7,19 +7,19 @@ import difflib
 
 runtime = datetime.now().strftime("%Y.%m.%d %H.%M")
 
-# set up logging folder
 writePath = "./output"
-if not path.exists(writePath):
-    makedirs(writePath)
-
-
-# logging setup - write to output file as well as printing visably
-logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger()
-logger.addHandler(logging.FileHandler(
-    f'{writePath}/RunLog-{runtime}.log', 'a'))
 print = logger.info
 
+
+def setupLogging():
+    """Creates the output folder and logs to the run log as well as printing visably.  Called by main."""
+    if not path.exists(writePath):
+        makedirs(writePath)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger.addHandler(logging.FileHandler(
+        f'{writePath}/RunLog-{runtime}.log', 'a'))
+
 # date format
 date_format = '%m-%d-%Y'
 
@@ -426,6 +426,7 @@ def picksToCSV(ffighter: list, suffix):
 
 
 def main():
+    setupLogging()
     ffighters = setPriorities(
         getData('2024 VACATION REQUEST FORM - Form Responses.csv'))
 
@@ -1,148 +1,63 @@
+import argparse
+import os
 from datetime import datetime
-from fuzzywuzzy import fuzz  # import fuzzy matching
-from .file_io import parse_date
-from vacation_selection.setup_logging import setup_logging
+from .dates import detect_date_format, parse_date
+from vacation_selection.setup_logging import get_logger, setup_logging
 
-# Set up runtime and logging
-runtime = datetime.now().strftime("%Y.%m.%d %H.%M")
 write_path = ".//output"
-logger = setup_logging(f"RunLog-{runtime}.log", base=write_path, debug=False)
+logger = get_logger("main")
 print = logger.info
 
 from .file_io import (
     read_firefighter_data, write_calendar_to_csv, write_runner_ups_to_csv,
-    write_picks_to_csv, print_final, write_ffighters_to_json, read_hr_validation
+    write_picks_to_csv, print_final, write_ffighters_to_json, read_hr_validation, read_exclusions_file,
+    write_analysis_to_json, BACKENDS
 )
+from .exclusions import apply_exclusions
+from .identity import IdentityIndex
 from .firefighter import FFighter
-from .priority import set_priorities
+from .priority import randomize_sub_priority
 from .cal import make_calendar
+from .config import active_config, use_config
+from .catalog import RunManifest, StageCache, STAGE_CACHE_DIRNAME, new_seed, stage_key, stage_random
 from vacation_selection.validation import ensure_rank  # Import validation function
 
+SHIFTS = ["A", "B", "C"]
 
-def parse_name(name_str):
-    """
-    Parses a string into (first, middle, last).
-    Supports the format "LastName, FirstName MiddleName" 
-    or simple fallbacks like "First Last" if no comma.
-    Returns (first, middle, last) as strings (may be empty if missing).
-    """
-    name_str = (name_str or "").strip()
-    if not name_str:
-        return "", "", ""
-
-    if ',' in name_str:
-        # e.g. "Obiedo, Salvador Gabriel"
-        last_part, first_part = name_str.split(',', 1)
-        last_part = last_part.strip()
-        parts = first_part.strip().split()
-        if len(parts) == 1:
-            first, middle = parts[0], ""
-        else:
-            first = parts[0]
-            middle = " ".join(parts[1:])
-        return first, middle, last_part
-    else:
-        # Fallback: assume "First Middle Last" or "First Last"
-        parts = name_str.split()
-        if len(parts) == 1:
-            return parts[0], "", ""
-        elif len(parts) == 2:
-            return parts[0], "", parts[1]
-        else:
-            return parts[0], " ".join(parts[1:-1]), parts[-1]
 
-
-def average_top_2_fuzzy_score(ff, hr_name_str):
-    """
-    Given a Firefighter object `ff` with .fname, .mname (optional), .lname,
-    and a raw HR name string (e.g. "Obiedo, Salvador Gabriel"),
-    parse both and compute the average of the top 2 fuzzy‐match scores.
-    """
-    # Parse FF name (assuming ff.fname, ff.lname exist; mname optional)
-    ff_first = (ff.fname or "").strip()
-    ff_middle = (getattr(ff, 'mname', None) or "").strip()
-    ff_last = (ff.lname or "").strip()
-
-    # Parse HR name
-    hr_first, hr_middle, hr_last = parse_name(hr_name_str)
-
-    # Build combos for FF
-    combos_ff = [
-        f"{ff_first} {ff_last}".strip(),                # e.g. "Salvador Obiedo"
-        f"{ff_first} {ff_middle} {ff_last}".strip()     # e.g. "Salvador Gabriel Obiedo"
-    ]
-    # Build combos for HR
-    combos_hr = [
-        f"{hr_first} {hr_last}".strip(),                # e.g. "Salvador Obiedo"
-        f"{hr_first} {hr_middle} {hr_last}".strip()     # e.g. "Salvador Gabriel Obiedo"
-    ]
-
-    # Compute fuzzy scores across all combos
-    scores = []
-    for ff_combo in combos_ff:
-        for hr_combo in combos_hr:
-            if ff_combo and hr_combo:
-                score = fuzz.ratio(ff_combo.upper(), hr_combo.upper())
-                scores.append(score)
-
-    # Sort descending, average top 2
-    scores.sort(reverse=True)
-    if not scores:
-        return 0
-    elif len(scores) == 1:
-        return scores[0]
-    else:
-        return (scores[0] + scores[1]) / 2.0
-    
-def find_hr_record(ff, hr_data, threshold=80):
+def find_hr_record(ff, hr_data, threshold=80, index=None):
     """
     1) If ff.idnum is valid (non-zero), try an ID match first.
-    2) Otherwise, do a fuzzy name match with average_top_2_fuzzy_score.
+    2) Otherwise, match the name: exactly, or by the best average of the top 2 fuzzy scores.
+    Pass the IdentityIndex of hr_data when matching many firefighters; one is built otherwise.
     """
-    # 1) ID-based match
-    if ff.idnum and str(ff.idnum).strip() not in ["0", ""]:
-        hr_record = next(
-            (hr for hr in hr_data if str(hr['Employee Number']).strip() == str(ff.idnum).strip()),
-            None
-        )
-        if hr_record:
-            return hr_record
-
-    # 2) Fuzzy name-based match
-    best_match = None
-    best_score = 0
-
-    for hr in hr_data:
-        raw_name = hr.get("Employee Name", "").strip()
-        if not raw_name:
-            continue
-        avg_score = average_top_2_fuzzy_score(ff, raw_name)
-        if avg_score > best_score:
-            best_score = avg_score
-            best_match = hr
-
-    if best_score >= threshold and best_match:
-        logger.info(f"Fuzzy match for {ff.fname} {ff.lname} -> {best_match.get('Employee Name','Unknown')} (Score: {best_score})")
-        return best_match
-    else:
-        logger.warning(f"No acceptable fuzzy match for {ff.fname} {ff.lname} (Best Score: {best_score})")
-        return None
+    if index is None:
+        index = IdentityIndex.from_hr_records(hr_data, scorer="top_2", threshold=threshold)
+    match = index.resolve(ff.idnum, ff.fname, ff.lname, getattr(ff, 'mname', None) or "")
+    return hr_data[match.position] if match else None
 
 
 
-def validate_against_hr(ffighters, hr_data):
+def validate_against_hr(ffighters, hr_data, progress=None, index=None):
     """
     Validates firefighter data against HR data, checking Hire Date, Vacation Hours, Holiday Hours, and Rank.
+    `progress`, if given, is called as progress(done, total) for each firefighter.
+    `index` is the IdentityIndex of hr_data (scorer "top_2"), e.g. from IdentityIndex.for_hr_file.
     Returns a list of validated firefighter objects.
     """
     validated_ffighters = []
-    
-    for ff in ffighters:
+    if index is None:
+        index = IdentityIndex.from_hr_records(hr_data, scorer="top_2")
+    hire_date_format = detect_date_format(record.get('Hire Date') for record in hr_data)
+
+    for position, ff in enumerate(ffighters):
+        if progress:
+            progress(position + 1, len(ffighters))
         # Initialize hr_validations dictionary
         ff.hr_validations = {}
 
         # Find corresponding HR record, first by idnum then by fuzzy name matching
-        hr_record = find_hr_record(ff, hr_data)
+        hr_record = find_hr_record(ff, hr_data, index=index)
         
         if hr_record:
             # Ensure ID Num
@@ -155,7 +70,7 @@ def validate_against_hr(ffighters, hr_data):
                 ff.idnum = hr_id_num
 
             # Validate Hire Date
-            hire_date = parse_date(hr_record['Hire Date'])  # Use parse_date here
+            hire_date = parse_date(hr_record['Hire Date'], hire_date_format)
             if ff.hireDate != hire_date:
                 logger.warning(f"Hire Date mismatch for {ff.name} (ID: {ff.idnum}):   {ff.hireDate} - Overwriting with {hire_date} from HR data.")
                 ff.hr_validations['Hire Date'] = (ff.hireDate, hire_date)
@@ -204,40 +119,142 @@ def validate_against_hr(ffighters, hr_data):
 
 
 
-def main(pick_filename, hr_filename, format):
-    date_format = '%m-%d-%Y'
-    
-    try:
-        # Import Firefighter File
-        ffighters = read_firefighter_data(pick_filename, date_format, format)
+def _read_stage(pick_filename, date_format, file_format):
+    ffighters = read_firefighter_data(pick_filename, date_format, file_format)
+    if not ffighters:
+        raise ValueError(f"No firefighter data read from {pick_filename}.")
+    return ffighters
 
-        # Validate Firefighter Data against HR File
-        hr_data = read_hr_validation(hr_filename)
-        ffighters = validate_against_hr(ffighters, hr_data)
 
-        # Set Priorities for Firefighters
-        ffighters = set_priorities(ffighters)
+def _validate_stage(ffighters, hr_filename):
+    hr_data = read_hr_validation(hr_filename)
+    index = IdentityIndex.for_hr_file(hr_filename, hr_data, write_path, scorer="top_2")
+    return validate_against_hr(ffighters, hr_data, index=index)
 
-    except Exception as e:
-        logger.error(f"ERROR: {e}")
-        exit(1)
+
+def _exclusions_stage(ffighters, exclusions_filename):
+    if exclusions_filename:
+        unmatched, ambiguous = apply_exclusions(read_exclusions_file(exclusions_filename), ffighters)
+        for exclusion in unmatched:
+            logger.warning(f"Exclusion not matched to a firefighter: {exclusion}")
+        for exclusion in ambiguous:
+            logger.warning(f"Exclusion matches several firefighters (not applied): {exclusion}")
+    return ffighters
+
+
+def _draft_stage(ffighters, config, rng):
+    """Drafts every shift, rolling the tie-breaker dice with rng; returns (ffighters, {shift: make_calendar results})."""
+    return ffighters, {shift: make_calendar([ff for ff in ffighters if ff.shift == shift], config=config, rng=rng)
+                       for shift in SHIFTS}
+
+
+def main(pick_filename, hr_filename, format, exclusions_filename=None, seed=None, use_cache=True,
+         date_format='%m-%d-%Y', config=None, backend="json"):
+    """
+    Headless run: ingest picks, validate against HR, apply exclusions, prioritize, draft,
+    then write the outputs and the analysis.
+
+    With `use_cache`, each stage's result is cached under a key of its input file hashes,
+    settings and the stages before it (see catalog.StageCache), so e.g. a rerun with only a
+    new exclusions file skips reading the picks and HR matching.  Prioritizing and drafting
+    only hit the cache when the run repeats a `seed`.
+    `config` is the RunConfig to draft under (the active config by default); runs with
+    different configs can go side by side in threads.
+    `backend` is one of file_io.BACKENDS: "sqlite" stores the firefighters, calendar,
+    runner-ups and analysis in the output folder's RunStore instead of JSON/CSV files.
+    Returns the run manifest.  Errors are raised to the caller (ValueError when there are no
+    firefighters to draft); cli() turns them into exit status 1.
+    """
+    config = config if config is not None else active_config()
+    with use_config(config):
+        return _run(pick_filename, hr_filename, format, exclusions_filename, seed, use_cache, date_format, config,
+                    backend)
+
+
+def _run(pick_filename, hr_filename, format, exclusions_filename, seed, use_cache, date_format, config, backend):
+    # pandas-backed outputs, imported when a run gets this far rather than with the module
+    from .telestaff_export import write_telestaff_import_for_ffighters
+    from .analyze import analyze_results
+
+    runtime = datetime.now().strftime("%Y.%m.%d %H.%M")
+    seed = new_seed(seed)  # Each random stage rolls its own stage_random(seed, ...), not the global `random`
+    manifest = RunManifest(runtime, write_path, seed=seed, config=config)
+    manifest.add_input(pick_filename)
+    manifest.add_input(hr_filename)
+    manifest.add_input(exclusions_filename)
+
+    # Picks are read into the config's increment masks, so every stage depends on it
+    read_key = stage_key("read", manifest.inputs.get(pick_filename), format, date_format, manifest.config)
+    validate_key = stage_key("validate", read_key, manifest.inputs.get(hr_filename))
+    exclusions_key = stage_key("exclusions", validate_key, manifest.inputs.get(exclusions_filename))
+    priority_key = stage_key("prioritize", exclusions_key, seed)
+    draft_key = stage_key("draft", priority_key)
+    stages = [
+        ("read", read_key, lambda _: _read_stage(pick_filename, date_format, format)),
+        ("validate", validate_key, lambda ffighters: _validate_stage(ffighters, hr_filename)),
+        ("exclusions", exclusions_key, lambda ffighters: _exclusions_stage(ffighters, exclusions_filename)),
+        ("prioritize", priority_key, lambda ffighters: randomize_sub_priority(ffighters, stage_random(seed, "prioritize"))),
+        ("draft", draft_key, lambda ffighters: _draft_stage(ffighters, config, stage_random(seed, "draft"))),
+    ]
+
+    if use_cache:
+        ffighters, shift_results = StageCache(os.path.join(write_path, STAGE_CACHE_DIRNAME)).run(stages, manifest)
+    else:
+        value = None
+        for name, _, compute in stages:
+            with manifest.stage(name):
+                value = compute(value)
+        ffighters, shift_results = value
 
     # Check if firefighter list is empty after import and validation
     if not ffighters:
-        logger.error("\nNo firefighter data available to process.")
-        exit(1)
+        raise ValueError("No firefighter data available to process.")
 
-    # Work in shifts
-    for shift in ["A", "B", "C"]:
+    # Write outputs per shift
+    for shift in SHIFTS:
         shift_members = [ff for ff in ffighters if ff.shift == shift]
-        results = make_calendar(shift_members)
-
-        # Write outputs
-        write_ffighters_to_json(shift_members, f'{shift}_ffighters', write_path, runtime)
-        write_calendar_to_csv(results['calendar'], shift, write_path, runtime)
-        write_runner_ups_to_csv(results['calendar'], shift, write_path, runtime)
-        write_picks_to_csv(shift_members, shift, write_path, runtime)
+        results = shift_results[shift]
+        with manifest.stage("write_outputs"):
+            manifest.add_output(write_ffighters_to_json(shift_members, f'{shift}_ffighters', write_path, runtime,
+                                                        backend=backend, config=config), "ffighters", shift)
+            manifest.add_output(write_calendar_to_csv(results['calendar'], shift, write_path, runtime, backend=backend),
+                                "calendar", shift)
+            manifest.add_output(write_runner_ups_to_csv(results['calendar'], shift, write_path, runtime, backend=backend,
+                                                        config=config), "runner_ups", shift)
+            manifest.add_output(write_picks_to_csv(shift_members, shift, write_path, runtime, config=config),
+                                "picks", shift)
+            manifest.add_output(write_telestaff_import_for_ffighters(shift_members, shift, write_path, runtime,
+                                                                     config=config), "telestaff_import", shift)
         print_final(shift_members)
 
+    with manifest.stage("analyze"):
+        manifest.add_output(write_analysis_to_json(analyze_results(ffighters), write_path, runtime,
+                                                   backend=backend), "analysis")
+
+    manifest.write()
+    return manifest
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Run the vacation selection draft without the GUI.")
+    parser.add_argument("--picks", required=True, help="Pick form CSV")
+    parser.add_argument("--hr", required=True, help="HR validation file")
+    parser.add_argument("--format", type=int, required=True, help="Pick form format year, e.g. 2025")
+    parser.add_argument("--exclusions", help="Exclusions (leave) Excel file")
+    parser.add_argument("--seed", type=int, help="Seed for the tie-breaker dice; repeat it to reuse a cached draft")
+    parser.add_argument("--date-format", default='%m-%d-%Y')
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every stage")
+    parser.add_argument("--backend", choices=BACKENDS, default="json",
+                        help="Write the firefighters, calendar, runner-ups and analysis as JSON/CSV files or to a SQLite store")
+    args = parser.parse_args(argv)
+    setup_logging(f"RunLog-{datetime.now().strftime('%Y.%m.%d %H.%M')}.log", base=write_path, debug=False)
+    try:
+        return main(args.picks, args.hr, args.format, args.exclusions, seed=args.seed, use_cache=not args.no_cache,
+                    date_format=args.date_format, backend=args.backend)
+    except Exception as e:
+        logger.exception(f"ERROR: {e}")
+        parser.exit(1, f"ERROR: {e}\n")
+
+
 if __name__ == '__main__':
-    main('firefighter_data.csv', 'hr_data.csv', 'some_format')
+    cli()
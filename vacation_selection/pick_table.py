@@ -0,0 +1,251 @@
+# pick_table.py
+"""
+Columnar storage for picks.
+
+Every Pick is a row of a PickTable: the fields live in typed arrays (one per column)
+and the Pick object is a small view holding only its table and row number.  Text
+fields (type, determination, reason, source) are interned to integer codes, dates
+are stored as ordinals and increments as bitmasks, so a pick costs a few dozen bytes
+and whole columns can be handed to numpy/pandas without copying.
+
+Loaders give each file (or run) its own table, so a table is freed together with its
+picks; picks created without one go to default_table(), which is also freed once none of
+its picks are left.
+
+Sentinels: code -1 means None (the pandas convention for missing categorical codes),
+place -1 means no place, approved mask 0 means "not set" and ffighter -1 means the
+pick has no owner yet.
+"""
+from array import array
+from contextlib import contextmanager
+from datetime import date
+import threading
+import weakref
+
+NO_CODE = -1
+NO_PLACE = -1
+NO_MASK = 0
+NO_FFIGHTER = -1
+
+# Column name -> array typecode
+COLUMNS = {
+    "ffighter": "i",       # Index into the table's firefighters
+    "date": "i",           # date.toordinal()
+    "requested": "H",      # Requested increments (bitmask)
+    "approved": "H",       # Approved increments (bitmask, NO_MASK until set)
+    "determination": "h",  # Code into table.determinations
+    "reason": "i",         # Code into table.reasons
+    "type": "h",           # Code into table.types
+    "place": "i",
+    "source": "h",         # Code into table.sources
+}
+
+# Text columns' vocabularies (PickTable attributes)
+_VOCABULARIES = ("types", "determinations", "reasons", "sources")
+
+# Ordinal of 1970-01-01, for converting ordinals to numpy datetime64[D]
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class Vocabulary:
+    """Interns values to small integer codes; None is always NO_CODE."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self._codes = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        if value is None:
+            return NO_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code):
+        return None if code == NO_CODE else self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class PickTable:
+    """
+    Append-only columnar table of picks.  Rows are never removed; a Pick keeps its row for life.
+    """
+
+    def __init__(self):
+        for name, typecode in COLUMNS.items():
+            setattr(self, name, array(typecode))
+        self.types = Vocabulary(("Untyped", "Vacation", "Holiday"))
+        self.determinations = Vocabulary(("Unaddressed", "Approved", "Rejected"))
+        self.reasons = Vocabulary()
+        self.sources = Vocabulary()
+        self._ffighters = []  # Index -> weak reference to the firefighter
+        self._ffighter_index = weakref.WeakKeyDictionary()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.date)
+
+    def append(self, pick_date, type, determination, requested, approved=None, reason=None, place=None,
+               source=None):
+        """Adds a row and returns its row number."""
+        with self._lock:
+            row = len(self.date)
+            self.ffighter.append(NO_FFIGHTER)
+            self.date.append(pick_date.toordinal())
+            self.requested.append(requested)
+            self.approved.append(NO_MASK if approved is None else approved)
+            self.determination.append(self.determinations.code(determination))
+            self.reason.append(self.reasons.code(reason))
+            self.type.append(self.types.code(type))
+            self.place.append(NO_PLACE if place is None else place)
+            self.source.append(self.sources.code(source))
+        return row
+
+    # Firefighters
+    def ffighter_index(self, ffighter):
+        """Index of a firefighter in this table, registering it on first use."""
+        with self._lock:
+            index = self._ffighter_index.get(ffighter)
+            if index is None:
+                index = self._ffighter_index[ffighter] = len(self._ffighters)
+                self._ffighters.append(weakref.ref(ffighter))
+        return index
+
+    def ffighter_at(self, index):
+        """The firefighter registered at index (None if unset or no longer alive)."""
+        return None if index == NO_FFIGHTER else self._ffighters[index]()
+
+    # Bulk access
+    @contextmanager
+    def views(self):
+        """
+        Column name -> zero-copy numpy view over the table's buffers, for the duration of a
+        with-block.  The table's lock is held meanwhile, so appends from other threads wait
+        for the block to end; the views must not be kept past it.
+        """
+        import numpy as np
+
+        with self._lock:
+            columns = {name: np.frombuffer(getattr(self, name), dtype=typecode)
+                       for name, typecode in COLUMNS.items()}
+            try:
+                yield columns
+            finally:
+                columns.clear()  # Release the buffers before the table can grow again
+
+    def arrays(self, rows=None):
+        """
+        Column name -> numpy array, copied from the table (all rows, or the given sequence of
+        row numbers) so it can be kept while picks are added.  See views() for zero-copy access.
+        """
+        import numpy as np
+
+        with self.views() as columns:
+            if rows is None:
+                return {name: column.copy() for name, column in columns.items()}
+            rows = np.asarray(rows, dtype=np.intp)
+            return {name: column[rows] for name, column in columns.items()}
+
+    def to_pandas(self, rows=None):
+        """
+        The table (or the given rows) as a DataFrame.  Integer columns are the arrays
+        from arrays(); text columns are categoricals over the interned codes, and dates
+        are datetime64[D].
+        """
+        import pandas as pd
+
+        columns = self.arrays(rows)
+        frame = pd.DataFrame({
+            "ffighter": columns["ffighter"],
+            "date": (columns["date"] - _EPOCH_ORDINAL).astype("datetime64[D]"),
+            "requested": columns["requested"],
+            "approved": columns["approved"],
+            "determination": self.categorical(columns["determination"], self.determinations),
+            "reason": self.categorical(columns["reason"], self.reasons),
+            "type": self.categorical(columns["type"], self.types),
+            "place": columns["place"],
+            "source": self.categorical(columns["source"], self.sources),
+        }, copy=False)
+        return frame
+
+    @staticmethod
+    def categorical(codes, vocabulary):
+        """Codes as a pandas Categorical over the vocabulary, in first-appearance order."""
+        import numpy as np
+        import pandas as pd
+
+        positions, used = pd.factorize(codes, use_na_sentinel=False)
+        categories = [vocabulary.decode(code) for code in used]
+        if NO_CODE in used:
+            # Missing values keep code -1, and None is not a valid category
+            missing = categories.index(None)
+            del categories[missing]
+            positions = np.where(positions == missing, -1, positions - (positions > missing))
+        return pd.Categorical.from_codes(positions, categories=categories)
+
+    # Pickling: the rows and vocabularies go by value.  Owners are not kept; the
+    # firefighters record them again as they are restored (see FFighter.__setstate__).
+    def __getstate__(self):
+        with self._lock:
+            state = {name: getattr(self, name)[:] for name in COLUMNS if name != "ffighter"}
+            for name in _VOCABULARIES:
+                state[name] = list(getattr(self, name).values)
+            return state
+
+    def __setstate__(self, state):
+        self.__init__()
+        for name in COLUMNS:
+            if name != "ffighter":
+                setattr(self, name, state[name])
+        self.ffighter = array(COLUMNS["ffighter"], [NO_FFIGHTER]) * len(self.date)
+        for name in _VOCABULARIES:
+            setattr(self, name, Vocabulary(state[name]))
+
+
+_default_table = None  # Weak reference to the current default table
+_default_lock = threading.Lock()
+
+
+def default_table():
+    """
+    The table new picks are added to unless another is given.  It is held weakly (each of
+    its picks holds it), so once none of its picks are left it is freed and a new one starts.
+    """
+    global _default_table
+    with _default_lock:
+        table = _default_table() if _default_table is not None else None
+        if table is None:
+            table = PickTable()
+            _default_table = weakref.ref(table)
+        return table
+
+
+def assign(picks, ffighter):
+    """Records ffighter as the owner of picks (in whichever table each pick lives)."""
+    for pick in picks:
+        table = pick._table
+        table.ffighter[pick._row] = table.ffighter_index(ffighter)
+
+
+def rows_of(picks):
+    """
+    The (table, row numbers) holding picks.  Picks spread over several tables are copied
+    into a new table first, so the result can always be read with one table's arrays.
+    """
+    picks = list(picks)
+    tables = {id(pick._table): pick._table for pick in picks}
+    if len(tables) == 1:
+        (table,) = tables.values()
+        return table, [pick._row for pick in picks]
+    if not picks:
+        return PickTable(), []
+    table = PickTable()
+    rows = [table.append(pick.date, pick.type, pick.determination, pick.increments, pick.approved_increments,
+                         pick.reason, pick.place, pick.source) for pick in picks]
+    return table, rows
@@ -6,9 +6,9 @@ def set_priorities(arr):
     arr.sort(key=lambda x: (x.hireDate, x.dice))
     return arr
 
-def randomize_sub_priority(arr):
-    """Randomizes subpriority for firefighters with the same hire date"""
+def randomize_sub_priority(arr, rng=random):
+    """Randomizes subpriority for firefighters with the same hire date, rolling the dice with `rng`"""
     for ffighter in arr:
-        ffighter.dice = random.random()
+        ffighter.dice = rng.random()
     set_priorities(arr)
     return arr
@@ -2,6 +2,15 @@
 import logging
 from os import makedirs, path
 
+
+def get_logger(name="default.log"):
+    """
+    Logger for a module.  Has no side effects: nothing is written until an entry point
+    (the GUI, run.py or the headless CLI) calls setup_logging.
+    """
+    return logging.getLogger(name)
+
+
 def setup_logging(filename="default.log", base=".\\output\\", debug=False):
     """Setup logging configuration."""
     if debug:
@@ -20,4 +29,4 @@ def setup_logging(filename="default.log", base=".\\output\\", debug=False):
             ],
         )
     logging.info(f"Logging initialized: {full_log_path}")
-    return logging.getLogger(filename)
\ No newline at end of file
+    return logging.getLogger(filename)
@@ -0,0 +1,72 @@
+# snapshot.py
+import pickle
+from datetime import datetime
+
+import vacation_selection.setup_logging as setup_logging
+from vacation_selection.config import active_config
+
+logger = setup_logging.get_logger("snapshot")
+
+# File layout: MAGIC, one version byte, then a pickle of the draft state.
+# Bump SNAPSHOT_VERSION whenever Day/Increment/FFighter/Pick change shape.
+SNAPSHOT_MAGIC = b"VSNAP"
+SNAPSHOT_VERSION = 6
+
+
+def current_config():
+    """The increment configuration a snapshot is drafted under (the active RunConfig's settings)."""
+    return active_config().to_dict()
+
+
+def save_snapshot(file_path, ffighters, shift_calendars, config=None):
+    """
+    Saves the full draft state to a binary snapshot.
+
+    The calendar (days, increments with their rank_counts and runner-ups), the rejected map
+    and every firefighter (picks, processed picks and counters) are pickled together, so
+    the objects keep referring to each other after loading.
+
+    Args:
+        file_path: Where to write the snapshot
+        ffighters: List of all FFighter objects
+        shift_calendars: {shift: {"calendar": {...}, "rejected": {...}}} as returned by make_calendar
+        config: RunConfig the draft ran under (the active config by default)
+    """
+    state = {
+        "created": datetime.now(),
+        "config": (config or active_config()).to_dict(),
+        "ffighters": ffighters,
+        "shift_calendars": shift_calendars,
+    }
+    with open(file_path, "wb") as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]))
+        pickle.dump(state, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+    logger.info(f"Saved draft snapshot of {len(ffighters)} firefighters to {file_path}")
+    return file_path
+
+
+def load_snapshot(file_path, config=None):
+    """
+    Restores a draft state saved by save_snapshot, warning if it was drafted under another
+    configuration than `config` (the active RunConfig by default).
+    Returns (ffighters, shift_calendars), ready to pass to make_calendar(existing_calendar_data=...).
+    Raises ValueError if the file is not a snapshot or was written by another version.
+    """
+    with open(file_path, "rb") as snapshot_file:
+        header = snapshot_file.read(len(SNAPSHOT_MAGIC) + 1)
+        if header[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{file_path} is not a draft snapshot.")
+        version = header[len(SNAPSHOT_MAGIC)]
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {version} is not supported (expected {SNAPSHOT_VERSION}).")
+        state = pickle.load(snapshot_file)
+
+    expected = (config or active_config()).to_dict()
+    if state["config"] != expected:
+        logger.warning(
+            f"Snapshot {file_path} was drafted with a different increment configuration: "
+            f"{state['config']} (current: {expected})"
+        )
+
+    logger.info(f"Loaded draft snapshot from {file_path} (created {state['created']:%Y.%m.%d %H.%M})")
+    return state["ffighters"], state["shift_calendars"]
@@ -0,0 +1,314 @@
+# store.py
+import json
+import sqlite3
+from datetime import date, datetime
+
+import vacation_selection.setup_logging as setup_logging
+from vacation_selection.firefighter import FFighter, Pick
+from vacation_selection.increment import Increment
+from vacation_selection.pick_table import PickTable, assign
+
+logger = setup_logging.get_logger("store")
+
+# Default database file name inside the output folder
+STORE_FILENAME = "vacation_selection.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    created     TEXT NOT NULL,
+    analysis    TEXT
+);
+CREATE TABLE IF NOT EXISTS firefighters (
+    ff_key                  INTEGER PRIMARY KEY,
+    run_id                  TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    idnum                   TEXT,
+    fname                   TEXT,
+    lname                   TEXT,
+    name                    TEXT,
+    rank                    TEXT,
+    shift                   TEXT,
+    hire_date               TEXT,
+    max_shifts_off          REAL,
+    awarded_vacation_shifts REAL,
+    awarded_holiday_shifts  REAL,
+    used_vacation_shifts    REAL,
+    used_holiday_shifts     REAL,
+    approved_shifts_count   REAL,
+    dice                    REAL,
+    hr_validations          TEXT,
+    exclusions              TEXT
+);
+CREATE TABLE IF NOT EXISTS picks (
+    pick_key    INTEGER PRIMARY KEY,
+    ff_key      INTEGER NOT NULL REFERENCES firefighters(ff_key) ON DELETE CASCADE,
+    run_id      TEXT NOT NULL,
+    queue       TEXT NOT NULL,      -- 'processed' or 'picks' (still waiting)
+    position    INTEGER NOT NULL,   -- order within the queue
+    date        TEXT NOT NULL,
+    type        TEXT,
+    increments  TEXT,               -- requested increments
+    place       INTEGER,
+    source      TEXT
+);
+CREATE TABLE IF NOT EXISTS determinations (
+    pick_key            INTEGER PRIMARY KEY REFERENCES picks(pick_key) ON DELETE CASCADE,
+    determination       TEXT NOT NULL,
+    reason              TEXT,
+    approved_increments TEXT
+);
+CREATE TABLE IF NOT EXISTS increments (
+    run_id      TEXT NOT NULL,
+    shift       TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    increment   TEXT NOT NULL,
+    kind        TEXT NOT NULL,      -- 'approved' or 'runner_up'
+    position    INTEGER NOT NULL,
+    idnum       TEXT,
+    name        TEXT,
+    rank        TEXT,
+    type        TEXT,
+    increments  TEXT,
+    reason      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ff_run_shift ON firefighters(run_id, shift);
+CREATE INDEX IF NOT EXISTS idx_ff_run_rank ON firefighters(run_id, rank);
+CREATE INDEX IF NOT EXISTS idx_ff_idnum ON firefighters(idnum);
+CREATE INDEX IF NOT EXISTS idx_picks_ff ON picks(ff_key);
+CREATE INDEX IF NOT EXISTS idx_picks_run_date ON picks(run_id, date);
+CREATE INDEX IF NOT EXISTS idx_determinations ON determinations(determination);
+CREATE INDEX IF NOT EXISTS idx_increments_run_date ON increments(run_id, date);
+CREATE INDEX IF NOT EXISTS idx_increments_run_shift ON increments(run_id, shift, kind);
+"""
+
+
+def _to_json(value):
+    return json.dumps(value, default=lambda obj: obj.isoformat() if isinstance(obj, date) else str(obj))
+
+
+class RunStore:
+    """
+    SQLite-backed store for runs, firefighters, picks, determinations and calendar increments.
+    Every write happens in a single transaction with bulk inserts.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ==========    Runs    ==========
+
+    def ensure_run(self, run_id):
+        self.connection.execute(
+            "INSERT OR IGNORE INTO runs (run_id, created) VALUES (?, ?)",
+            (run_id, datetime.now().isoformat(timespec="seconds"))
+        )
+
+    def latest_run_id(self):
+        row = self.connection.execute(
+            "SELECT run_id FROM runs ORDER BY created DESC, run_id DESC LIMIT 1"
+        ).fetchone()
+        return row["run_id"] if row else None
+
+    def run_ids(self):
+        return [row["run_id"] for row in self.connection.execute("SELECT run_id FROM runs ORDER BY created, run_id")]
+
+    def _resolve_run(self, run_id):
+        return run_id if run_id is not None else self.latest_run_id()
+
+    # ==========    Firefighters and Picks    ==========
+
+    def write_ffighters(self, run_id, ffighters):
+        """
+        Stores firefighters with their picks and determinations for a run.
+        Firefighters of the same shifts already stored for this run are replaced.
+        """
+        ffighters = list(ffighters)
+        with self.connection:
+            self.ensure_run(run_id)
+            shifts = sorted({ff.shift for ff in ffighters})
+            self.connection.executemany(
+                "DELETE FROM firefighters WHERE run_id = ? AND shift = ?",
+                [(run_id, shift) for shift in shifts]
+            )
+
+            next_ff_key = self.connection.execute("SELECT COALESCE(MAX(ff_key), 0) + 1 FROM firefighters").fetchone()[0]
+            next_pick_key = self.connection.execute("SELECT COALESCE(MAX(pick_key), 0) + 1 FROM picks").fetchone()[0]
+
+            ff_rows, pick_rows, determination_rows = [], [], []
+            for ff in ffighters:
+                ff_key = next_ff_key
+                next_ff_key += 1
+                ff_rows.append((
+                    ff_key, run_id, str(ff.idnum), ff.fname, ff.lname, ff.name, ff.rank, ff.shift,
+                    ff.hireDate.isoformat(), ff.max_shifts_off, ff.awarded_vacation_shifts,
+                    ff.awarded_holiday_shifts, ff.used_vacation_shifts, ff.used_holiday_shifts,
+                    ff.approved_shifts_count, ff.dice, _to_json(ff.hr_validations), _to_json(ff.exclusions)
+                ))
+                for queue, picks in (("processed", ff.processed), ("picks", ff.picks)):
+                    for position, pick in enumerate(picks):
+                        pick_key = next_pick_key
+                        next_pick_key += 1
+                        pick_rows.append((
+                            pick_key, ff_key, run_id, queue, position, pick.date.isoformat(), pick.type,
+                            pick.increments_plain_text(pick.increments), pick.place, pick.source
+                        ))
+                        approved = (pick.increments_plain_text(pick.approved_increments)
+                                    if pick.approved_increments is not None else None)
+                        determination_rows.append((pick_key, pick.determination, pick.reason, approved))
+
+            self.connection.executemany(
+                "INSERT INTO firefighters VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", ff_rows)
+            self.connection.executemany("INSERT INTO picks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", pick_rows)
+            self.connection.executemany("INSERT INTO determinations VALUES (?, ?, ?, ?)", determination_rows)
+        logger.info(f"Stored {len(ff_rows)} firefighters and {len(pick_rows)} picks for run {run_id}")
+
+    def read_ffighters(self, run_id=None, shift=None):
+        """Rebuilds FFighter objects for a run (latest run by default), optionally for one shift."""
+        run_id = self._resolve_run(run_id)
+        if run_id is None:
+            return []
+
+        query = "SELECT * FROM firefighters WHERE run_id = ?"
+        params = [run_id]
+        if shift is not None:
+            query += " AND shift = ?"
+            params.append(shift)
+        ff_rows = self.connection.execute(query + " ORDER BY ff_key", params).fetchall()
+
+        table = PickTable()  # One table for the picks read
+        picks_by_ff = {}
+        pick_query = """SELECT p.*, d.determination, d.reason, d.approved_increments
+                        FROM picks p JOIN determinations d ON d.pick_key = p.pick_key
+                        JOIN firefighters f ON f.ff_key = p.ff_key
+                        WHERE p.run_id = ?"""
+        if shift is not None:
+            pick_query += " AND f.shift = ?"  # Only the picks of the firefighters read
+        pick_rows = self.connection.execute(pick_query + " ORDER BY p.ff_key, p.queue, p.position", params)
+        for row in pick_rows:
+            pick = Pick(
+                date.fromisoformat(row["date"]), type=row["type"], determination=row["determination"],
+                increments=row["increments"], reason=row["reason"], place=row["place"], source=row["source"],
+                table=table
+            )
+            if row["approved_increments"] is not None:
+                pick.approved_increments = Increment.process_increments(row["approved_increments"])
+            picks_by_ff.setdefault(row["ff_key"], {}).setdefault(row["queue"], []).append(pick)
+
+        ffighters = []
+        for row in ff_rows:
+            queues = picks_by_ff.get(row["ff_key"], {})
+            ff = FFighter(row["idnum"], row["fname"], row["lname"], date.fromisoformat(row["hire_date"]),
+                          row["rank"], row["shift"], queues.get("picks", []))
+            ff.processed = queues.get("processed", [])
+            assign(ff.processed, ff)
+            ff.max_shifts_off = row["max_shifts_off"]
+            ff.awarded_vacation_shifts = row["awarded_vacation_shifts"]
+            ff.awarded_holiday_shifts = row["awarded_holiday_shifts"]
+            ff.used_vacation_shifts = row["used_vacation_shifts"]
+            ff.used_holiday_shifts = row["used_holiday_shifts"]
+            ff.approved_shifts_count = row["approved_shifts_count"]
+            ff.dice = row["dice"]
+            ff.hr_validations = json.loads(row["hr_validations"]) if row["hr_validations"] else None
+            ff.exclusions = [
+                {key: (date.fromisoformat(value[:10]) if key in ("Leave Start", "Leave End") and value else value)
+                 for key, value in exclusion.items()}
+                for exclusion in json.loads(row["exclusions"] or "[]")
+            ]
+            ffighters.append(ff)
+        return ffighters
+
+    def query_picks(self, run_id=None, date_from=None, date_to=None, shift=None, rank=None, idnum=None,
+                    determination=None):
+        """
+        Indexed pick lookup.  Dates may be `date` objects or ISO strings.
+        Returns a list of dicts with firefighter, pick and determination columns.
+        """
+        run_id = self._resolve_run(run_id)
+        query = """SELECT f.idnum, f.name, f.rank, f.shift, p.date, p.type, p.increments, p.place, p.source,
+                          p.queue, d.determination, d.reason, d.approved_increments
+                   FROM picks p
+                   JOIN firefighters f ON f.ff_key = p.ff_key
+                   JOIN determinations d ON d.pick_key = p.pick_key
+                   WHERE p.run_id = ?"""
+        params = [run_id]
+        filters = (
+            ("p.date >= ?", date_from), ("p.date <= ?", date_to), ("f.shift = ?", shift),
+            ("f.rank = ?", rank), ("f.idnum = ?", idnum), ("d.determination = ?", determination),
+        )
+        for clause, value in filters:
+            if value is not None:
+                query += f" AND {clause}"
+                params.append(value.isoformat() if isinstance(value, date) else str(value))
+        query += " ORDER BY p.date, f.shift, f.name"
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    # ==========    Calendar Increments    ==========
+
+    def write_increments(self, run_id, shift, calendar, kind="approved"):
+        """
+        Stores the calendar for a shift: approved slots (kind='approved') or runner-ups (kind='runner_up').
+        Replaces any rows of the same kind already stored for the run and shift.
+        """
+        rows = []
+        for day_date in sorted(calendar.keys()):
+            for increment in calendar[day_date].increments.values():
+                if kind == "approved":
+                    entries = [(position, ff, pick, pick.reason)
+                               for position, (ff, pick) in enumerate(zip(increment.ffighters, increment.picks))]
+                else:
+                    entries = [(runner_up['position'], runner_up['ffighter'], runner_up['pick'], runner_up['reason'])
+                               for runner_up in increment.runner_ups]
+                for position, ff, pick, reason in entries:
+                    rows.append((
+                        run_id, shift, day_date.isoformat(), increment.name, kind, position, str(ff.idnum),
+                        ff.name, ff.rank, pick.type, pick.increments_plain_text(), reason
+                    ))
+        with self.connection:
+            self.ensure_run(run_id)
+            self.connection.execute("DELETE FROM increments WHERE run_id = ? AND shift = ? AND kind = ?",
+                                    (run_id, shift, kind))
+            self.connection.executemany(
+                "INSERT INTO increments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def query_increments(self, run_id=None, shift=None, day=None, kind=None):
+        """Returns stored calendar slots (dicts) for a run, optionally filtered by shift, date and kind."""
+        run_id = self._resolve_run(run_id)
+        query = "SELECT * FROM increments WHERE run_id = ?"
+        params = [run_id]
+        for clause, value in (("shift = ?", shift), ("date = ?", day), ("kind = ?", kind)):
+            if value is not None:
+                query += f" AND {clause}"
+                params.append(value.isoformat() if isinstance(value, date) else value)
+        query += " ORDER BY date, increment, kind, position"
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    # ==========    Analysis    ==========
+
+    def write_analysis(self, run_id, analysis):
+        with self.connection:
+            self.ensure_run(run_id)
+            self.connection.execute("UPDATE runs SET analysis = ? WHERE run_id = ?", (_to_json(analysis), run_id))
+
+    def read_analysis(self, run_id=None):
+        """Returns the analysis of a run (latest run with an analysis by default), or None."""
+        if run_id is None:
+            row = self.connection.execute(
+                "SELECT analysis FROM runs WHERE analysis IS NOT NULL ORDER BY created DESC, run_id DESC LIMIT 1"
+            ).fetchone()
+        else:
+            row = self.connection.execute("SELECT analysis FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row["analysis"]) if row and row["analysis"] else None
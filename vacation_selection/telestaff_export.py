@@ -0,0 +1,151 @@
+# telestaff_export.py
+# Builds the Telestaff leave import file from drafted picks.
+#
+# Rows come straight from the firefighter objects (or their JSON records): the IDs, dates and
+# increments are read from the picks themselves instead of being parsed back out of our
+# picks CSV.  The increment -> start time / duration mapping is applied to whole columns.
+#
+# For corrections and supplemental rounds, diff_import_rows compares the rows against the
+# last exported snapshot and keeps only the added, removed and modified ones.
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from vacation_selection.config import active_config
+
+TELESTAFF_COLUMNS = [
+    "Payroll ID", "Work Code", "List", "Start Date", "Counts", "Shift",
+    "Start Time", "Duration (hours)", "Region", "Outcome", "Detail Code", "Note",
+]
+
+# Increment text -> (start time, duration in hours)
+INCREMENT_SCHEDULE = {
+    "FULL": ("7:00:00", 48),
+    "AM": ("7:00:00", 24),
+    "day_1": ("7:00:00", 24),
+    "PM": ("7:00:00", 24),
+    "day_2": ("7:00:00", 24),
+}
+# Increments that start on the second calendar day of a 48-hour shift
+SECOND_DAY_INCREMENTS = ("day_2",)
+
+START_DATE_FORMAT = "%m/%d/%Y"
+
+# A leave row is identified by who, which day and when it starts; the other columns are its content.
+# The key is not unique (AM and PM both start at 7:00), so diffs compare the rows under each key
+IMPORT_KEY_COLUMNS = ["Payroll ID", "Start Date", "Start Time"]
+# Delta rows carry their change in the Note column
+DELTA_ADDED, DELTA_REMOVED, DELTA_MODIFIED = "Added", "Removed", "Modified"
+
+
+def pick_frame(ffighters, config=None):
+    """One row per processed pick: idnum, shift, date, type, increments (as approved), determination."""
+    rows = []
+    for ff in ffighters:
+        for pick in ff.processed:
+            rows.append((ff.idnum, ff.shift, pick.date, pick.type,
+                         pick.increments_plain_text(pick.get_approved_increments(), config), pick.determination))
+    return pd.DataFrame(rows, columns=["idnum", "shift", "date", "type", "increments", "determination"])
+
+
+def json_pick_frame(records):
+    """pick_frame for firefighter JSON records (as written by write_ffighters_to_json)."""
+    rows = [(record.get("idnum"), record.get("shift"), pick.get("date"), pick.get("type"),
+             pick.get("increments"), pick.get("determination"))
+            for record in records for pick in record.get("processed", [])]
+    return pd.DataFrame(rows, columns=["idnum", "shift", "date", "type", "increments", "determination"])
+
+
+def build_import_rows(picks, config=None):
+    """
+    Telestaff import rows for every non-rejected pick with a known increment.
+    Second-day increments of 48-hour shifts (per `config`, the active RunConfig by default)
+    start on the following day.
+    """
+    config = config or active_config()
+    picks = picks[(picks["determination"] != "Rejected") & picks["increments"].isin(list(INCREMENT_SCHEDULE))]
+    dates = pd.to_datetime(picks["date"])
+
+    days = dates.dt.date
+    spans_two_days = days.map({day: config.spans_two_days(day) for day in days.unique()}).astype(bool)
+    second_day = picks["increments"].isin(SECOND_DAY_INCREMENTS) & spans_two_days
+    start_dates = dates + pd.to_timedelta(np.where(second_day, 1, 0), unit="D")
+
+    return pd.DataFrame({
+        "Payroll ID": picks["idnum"].astype(str).to_numpy(),
+        "Work Code": picks["type"].fillna("").str[:1].to_numpy(),  # First letter of the pick type
+        "List": "",
+        "Start Date": start_dates.dt.strftime(START_DATE_FORMAT).to_numpy(),
+        "Counts": "",
+        "Shift": picks["shift"].to_numpy(),
+        "Start Time": picks["increments"].map({key: value[0] for key, value in INCREMENT_SCHEDULE.items()}).to_numpy(),
+        "Duration (hours)": picks["increments"].map({key: value[1] for key, value in INCREMENT_SCHEDULE.items()}).to_numpy(),
+        "Region": "",
+        "Outcome": "",
+        "Detail Code": "",
+        "Note": "",
+    }, columns=TELESTAFF_COLUMNS)
+
+
+def write_telestaff_import(rows, file_name, chunksize=10000):
+    """Streams the import rows to CSV in chunks.  Returns the file name."""
+    rows.to_csv(file_name, index=False, chunksize=chunksize)
+    return file_name
+
+
+def write_telestaff_import_for_ffighters(ffighters, suffix, write_path, runtime, config=None):
+    """Writes `{runtime}-Telestaff-{suffix}.csv` for the firefighters' picks.  Returns the file name."""
+    file_name = f'{write_path}/{runtime}-Telestaff-{suffix}.csv'
+    return write_telestaff_import(build_import_rows(pick_frame(ffighters, config), config), file_name)
+
+
+def read_telestaff_import(file_name):
+    """Reads an import file (or snapshot) back, every column as text.  Missing file: no rows."""
+    if not os.path.exists(file_name):
+        return pd.DataFrame(columns=TELESTAFF_COLUMNS)
+    return pd.read_csv(file_name, dtype=str, keep_default_na=False)[TELESTAFF_COLUMNS]
+
+
+def _rows_by_key(rows):
+    """{key: Counter of rows} for import rows compared as text."""
+    rows = rows[TELESTAFF_COLUMNS].astype(str)
+    keys = zip(*(rows[column] for column in IMPORT_KEY_COLUMNS))
+    by_key = {}
+    for key, row in zip(keys, rows.itertuples(index=False, name=None)):
+        by_key.setdefault(key, Counter())[row] += 1
+    return by_key
+
+
+def diff_import_rows(previous, current):
+    """
+    Import rows that changed between the `previous` snapshot and the `current` rows:
+    new keys are Added, vanished keys Removed (with their previous content) and keys whose
+    other columns differ Modified (with their current content).  The change is in the Note column.
+    Where rows share a key, the rows found on both sides are unchanged and the rest are paired
+    up as Modified, with any left over Added or Removed.
+    """
+    before, after = _rows_by_key(previous), _rows_by_key(current)
+    note = TELESTAFF_COLUMNS.index("Note")
+    delta = []
+    for key in before.keys() | after.keys():
+        old, new = before.get(key, Counter()), after.get(key, Counter())
+        removed, added = sorted((old - new).elements()), sorted((new - old).elements())
+        modified = min(len(removed), len(added))
+        delta += [row[:note] + (DELTA_MODIFIED,) for row in added[:modified]]
+        delta += [row[:note] + (DELTA_ADDED,) for row in added[modified:]]
+        delta += [row[:note] + (DELTA_REMOVED,) for row in removed[modified:]]
+    delta.sort(key=lambda row: [row[TELESTAFF_COLUMNS.index(column)] for column in IMPORT_KEY_COLUMNS])
+    return pd.DataFrame(delta, columns=TELESTAFF_COLUMNS)
+
+
+def write_telestaff_delta(rows, snapshot_name, file_name):
+    """
+    Writes the rows that changed since `snapshot_name` to `file_name`, then replaces the
+    snapshot with the full `rows`.  Returns the delta rows.
+    """
+    delta = diff_import_rows(read_telestaff_import(snapshot_name), rows)
+    write_telestaff_import(delta, file_name)
+    write_telestaff_import(rows, snapshot_name)
+    return delta